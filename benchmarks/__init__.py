@@ -0,0 +1 @@
+"""Benchmarks of sdgp: rows/sec and peak memory of every pipeline stage."""
@@ -0,0 +1,231 @@
+"""
+Benchmark cases. A case has a setup, run once and not timed, and a run
+function timed on the state returned by the setup. Each case reports the
+number of rows it processes, for rows/sec.
+"""
+import contextlib
+import os
+import subprocess
+import sys
+
+from sdgp.plan import GenerationPlan
+from sdgp.sdgp import DataGenerator
+from sdgp.writers import CSVOptions
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+# Conf file with a column of every conf type
+CONF = os.path.join(HERE, 'conf.csv')
+SEED = 42
+# Rows of the seed file of the genMockData and e/g mode cases
+SEED_ROWS = 10000
+ENGINES = ['pandas', 'arrow']
+# Name, output format and CSV options of the writer cases
+WRITERS = [('csv-arrow', 'csv', {'writer': 'arrow'}),
+           ('csv-pandas', 'csv', None),
+           ('csv-gzip', 'csv', {'writer': 'arrow', 'compression': 'gzip',
+                                'compression_level': 1}),
+           ('parquet', 'parquet', None),
+           ('arrow-ipc', 'arrow', None)]
+MODES = ['m', 'e', 'g']
+# Name and arguments of the interpreter of the startup cases
+STARTUP = [('startup/import', ['-c', 'import sdgp.cli']),
+           ('startup/help', ['-m', 'sdgp.cli', '-h'])]
+
+
+class Case:
+    """
+    A benchmark case.
+    Args:
+        name (str): Unique name, e.g. 'type/category/pandas'.
+        rows (int): Rows processed by one run.
+        setup (callable): Function (directory) returning the state of the
+        run, called once in the process of the case.
+        run (callable): Timed function (state).
+        repeat (bool): Repeat the run and keep the fastest, False for end
+        to end cases run once.
+    """
+    __slots__ = ('name', 'rows', 'setup', 'run', 'repeat')
+
+    def __init__(self, name, rows, setup, run, repeat=True):
+        self.name = name
+        self.rows = rows
+        self.setup = setup
+        self.run = run
+        self.repeat = repeat
+
+
+def generator(directory, rows, engine='pandas', **kwargs) -> DataGenerator:
+    """DataGenerator of the benchmark conf writing to the directory."""
+    data_gen = DataGenerator(
+        volume=rows, file=os.path.join(directory, 'bench'), conf_file=CONF,
+        format='csv', choice='m', seed=SEED, engine=engine, **kwargs)
+    data_gen.offset, data_gen.n = 0, rows
+    return data_gen
+
+
+def seedFile(directory) -> str:
+    """Write the seed file of the e and g modes, once per directory."""
+    path = os.path.join(directory, 'seed.csv')
+    if not os.path.exists(path):
+        data_gen = generator(directory, SEED_ROWS)
+        data_gen.file = os.path.join(directory, 'seed')
+        data_gen.generateMockData()
+        os.replace(data_gen.mock_file_csv_path, path)
+    return path
+
+
+def typeCases(rows) -> list:
+    """
+    One case per conf type and engine, generating the first column of the
+    type in the conf file. The columns it depends on are generated in the
+    setup.
+    Raises:
+        ValueError: If the conf file misses a conf type.
+    """
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+        data_gen = generator(ROOT, 0)
+    cases = []
+    for type in dict.fromkeys(data_gen.allowed_types):
+        specs = data_gen.plan.byType(type)
+        if not specs:
+            raise ValueError(f"No '{type}' column in {CONF}")
+        for engine in ENGINES:
+            cases.append(Case(f"type/{type}/{engine}", rows,
+                              TypeSetup(specs[0].name, rows, engine),
+                              generateColumn))
+    return cases
+
+
+class TypeSetup:
+    """Setup of a conf type case: the column and its dependencies."""
+    __slots__ = ('name', 'rows', 'engine')
+
+    def __init__(self, name, rows, engine):
+        self.name = name
+        self.rows = rows
+        self.engine = engine
+
+    def __call__(self, directory):
+        data_gen = generator(directory, self.rows, self.engine)
+        specs = {spec.name: spec for spec in data_gen.plan.columns}
+        needed, pending = set(), list(specs[self.name].deps)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(specs[name].deps)
+        data_gen.plan = GenerationPlan.fromConf({
+            key: row for key, row in data_gen.conf_dict.items()
+            if row['name'].strip() in needed})
+        data_gen.generateRange(0, self.rows)
+        return data_gen, specs[self.name]
+
+
+def generateColumn(state):
+    data_gen, spec = state
+    data_gen.generateColumn(spec)
+
+
+def mockCases(rows) -> list:
+    """genMockData amplifying the seed file to the rows, per engine."""
+    def setup(engine):
+        def seedData(directory):
+            data_gen = generator(directory, rows, engine)
+            data_gen.csv_file_path = seedFile(directory)
+            return data_gen, data_gen.seedData()
+        return seedData
+
+    def run(state):
+        data_gen, df = state
+        data_gen.genMockData(df)
+    return [Case(f"mock/{engine}", rows, setup(engine), run)
+            for engine in ENGINES]
+
+
+def writerCases(rows) -> list:
+    """The CSV, Parquet and Arrow writers saving a generated chunk."""
+    def setup(format, options):
+        def generateRange(directory):
+            data_gen = generator(directory, rows, csv_options=CSVOptions(
+                **options) if options else None)
+            data_gen.outputFormat = format
+            data_gen.generateRange(0, rows)
+            return data_gen
+        return generateRange
+
+    def run(data_gen):
+        data_gen.offset, data_gen.lastChunk = 0, True
+        data_gen.output()
+    return [Case(f"writer/{name}", rows, setup(format, options), run)
+            for name, format, options in WRITERS]
+
+
+def cliCases(scales) -> list:
+    """
+    End to end runs of the sdgp command in modes m, e and g, in a child
+    process, writing CSV files in chunks of at most 1e6 rows.
+    """
+    def setup(mode, rows):
+        def command(directory):
+            args = [sys.executable, '-m', 'sdgp.cli', '-c', mode, str(rows),
+                    'csv', seedFile(directory) if mode != 'm' else
+                    os.path.join(directory, 'bench'), CONF,
+                    '--chunk-rows', str(min(rows, 10**6)),
+                    '--seed', str(SEED)]
+            return args, directory
+        return command
+    return [Case(f"cli/{mode}/{rows:.0e}".replace('+0', ''), rows,
+                 setup(mode, rows), runCommand, repeat=False)
+            for rows in scales for mode in MODES]
+
+
+def startupCases() -> list:
+    """
+    Start time of the sdgp command: importing the CLI, printing the help
+    and a 1000 rows CSV run, one row per start.
+    """
+    def setup(args):
+        def command(directory):
+            return [sys.executable, *args], directory
+        return command
+    csv = ['-m', 'sdgp.cli', '-c', 'm', '1000', 'csv', 'bench', CONF,
+           '--seed', str(SEED)]
+    return [Case(name, 1, setup(args), runCommand)
+            for name, args in [*STARTUP, ('startup/csv-1000', csv)]]
+
+
+def runCommand(state):
+    """Run a command with the repo on the path, output discarded."""
+    args, directory = state
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    subprocess.run(args, cwd=directory, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+SUITES = {'types': typeCases, 'mock': mockCases, 'writers': writerCases}
+
+
+def allCases(suites, rows, scales) -> list:
+    """
+    The cases of the suites.
+    Args:
+        suites (list): Names among SUITES, 'cli' and 'startup'.
+        rows (int): Rows of the in-process cases.
+        scales (list): Rows of the cli cases.
+    Returns:
+        list: The cases.
+    """
+    cases = []
+    for suite in suites:
+        if suite == 'cli':
+            cases.extend(cliCases(scales))
+        elif suite == 'startup':
+            cases.extend(startupCases())
+        elif suite in SUITES:
+            cases.extend(SUITES[suite](rows))
+        else:
+            raise ValueError(f"Invalid suite '{suite}'. Allowed suites are \
+'{', '.join([*SUITES, 'cli', 'startup'])}'")
+    return cases
@@ -0,0 +1,212 @@
+"""
+Run the benchmarks and compare them with a baseline.
+
+    python -m benchmarks.run                      # every suite
+    python -m benchmarks.run --suite types,mock --rows 100000
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --quick --save-baseline
+
+Each case runs in a forked process, so its peak RSS is its own, measured
+from the end of its setup where Linux allows it. Results are written as
+JSON; with a baseline, cases slower or larger than the thresholds are
+reported and the exit status is 1.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+import sdgp
+from .cases import allCases
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, 'baseline.json')
+RESULTS = os.path.join(HERE, 'results.json')
+SUITES = ['types', 'mock', 'writers', 'cli', 'startup']
+SCALES = [10**5, 10**6, 10**7]
+
+
+def resetPeakRSS():
+    """Reset the peak RSS of this process to its current RSS (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+
+def peakRSS() -> float:
+    """
+    Peak RSS in MB of this process since resetPeakRSS, or since its start
+    where it can not be reset, and of its waited children.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        with open('/proc/self/status') as file:
+            peak = next(int(line.split()[1]) for line in file
+                        if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        pass
+    return max(peak, resource.getrusage(
+        resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+def measure(case, repeat) -> dict:
+    """
+    Set up and time a case in the current process.
+    Args:
+        case (Case): The case.
+        repeat (int): Timed runs of repeated cases, the fastest is kept.
+    Returns:
+        dict: rows, seconds, rows_per_sec and peak_rss_mb.
+    """
+    directory = tempfile.mkdtemp(prefix='sdgp-bench-')
+    try:
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            state = case.setup(directory)
+            # The peak of the timed runs, not of the setup
+            resetPeakRSS()
+            seconds = []
+            for _ in range(repeat if case.repeat else 1):
+                start = time.perf_counter()
+                case.run(state)
+                seconds.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'rows': case.rows, 'seconds': round(min(seconds), 4),
+            'rows_per_sec': round(case.rows / min(seconds), 1),
+            'peak_rss_mb': round(peakRSS(), 1)}
+
+
+def isolated(case, repeat) -> dict:
+    """Measure a case in a forked process, returning its result."""
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - child
+        os.close(read)
+        try:
+            result = measure(case, repeat)
+        except BaseException as e:
+            result = {'error': f"{type(e).__name__}: {e}"}
+        with os.fdopen(write, 'w') as pipe:
+            json.dump(result, pipe)
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        result = json.loads(pipe.read() or '{"error": "no result"}')
+    os.waitpid(pid, 0)
+    return result
+
+
+def environment() -> dict:
+    """Machine and versions the results were measured on."""
+    return {'python': platform.python_version(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'sdgp': sdgp.__version__, 'pandas': pd.__version__,
+            'pyarrow': pa.__version__,
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, threshold=0.2, memory_threshold=0.2) -> list:
+    """
+    Regressions of results against a baseline.
+    Args:
+        results (dict): Results by case name.
+        baseline (dict): Baseline results by case name; cases missing from
+        either side are skipped.
+        threshold (float): Largest relative drop of rows/sec.
+        memory_threshold (float): Largest relative growth of the peak RSS.
+    Returns:
+        list: Messages of the regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'error' in base:
+            continue
+        if 'error' in result:
+            regressions.append(f"{name}: {result['error']}")
+            continue
+        speed = result['rows_per_sec'] / base['rows_per_sec']
+        if speed < 1 - threshold:
+            regressions.append(
+                f"{name}: {result['rows_per_sec']:,.0f} rows/sec, "
+                f"{1 - speed:.0%} slower than {base['rows_per_sec']:,.0f}")
+        memory = result['peak_rss_mb'] / base['peak_rss_mb']
+        if memory > 1 + memory_threshold:
+            regressions.append(
+                f"{name}: {result['peak_rss_mb']:,.0f} MB peak RSS, "
+                f"{memory - 1:.0%} more than {base['peak_rss_mb']:,.0f} MB")
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of sdgp: rows/sec and peak RSS per case.")
+    parser.add_argument("--suite", type=str, default=','.join(SUITES),
+                        help="Comma separated suites among "
+                        f"{', '.join(SUITES)}.")
+    parser.add_argument("--rows", type=int, default=10**6,
+                        help="Rows of the types, mock and writers cases.")
+    parser.add_argument("--scales", type=str,
+                        default=','.join(map(str, SCALES)),
+                        help="Comma separated rows of the cli cases.")
+    parser.add_argument("--quick", action="store_true",
+                        help="1e5 rows everywhere, for a fast check.")
+    parser.add_argument("--filter", type=str, default=None,
+                        help="Only run the cases whose name contains this.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per case, the fastest is kept.")
+    parser.add_argument("--output", type=str, default=RESULTS,
+                        help="JSON file of the results.")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="JSON results to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Largest relative drop of rows/sec.")
+    parser.add_argument("--memory-threshold", type=float, default=0.2,
+                        help="Largest relative growth of the peak RSS.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Also write the results to {BASELINE}.")
+    args = parser.parse_args(args)
+    rows = 10**5 if args.quick else args.rows
+    scales = [10**5] if args.quick else \
+        [int(float(x)) for x in args.scales.split(',')]
+    cases = [case for case in allCases(args.suite.split(','), rows, scales)
+             if not args.filter or args.filter in case.name]
+    results = {}
+    for case in cases:
+        result = results[case.name] = isolated(case, args.repeat)
+        if 'error' in result:
+            print(f"{case.name:<32} {result['error']}")
+        else:
+            print(f"{case.name:<32} {result['rows_per_sec']:>14,.0f} rows/s"
+                  f" {result['seconds']:>9.3f} s"
+                  f" {result['peak_rss_mb']:>8,.0f} MB")
+    report = {'environment': environment(), 'results': results}
+    for path in [args.output] + ([BASELINE] if args.save_baseline else []):
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold,
+                              args.memory_threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regression against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+In-memory generation: chunks of mock data as DataFrames or Arrow record
+batches, without console output or files.
+
+    from sdgp.api import generate
+    conf = [('id', 'uniqueIndex', 1), ('model', 'category', ['a', 'b'])]
+    for df in generate(conf, rows=10**6, batch_rows=100000, seed=42):
+        ...
+"""
+import pandas as pd
+import pyarrow as pa
+
+from .sdgp import DataGenerator
+
+# Rows per yielded chunk by default
+DEFAULT_BATCH_ROWS = 100000
+
+
+def generate(conf=None, rows=DEFAULT_BATCH_ROWS,
+             batch_rows=DEFAULT_BATCH_ROWS, data=None, seed=None,
+             engine="pandas", threads=1, workers=1):
+    """
+    Generate mock data in memory, chunk by chunk. The chunks are the same
+    as the rows of a file written by the sdgp command with the same conf,
+    seed and chunk size.
+    Args:
+        conf (str, list, dict or pd.DataFrame): Path of a conf csv file, or
+        the conf as a Python structure (see plan.confFrame).
+        rows (int): Total number of rows.
+        batch_rows (int): Rows per chunk, the last chunk may be shorter.
+        data (pd.DataFrame or pa.Table): Seed data amplified to the rows:
+        with a conf the conf columns are generated over it (mode 'e'),
+        without a conf it is only scaled (mode 'g').
+        seed (int): Root seed of the random streams, random if None.
+        engine (str): "pandas" to yield DataFrames, "arrow" to yield Arrow
+        RecordBatches.
+        threads (int): Threads generating the independent columns of a
+        chunk.
+        workers (int): Processes generating chunks in parallel.
+    Returns:
+        iterator: The chunks, in order.
+    Raises:
+        ValueError: If neither a conf nor data is given, or the conf is
+        invalid.
+    """
+    if conf is None and data is None:
+        raise ValueError("A conf or seed data is required")
+    choice = 'm' if data is None else 'g' if conf is None else 'e'
+    data_gen = DataGenerator(
+        volume=rows, file='', conf_file=conf, format=None, choice=choice,
+        chunk_rows=batch_rows, workers=workers, seed=seed, threads=threads,
+        engine=engine, verbose=False)
+    if data is None:
+        return data_gen.iterChunks()
+    if engine == "arrow" and isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    elif engine != "arrow" and isinstance(data, pa.Table):
+        data = data.to_pandas()
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) \
+        else data.column_names
+    if data.shape[0] > rows:
+        raise ValueError(f"given no. of rows is greater than {rows}")
+    if choice == 'e':
+        # Columns generated from the conf are not amplified
+        generated = {spec.name for spec in data_gen.plan.columns}
+        kept = [x for x in columns if x not in generated] or columns[:1]
+        data = data[kept] if isinstance(data, pd.DataFrame) \
+            else data.select(kept)
+    data_gen.conf_columns = columns
+    return data_gen.iterChunks(data)
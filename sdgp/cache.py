@@ -0,0 +1,202 @@
+"""Content-addressed cache of output files with LRU eviction."""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# Size cap of a cache directory by default, in bytes
+DEFAULT_CACHE_SIZE = 10 * 2**30
+META = 'meta.json'
+DATA = 'data'
+DIGEST_BLOCK = 1 << 20
+
+
+def cacheKey(parts) -> str:
+    """
+    Key of an output: hash of everything it depends on.
+    Args:
+        parts (dict): JSON serializable inputs of the run.
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    return hashlib.sha256(json.dumps(
+        parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def fileDigest(path) -> str:
+    """
+    Hash of the contents of a file, or of the names and contents of the
+    files of a directory.
+    Args:
+        path (str): The file or directory.
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(os.path.relpath(os.path.join(root, name), path)
+                       for root, _, names in os.walk(path) for name in names)
+    else:
+        files = ['']
+    for name in files:
+        digest.update(name.encode() + b'\0')
+        with open(os.path.join(path, name) if name else path, 'rb') as file:
+            for block in iter(lambda: file.read(DIGEST_BLOCK), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def linkOrCopy(source, target):
+    """Hard link a file, or copy it across file systems."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def removePath(path):
+    """Remove a file or a directory if it exists."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def unlinkShared(path):
+    """
+    Remove a file hard linked elsewhere, e.g. served from the cache, so
+    writing a new file in its place leaves the other links untouched.
+    """
+    if os.path.isfile(path) and os.stat(path).st_nlink > 1:
+        os.remove(path)
+
+
+class DatasetCache:
+    """
+    Output files stored under the key of their inputs. An entry is a
+    directory named by the key with the output, a file or a directory
+    dataset, and a meta.json file whose modification time is the last use
+    of the entry. Entries are stored by copy and served by hard link, or
+    by copy across file systems. Least recently used entries are evicted
+    beyond the size cap.
+    Args:
+        directory (str): The cache directory, created if needed.
+        max_bytes (int): Size cap of the entries in bytes.
+    """
+    __slots__ = ('directory', 'max_bytes')
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"Cache size must be positive, got {max_bytes}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def entryPath(self, key) -> str:
+        return os.path.join(self.directory, key)
+
+    def fetch(self, key, target) -> bool:
+        """
+        Serve an entry at the target path, replacing it.
+        Args:
+            key (str): The key of the output.
+            target (str): The output file or directory.
+        Returns:
+            bool: False if the key is not cached.
+        """
+        entry = self.entryPath(key)
+        data = os.path.join(entry, DATA)
+        if not os.path.exists(os.path.join(entry, META)):
+            return False
+        removePath(target)
+        if os.path.isdir(data):
+            shutil.copytree(data, target, copy_function=linkOrCopy)
+        else:
+            linkOrCopy(data, target)
+        os.utime(os.path.join(entry, META))
+        return True
+
+    def store(self, key, path, parts=None):
+        """
+        Copy an output into the cache, then evict entries beyond the cap.
+        Args:
+            key (str): The key of the output.
+            path (str): The output file or directory.
+            parts (dict): Inputs of the key, kept in the metadata.
+        """
+        entry = self.entryPath(key)
+        if os.path.exists(entry):
+            return
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            data = os.path.join(staging, DATA)
+            if os.path.isdir(path):
+                shutil.copytree(path, data)
+            else:
+                shutil.copy2(path, data)
+            with open(os.path.join(staging, META), 'w') as file:
+                json.dump({'key': key, 'name': os.path.basename(path),
+                           'bytes': self.entrySize(staging),
+                           'created': time.time(), 'parts': parts}, file,
+                          default=str)
+            try:
+                os.rename(staging, entry)
+            except OSError:  # Stored concurrently by another run
+                pass
+        finally:
+            removePath(staging)
+        self.prune()
+
+    def entrySize(self, entry) -> int:
+        data = os.path.join(entry, DATA)
+        if os.path.isdir(data):
+            return sum(os.path.getsize(os.path.join(root, name))
+                       for root, _, names in os.walk(data) for name in names)
+        return os.path.getsize(data) if os.path.exists(data) else 0
+
+    def entries(self) -> list:
+        """
+        The entries, most recently used first.
+        Returns:
+            list: The metadata of each entry with its 'last_used' time.
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            meta = os.path.join(self.entryPath(key), META)
+            try:
+                with open(meta) as file:
+                    entry = json.load(file)
+                entry['last_used'] = os.path.getmtime(meta)
+            except (OSError, ValueError):
+                continue
+            entries.append(entry)
+        return sorted(entries, key=lambda entry: -entry['last_used'])
+
+    def size(self) -> int:
+        """Size of the entries in bytes."""
+        return sum(entry['bytes'] for entry in self.entries())
+
+    def prune(self, max_bytes=None) -> list:
+        """
+        Evict the least recently used entries beyond a size.
+        Args:
+            max_bytes (int): Size to keep, the cap of the cache if None.
+        Returns:
+            list: The evicted entries.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+        kept, evicted = 0, []
+        for entry in self.entries():
+            kept += entry['bytes']
+            if kept > max_bytes:
+                removePath(self.entryPath(entry['key']))
+                evicted.append(entry)
+        return evicted
+
+    def clear(self) -> list:
+        """Remove every entry, returning them."""
+        return self.prune(0)
@@ -1,13 +1,58 @@
 #!/usr/bin/env python
 """Console script for sdgp."""
 import argparse
+import os
 import sys
+import time
 from colorama import Fore
-from .sdgp import DataGenerator
+from .cache import DEFAULT_CACHE_SIZE, DatasetCache
+# pandas, numpy and pyarrow are imported once the arguments are valid, so
+# -h and argument errors return at once
+from .writers import (CSV_COMPRESSIONS, CSV_QUOTING, CSV_WRITERS,
+                      PARQUET_CODECS, CSVOptions, ParquetOptions)
+
+
+def cacheMain(args):
+    """The 'sdgp cache' command: list, prune or clear the output cache."""
+    parser = argparse.ArgumentParser(
+        prog="sdgp cache", description="Inspect and prune the output cache.")
+    parser.add_argument("action", choices=['list', 'prune', 'clear'],
+                        help="list the entries, most recently used first; \
+prune the least recently used ones beyond --max-size-mb; clear them all.")
+    parser.add_argument("--cache-dir", type=str,
+                        default=os.environ.get('SDGP_CACHE_DIR'),
+                        required='SDGP_CACHE_DIR' not in os.environ,
+                        help="The cache directory, $SDGP_CACHE_DIR by \
+default.")
+    parser.add_argument("--max-size-mb", type=float,
+                        default=DEFAULT_CACHE_SIZE / 2**20,
+                        help="Size to keep when pruning.")
+    args = parser.parse_args(args)
+    cache = DatasetCache(args.cache_dir, int(args.max_size_mb * 2**20))
+    if args.action == 'list':
+        entries = cache.entries()
+        for entry in entries:
+            parts = entry.get('parts') or {}
+            used = time.strftime('%Y-%m-%d %X',
+                                 time.localtime(entry['last_used']))
+            print(f"{entry['key'][:16]}  {entry['bytes'] / 2**20:>10.1f} MB"
+                  f"  {used}  {parts.get('mode')} {parts.get('volume')} "
+                  f"{parts.get('format')}  {entry['name']}")
+        print(f"{len(entries)} entries, "
+              f"{sum(entry['bytes'] for entry in entries) / 2**20:.1f} MB "
+              f"in {args.cache_dir}")
+        return 0
+    evicted = cache.prune() if args.action == 'prune' else cache.clear()
+    print(f"Removed {len(evicted)} entries, "
+          f"{sum(entry['bytes'] for entry in evicted) / 2**20:.1f} MB")
+    return 0
 
 
 def main(args=None):
     """Console script for sdgp."""
+    args = sys.argv[1:] if args is None else list(args)
+    if args[:1] == ['cache']:
+        return cacheMain(args[1:])
     # Create a parser object with a description of your script
     parser = argparse.ArgumentParser(
         description="""This is a script that generates mock data.\n
@@ -19,6 +64,9 @@ edit_table_100000.parquet\n
 \t3. sdgp -c g 1000000 csv scale.csv # Generate 1000000 rows of mock data \
 by scaling existing data and save as scale_1000000.csv\n
 \t3. sdgp -c p 0 parquet csv_file.csv # Convert csv to parquet\n
+\t4. sdgp cache list --cache-dir cache # List the outputs of the cache\n
+\t5. sdgp -c m 150000 csv mock_table conf.csv --seed 1 --append \
+mock_table_m_100000.csv # Generate only 50000 more rows\n
 """)
     # Add arguments to the parser object
     parser.add_argument("-c", "--choice", type=str, choices=[
@@ -30,8 +78,9 @@ m for mock data, e for edit mock data, g for generate high volume data.")
 how many rows to generate mock data. Recommended minimum value is more than \
 volume size or more than 1000.")
     parser.add_argument(
-        "format", type=str, choices=['csv', 'parquet'], help="The type of \
-format to save the mock data. csv for CSV format, parquet for Parquet format.")
+        "format", type=str, choices=['csv', 'parquet', 'arrow'], help="The \
+type of format to save the mock data. csv for CSV format, parquet for Parquet \
+format, arrow for Arrow IPC file format.")
     parser.add_argument("csv_file", type=str,
                         help="The CSV file name. A string value that specifies\
  the name of the CSV file to read or write.")
@@ -40,11 +89,114 @@ format to save the mock data. csv for CSV format, parquet for Parquet format.")
                         help="The configuration CSV file name. A string value \
 that specifies the name of the configuration CSV file to read. This argument \
 is required if mode is e or g.")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="Generate and save the data in chunks of this \
+many rows, so memory depends on the chunk size instead of the volume.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes generating chunks in \
+parallel. Each chunk gets an independent random stream.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Root seed making the run reproducible. The \
+values of any row range only depend on the seed, the column and the rows.")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Number of threads generating the independent \
+columns of a chunk concurrently.")
+    parser.add_argument("--engine", type=str, default="pandas",
+                        choices=['pandas', 'arrow'],
+                        help="pandas to generate chunks as DataFrames, arrow \
+to generate Arrow record batches written without pandas conversions.")
+    parser.add_argument("--partition-by", type=str, default=None,
+                        help="Comma separated columns partitioning the \
+Parquet output into a hive style directory dataset (column=value).")
+    parser.add_argument("--compression", type=str, default="snappy",
+                        choices=PARQUET_CODECS,
+                        help="Codec of the Parquet output.")
+    parser.add_argument("--compression-level", type=int, default=None,
+                        help="Level of the Parquet codec.")
+    parser.add_argument("--row-group-rows", type=int, default=None,
+                        help="Rows per Parquet row group.")
+    parser.add_argument("--file-rows", type=int, default=None,
+                        help="Largest number of rows per file of a Parquet \
+directory dataset.")
+    parser.add_argument("--file-size-mb", type=float, default=None,
+                        help="Target size of the files of a Parquet \
+directory dataset, from the in-memory size of the rows.")
+    parser.add_argument("--no-dictionary", action="store_true",
+                        help="Do not dictionary encode Parquet columns.")
+    parser.add_argument("--no-statistics", action="store_true",
+                        help="Do not write Parquet column statistics.")
+    parser.add_argument("--csv-writer", type=str, default="pandas",
+                        choices=CSV_WRITERS,
+                        help="pandas for the DataFrame.to_csv formatting, \
+arrow for pyarrow's faster multi-threaded CSV writer, which quotes every \
+string and writes lowercase booleans.")
+    parser.add_argument("--csv-compression", type=str, default=None,
+                        choices=[*CSV_COMPRESSIONS],
+                        help="Streaming compression of the CSV output. A \
+.gz, .zst or .bz2 file name also selects it.")
+    parser.add_argument("--csv-compression-level", type=int, default=None,
+                        help="Level of the gzip or bz2 CSV compression.")
+    parser.add_argument("--delimiter", type=str, default=",",
+                        help="Field delimiter of the CSV output.")
+    parser.add_argument("--quoting", type=str, default="needed",
+                        choices=[*CSV_QUOTING],
+                        help="Quoting of the CSV output values.")
+    parser.add_argument("--no-header", action="store_true",
+                        help="Do not write the CSV header line.")
+    parser.add_argument("--seed-columns", type=str, default=None,
+                        help="Comma separated columns of the seed file to \
+load (modes e and g); other columns are not read.")
+    parser.add_argument("--seed-types", type=str, default=None,
+                        help="Types of seed columns instead of the inferred \
+ones, e.g. 'id:string,amount:double'.")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Mode g: stream the seed file to disk instead \
+of loading it, for seeds larger than memory.")
+    parser.add_argument("--spill-dir", type=str, default=None,
+                        help="Directory of the seed spilled by --out-of-core \
+(system temporary directory by default).")
+    parser.add_argument("--metrics-json", type=str, default=None,
+                        help="Write the wall time, CPU time, rows/sec, bytes \
+and peak RSS growth of every stage and column to this file, as JSON lines \
+if it ends with .jsonl.")
+    parser.add_argument("--cache-dir", type=str,
+                        default=os.environ.get('SDGP_CACHE_DIR'),
+                        help="Serve the output from this cache when a run \
+with the same conf, seed, volume, mode and options was stored, otherwise \
+store it ($SDGP_CACHE_DIR by default). Needs --seed. See 'sdgp cache -h'.")
+    parser.add_argument("--cache-size-mb", type=float,
+                        default=DEFAULT_CACHE_SIZE / 2**20,
+                        help="Size cap of the cache, least recently used \
+outputs are evicted beyond it.")
+    parser.add_argument("--memo-dir", type=str, default=None,
+                        help="Save the generated columns of every chunk in \
+this store and memory map them in later runs: only the columns edited in \
+the conf and their dependents are generated again. Needs --seed and the \
+same --chunk-rows.")
+    parser.add_argument("--memo-size-mb", type=float,
+                        default=DEFAULT_CACHE_SIZE / 2**20,
+                        help="Size cap of the column store, least recently \
+used columns are removed beyond it.")
+    parser.add_argument("--append", type=str, default=None,
+                        help="Extend this existing CSV file, Parquet file \
+or dataset to the volume: only the missing rows are generated and appended, \
+uniqueIndex columns continue from its last value. It is moved to the \
+output path. Use the seed and conf of the existing output.")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Directory of cProfile (.pstats) and \
+tracemalloc profiles of every column generator and writer, with a summary \
+of the top self time functions and allocation sites.")
+    parser.add_argument("--profile-chunks", type=int, default=None,
+                        help="With --profile and --chunk-rows, only \
+generate and profile the first K chunks.")
     # Parse the arguments
-    # if args:
-    #     args = parser.parse_args(args)
-    # else:
-    args = parser.parse_args()
+    args = parser.parse_args(args)
+    from .loader import parseTypes
+    from .sdgp import DataGenerator
+    try:
+        seed_types = parseTypes(args.seed_types)
+    except ValueError as e:
+        parser.error(str(e))
     # Change the mode variable to choice
     choice = args.choice
     LENGTH = 122
@@ -52,8 +204,41 @@ is required if mode is e or g.")
     # Pass the arguments to your class constructor as parameters
     data_gen = DataGenerator(volume=args.volume,
                              file=args.csv_file.strip('.\\'),
-                             conf_file=args.conf_csv_file.strip('.\\'),
-                             format=args.format, choice=choice)
+                             conf_file=args.conf_csv_file.strip('.\\')
+                             if args.conf_csv_file else None,
+                             format=args.format, choice=choice,
+                             chunk_rows=args.chunk_rows,
+                             workers=args.workers, seed=args.seed,
+                             threads=args.threads, engine=args.engine,
+                             parquet_options=ParquetOptions(
+                                 partition_by=args.partition_by.split(',')
+                                 if args.partition_by else None,
+                                 compression=args.compression,
+                                 compression_level=args.compression_level,
+                                 row_group_rows=args.row_group_rows,
+                                 file_rows=args.file_rows,
+                                 file_size=args.file_size_mb,
+                                 dictionary=not args.no_dictionary,
+                                 statistics=not args.no_statistics),
+                             csv_options=CSVOptions(
+                                 writer=args.csv_writer,
+                                 compression=args.csv_compression,
+                                 compression_level=args.csv_compression_level,
+                                 delimiter=args.delimiter,
+                                 quoting=args.quoting,
+                                 header=not args.no_header),
+                             seed_columns=args.seed_columns.split(',')
+                             if args.seed_columns else None,
+                             seed_types=seed_types or None,
+                             out_of_core=args.out_of_core,
+                             spill_dir=args.spill_dir,
+                             profile_dir=args.profile,
+                             profile_chunks=args.profile_chunks,
+                             cache_dir=args.cache_dir,
+                             cache_size=int(args.cache_size_mb * 2**20),
+                             memo_dir=args.memo_dir,
+                             memo_size=int(args.memo_size_mb * 2**20),
+                             append=args.append)
 
     def suggestion():
         print(Fore.CYAN + '#'*LENGTH+Fore.WHITE)
@@ -69,18 +254,24 @@ will update in next release.                           ",
         print(Fore.CYAN + '#'*LENGTH+Fore.WHITE)
     # Use the choice argument to select a function from your class
     if choice == 'm' and args.conf_csv_file:
-        data_gen.generateMockData()
+        data_gen.runCached(data_gen.generateMockData)
         suggestion()
     elif choice == 'e' and args.conf_csv_file:
-        data_gen.editMockDataAndGenerate()
+        data_gen.runCached(data_gen.editMockDataAndGenerate)
         suggestion()
     elif choice == 'g':
-        data_gen.justScaleData()
+        data_gen.runCached(data_gen.justScaleData)
         suggestion()
     else:
         print("Invalid choice or configuration file not found!\
 try: sdgp -h for help")  # pragma: no cover
         print(Fore.CYAN + '#'*LENGTH+Fore.WHITE)  # pragma: no cover
+    if args.metrics_json:
+        data_gen.metrics.save(args.metrics_json)
+    if data_gen.profiler:
+        data_gen.profiler.save()
+        data_gen.metrics.log(f"Saved the profiles in \
+{data_gen.colorLiteral(args.profile)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+"""Batched hashing of composite keys."""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+HASH_ALGORITHMS = ['sha1', 'blake2b', 'hash64']
+# Separator between key parts, so '1|23' and '12|3' hash differently
+KEY_SEPARATOR = '|'
+# Rows hashed per batch / per worker task
+HASH_BATCH_ROWS = 1 << 18
+# Below this many rows hashing stays in the calling process
+PARALLEL_MIN_ROWS = 1 << 20
+
+# Process pool of hashKeys, started once and reused by every column and
+# chunk, and its number of workers
+_pool = None
+_poolWorkers = 0
+_poolLock = threading.Lock()  # Columns are hashed from several threads
+
+
+def joinKeys(columns, separator=KEY_SEPARATOR) -> np.ndarray:
+    """
+    Join key columns into one buffer of composite keys.
+    Args:
+        columns (list): Key columns as pandas Series or arrays.
+        separator (str): Separator placed between the key parts.
+    Returns:
+        np.ndarray: Fixed width unicode array of the joined keys.
+    """
+    keys = None
+    for column in columns:
+        part = np.asarray(column)
+        if part.dtype.kind != 'U':
+            part = part.astype('U')
+        keys = part if keys is None else np.char.add(
+            np.char.add(keys, separator), part)
+    return keys
+
+
+def _hexdigests(algorithm, keys):
+    if algorithm == 'blake2b':
+        return [hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+                for key in keys.tolist()]
+    return [hashlib.new(algorithm, key.encode()).hexdigest()
+            for key in keys.tolist()]
+
+
+def checkAlgorithm(algorithm):
+    """
+    Check if a composite hash algorithm is supported.
+    Args:
+        algorithm (str): Name of the hash algorithm.
+    Raises:
+        ValueError: If the algorithm is not supported.
+    """
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(
+            f"Invalid hash algorithm '{algorithm}'. Allowed algorithms are \
+'{', '.join(HASH_ALGORITHMS)}'")
+    return True
+
+
+def hashPool(workers) -> ProcessPoolExecutor:
+    """
+    The process pool hashing large inputs. It is started on first use and
+    reused, so process start-up is paid once per run, not per column and
+    chunk; it is only restarted when more workers are asked for.
+    Args:
+        workers (int): Number of worker processes.
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    global _pool, _poolWorkers
+    with _poolLock:
+        if _pool is None or _poolWorkers < workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool, _poolWorkers = ProcessPoolExecutor(workers), workers
+        return _pool
+
+
+def hashKeys(keys, algorithm='sha1', workers=None) -> np.ndarray:
+    """
+    Hash joined composite keys to hex digests in batches.
+    Args:
+        keys (np.ndarray): Joined keys from joinKeys.
+        algorithm (str): 'sha1' or 'blake2b'.
+        workers (int): Worker processes for large inputs, defaults to the
+        number of CPUs.
+    Returns:
+        np.ndarray: Hex digest strings.
+    """
+    checkAlgorithm(algorithm)
+    batches = [keys[i:i + HASH_BATCH_ROWS]
+               for i in range(0, len(keys), HASH_BATCH_ROWS)]
+    workers = workers or os.cpu_count() or 1
+    if len(keys) < PARALLEL_MIN_ROWS or workers < 2:
+        digests = [_hexdigests(algorithm, batch) for batch in batches]
+    else:
+        digests = list(hashPool(workers).map(
+            _hexdigests, [algorithm] * len(batches), batches))
+    result = np.empty(len(keys), dtype=object)
+    result[:] = [digest for batch in digests for digest in batch]
+    return result
+
+
+def hashColumns(columns, algorithm='sha1', workers=None) -> np.ndarray:
+    """
+    Hash the rows of key columns into composite keys.
+    Args:
+        columns (list): Key columns as pandas Series or arrays.
+        algorithm (str): 'sha1' or 'blake2b' for hex digests of the joined
+        keys, 'hash64' for a non-cryptographic 64-bit hash of the typed
+        column values returned as int64.
+        workers (int): Worker processes for large inputs.
+    Returns:
+        np.ndarray: Hex digest strings or int64 hashes.
+    """
+    checkAlgorithm(algorithm)
+    if algorithm == 'hash64':
+        frame = pd.DataFrame({i: np.asarray(column)
+                              for i, column in enumerate(columns)})
+        return pd.util.hash_pandas_object(
+            frame, index=False).to_numpy().view('int64')
+    return hashKeys(joinKeys(columns), algorithm, workers)
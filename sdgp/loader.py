@@ -0,0 +1,279 @@
+"""
+Multi-threaded, memory-mapped loading of seed and conf files. The Parquet
+and Feather readers are imported by the formats that use them.
+"""
+import csv
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pcmp
+import pyarrow.csv as pc
+
+# Seed file formats read natively, by file extension
+SEED_FORMATS = {'.parquet': 'parquet', '.pq': 'parquet',
+                '.feather': 'feather', '.arrow': 'feather',
+                '.ipc': 'feather'}
+# Integers beyond this are not exact as doubles
+MAX_EXACT_DOUBLE = 2**53
+# Bytes read at a time when counting the lines of a CSV file
+CSV_BLOCK_BYTES = 16 << 20
+
+
+def fileFormat(path) -> str:
+    """
+    Format of a seed file by its extension.
+    Args:
+        path (str): The file path.
+    Returns:
+        str: 'parquet', 'feather' or 'csv'.
+    """
+    for extension, format in SEED_FORMATS.items():
+        if path.lower().endswith(extension):
+            return format
+    return 'csv'
+
+
+def parseTypes(text) -> dict:
+    """
+    Parse column type hints like 'id:string,amount:double'.
+    Args:
+        text (str): Comma separated column:type pairs, types as pyarrow
+        aliases ('string', 'int64', 'double', 'timestamp[s]', ...).
+    Returns:
+        dict: Arrow type by column name.
+    Raises:
+        ValueError: If a hint or a type is invalid.
+    """
+    types = {}
+    for hint in filter(None, map(str.strip, (text or '').split(','))):
+        column, sep, alias = hint.rpartition(':')
+        if not sep or not column:
+            raise ValueError(f"Invalid type hint '{hint}', expected \
+'column:type'")
+        try:
+            types[column.strip()] = pa.type_for_alias(alias.strip())
+        except ValueError:
+            raise ValueError(f"Invalid type '{alias}' for column '{column}'")
+    return types
+
+
+def _source(path):
+    """Memory map plain files, decompress .gz/.bz2/.zst on the fly."""
+    if path.endswith(('.gz', '.bz2', '.zst')):
+        return pa.input_stream(path, compression='detect')
+    return pa.memory_map(path)
+
+
+def csvTypes(path, types=None, strings=False) -> dict:
+    """
+    Column types of a CSV file matching what pandas.read_csv gives: dates,
+    times and integers too large for 64 bits stay text, as pyarrow would
+    parse them to temporal types and inexact doubles. Types are inferred
+    from the first block of the file.
+    Args:
+        path (str): The CSV file.
+        types (dict): Explicit column types, kept as given.
+        strings (bool): Read every column as text.
+    Returns:
+        dict: Arrow type by column name.
+    """
+    types = dict(types or {})
+    with pc.open_csv(_source(path)) as reader:
+        schema = reader.schema
+        try:
+            first = reader.read_next_batch()
+        except StopIteration:
+            first = None
+    for field in schema:
+        if field.name in types:
+            continue
+        if strings or pa.types.is_temporal(field.type):
+            types[field.name] = pa.string()
+        elif pa.types.is_floating(field.type) and first is not None:
+            values = first.column(field.name).drop_null()
+            if len(values) and pcmp.max(pcmp.abs(values)).as_py() >= \
+                    MAX_EXACT_DOUBLE:
+                types[field.name] = pa.string()
+    return types
+
+
+def readColumns(path) -> list:
+    """
+    Column names of a seed file, read from its header or schema only.
+    Args:
+        path (str): The file path.
+    Returns:
+        list: The column names.
+    """
+    format = fileFormat(path)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(path, memory_map=True).names
+    if format == 'feather':
+        with pa.ipc.open_file(pa.memory_map(path)) as reader:
+            return reader.schema.names
+    with pc.open_csv(_source(path)) as reader:
+        return reader.schema.names
+
+
+def loadTable(path, columns=None, types=None, strings=False) -> pa.Table:
+    """
+    Load a CSV, Parquet or Feather file as an Arrow table. CSV files are
+    parsed by pyarrow's multi-threaded reader from a memory map.
+    Args:
+        path (str): The file path.
+        columns (list): Only load these columns, in this order.
+        types (dict): Arrow type by column name, cast after reading for
+        Parquet and Feather files.
+        strings (bool): Read every CSV column as text, empty fields as
+        empty strings. Otherwise empty fields are nulls, as in pandas.
+    Returns:
+        pa.Table: The file contents.
+    """
+    format = fileFormat(path)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    elif format == 'feather':
+        import pyarrow.feather as feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    else:
+        return pc.read_csv(
+            _source(path), read_options=pc.ReadOptions(use_threads=True),
+            convert_options=pc.ConvertOptions(
+                column_types=csvTypes(path, types, strings),
+                include_columns=columns, strings_can_be_null=not strings))
+    return castColumns(table, types)
+
+
+def castColumns(table, types):
+    """
+    Cast columns of a table or a record batch.
+    Args:
+        table (pa.Table or pa.RecordBatch): The data.
+        types (dict): Arrow type by column name; other columns are kept.
+    Returns:
+        pa.Table or pa.RecordBatch: The data with the given types.
+    """
+    for column, type in (types or {}).items():
+        if column in table.column_names:
+            index = table.schema.get_field_index(column)
+            table = table.set_column(index, column,
+                                     table.column(column).cast(type))
+    return table
+
+
+def iterBatches(path, columns=None, types=None):
+    """
+    Stream a CSV, Parquet or Feather file as record batches, so only one
+    batch is in memory at a time. CSV types are inferred as in loadTable.
+    Args:
+        path (str): The file path.
+        columns (list): Only load these columns, in this order.
+        types (dict): Arrow type by column name.
+    Yields:
+        pa.RecordBatch: The batches of the file, in order.
+    """
+    format = fileFormat(path)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(
+            columns=columns)
+    elif format == 'feather':
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        batches = (reader.get_batch(i)
+                   for i in range(reader.num_record_batches))
+        if columns:
+            batches = (batch.select(columns) for batch in batches)
+    else:
+        with pc.open_csv(_source(path), convert_options=pc.ConvertOptions(
+                column_types=csvTypes(path, types),
+                include_columns=columns,
+                strings_can_be_null=True)) as reader:
+            yield from reader
+        return
+    for batch in batches:
+        yield castColumns(batch, types)
+
+
+def outputRows(path, columns=(), delimiter=',', header=True):
+    """
+    Rows, columns and largest values of integer columns of an output, e.g.
+    to continue its uniqueIndex columns. Parquet files are sized from
+    their footers and statistics, CSV files are read once counting their
+    lines.
+    Args:
+        path (str): A CSV file, optionally compressed, a Parquet file or
+        a directory of Parquet files.
+        columns (list): Integer columns of the largest values.
+        delimiter (str): Field delimiter of a CSV file.
+        header (bool): The CSV file starts with a header line.
+    Returns:
+        tuple: (rows, column names or None without a header, {column:
+        largest value or None if unknown}).
+    """
+    if os.path.isdir(path) or fileFormat(path) == 'parquet':
+        return parquetRows(path, columns)
+    lines, first, tail = 0, None, b''
+    with _source(path) as stream:
+        for block in iter(lambda: stream.read(CSV_BLOCK_BYTES), b''):
+            lines += block.count(b'\n')
+            # Keep the last line whole across blocks
+            tail = tail[-CSV_BLOCK_BYTES:] + block
+            if first is None and b'\n' in tail:
+                first = tail.split(b'\n', 1)[0]
+    if tail and not tail.endswith(b'\n'):
+        lines += 1
+    rows = max(lines - bool(header), 0)
+    values = dict.fromkeys(columns)
+    if not header:
+        return rows, None, values
+    names = next(csv.reader([(first or tail).decode()],
+                            delimiter=delimiter), [])
+    if rows:
+        last = tail.rstrip(b'\r\n').rsplit(b'\n', 1)[-1]
+        row = next(csv.reader([last.decode()], delimiter=delimiter))
+        for column in columns:
+            try:
+                values[column] = int(row[names.index(column)])
+            except (ValueError, IndexError):
+                pass
+    return rows, names, values
+
+
+def parquetFiles(path) -> list:
+    """The Parquet files of a dataset directory, or the file itself."""
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(os.path.join(root, name)
+                  for root, _, names in os.walk(path)
+                  for name in names if name.endswith('.parquet'))
+
+
+def parquetRows(path, columns=()):
+    """outputRows of a Parquet file or dataset."""
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    rows, values = 0, dict.fromkeys(columns)
+    for file in parquetFiles(path):
+        metadata = pq.ParquetFile(file, memory_map=True).metadata
+        rows += metadata.num_rows
+        schema = metadata.schema.to_arrow_schema()
+        for column in columns:
+            index = schema.get_field_index(column)
+            if index < 0 or not pa.types.is_integer(schema.field(index).type):
+                continue
+            for group in range(metadata.num_row_groups):
+                stats = metadata.row_group(group).column(index).statistics
+                if stats is not None and stats.has_min_max:
+                    maximum = stats.max
+                else:  # Written without statistics
+                    maximum = pcmp.max(pq.read_table(
+                        file, columns=[column]).column(column)).as_py()
+                if maximum is not None:
+                    values[column] = maximum if values[column] is None \
+                        else max(values[column], maximum)
+    # Partition columns are in the directory names, not the files
+    names = ds.dataset(path, format='parquet',
+                       partitioning='hive').schema.names
+    return rows, names, values
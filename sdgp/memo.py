@@ -0,0 +1,155 @@
+"""Store of generated columns, reused across runs by memory mapping."""
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .cache import DEFAULT_CACHE_SIZE, cacheKey
+from .plan import toArrow
+
+EXTENSION = '.arrow'
+# A full store is pruned to this part of its cap, so it is not listed
+# again on every save
+PRUNE_RATIO = 0.8
+
+
+def columnKeys(specs, parts, external=None) -> dict:
+    """
+    Keys of the columns of a chunk. The key of a column covers its spec,
+    the parts of the run and chunk and the keys of the columns it depends
+    on, so a changed column also changes the keys of its dependents.
+    Args:
+        specs (list): Compiled columns, each after its dependencies.
+        parts (dict): Seed, rows, engine... shared by every column.
+        external (callable): Key of the seed data, for dependencies that
+        are not generated.
+    Returns:
+        dict: Hex key by column name.
+    """
+    keys = {}
+    for spec in specs:
+        keys[spec.name] = cacheKey({
+            **parts, 'spec': spec.memoParts(),
+            'deps': [keys[dep] if dep in keys else external()
+                     for dep in spec.deps]})
+    return keys
+
+
+class ColumnStore:
+    """
+    Generated columns saved as Arrow IPC files named by their key, with
+    the native timestamps of date columns. Files are memory-mapped when
+    loaded, and their modification time is their last use: least recently
+    used files are removed when the store grows beyond its size cap.
+    Args:
+        directory (str): The store directory, created if needed.
+        max_bytes (int): Size cap of the store in bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        if max_bytes < 0:
+            raise ValueError(f"Store size must be positive, got {max_bytes}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.bytes = sum(size for _, _, size in self.files())
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'max_bytes': self.max_bytes,
+                'bytes': self.bytes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path(self, key) -> str:
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def files(self) -> list:
+        """The (path, last use, bytes) of the files, most recent first."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(EXTENSION):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:  # Removed by another process
+                    continue
+                files.append((path, stat.st_mtime, stat.st_size))
+        return sorted(files, key=lambda file: -file[1])
+
+    def load(self, key, engine="pandas"):
+        """
+        Memory map a stored column.
+        Args:
+            key (str): The key of the column.
+            engine (str): "pandas" for a Series, NumPy array or Categorical
+            like the ones generated, "arrow" for the Arrow array.
+        Returns:
+            tuple: (values, native timestamps or None), or None if the
+            column is not stored.
+        """
+        path = self.path(key)
+        try:
+            with pa.ipc.open_file(pa.memory_map(path)) as reader:
+                batch = reader.get_batch(0)
+            os.utime(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        values = batch.column('values')
+        native = batch.column('native').to_numpy() \
+            if 'native' in batch.schema.names else None
+        if engine != "arrow":
+            values = values.to_pandas()
+            values = values.array if isinstance(
+                values.dtype, pd.CategoricalDtype) else values.to_numpy()
+        return values, native
+
+    def save(self, key, values, native=None):
+        """
+        Save a generated column, then remove the least recently used files
+        if the store is beyond its cap.
+        Args:
+            key (str): The key of the column.
+            values (np.ndarray, pd.Categorical or pa.Array): The values.
+            native (np.ndarray): Native timestamps of a date column.
+        """
+        if not isinstance(values, pa.Array):
+            values = pa.array(values) if isinstance(
+                values, pd.Categorical) else toArrow(values, len(values))
+        columns = {'values': values}
+        if native is not None:
+            columns['native'] = pa.array(np.asarray(native))
+        batch = pa.RecordBatch.from_pydict(columns)
+        path = self.path(key)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with pa.ipc.new_file(temporary, batch.schema) as writer:
+            writer.write_batch(batch)
+        os.replace(temporary, path)
+        with self._lock:
+            self.bytes += os.path.getsize(path)
+            if self.bytes > self.max_bytes:
+                self.prune(int(self.max_bytes * PRUNE_RATIO))
+
+    def prune(self, max_bytes=None):
+        """
+        Remove the least recently used files beyond a size.
+        Args:
+            max_bytes (int): Size to keep, the cap of the store if None.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = kept = 0
+        for path, _, size in self.files():
+            total += size
+            if total <= max_bytes:
+                kept = total
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.bytes = kept
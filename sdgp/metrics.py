@@ -0,0 +1,205 @@
+"""Timing and throughput metrics of the generation stages."""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# Stages of the events, in pipeline order
+STAGES = ['load', 'plan', 'generate', 'amplify', 'write']
+
+
+def peakRSS() -> int:
+    """Peak resident memory of the process in bytes, 0 if unknown."""
+    if resource is None:  # pragma: no cover
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def sizeOf(values) -> int:
+    """In-memory size of an array or table, pointers for object arrays."""
+    try:
+        return int(values.nbytes)
+    except (AttributeError, TypeError):
+        return 0
+
+
+def pathSize(path) -> int:
+    """Size in bytes of a file or of the files of a directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class Event:
+    """
+    A measured stage, or a log message for the console.
+    Args:
+        stage (str): One of STAGES, or 'log' for a message.
+        column (str): The column of a generate or amplify event.
+        path (str): The file of a load or write event.
+        offset (int): Index of the first row of the chunk.
+        rows (int): Number of rows of the stage.
+        message (str): Text of a log event.
+    """
+    __slots__ = ('stage', 'column', 'path', 'offset', 'rows', 'message',
+                 'wall', 'cpu', 'bytes', 'rss')
+
+    def __init__(self, stage, column=None, path=None, offset=None,
+                 rows=None, message=None):
+        self.stage = stage
+        self.column = column
+        self.path = path
+        self.offset = offset
+        self.rows = rows
+        self.message = message
+        self.wall = self.cpu = 0.0
+        self.bytes = self.rss = 0
+
+    def produced(self, values):
+        """Record the size of the values produced by the stage."""
+        self.bytes = sizeOf(values)
+        return values
+
+    def asDict(self) -> dict:
+        """
+        The event as a JSON object.
+        Returns:
+            dict: stage, column, path, offset, rows, wall_s, cpu_s,
+            rows_per_sec, bytes and peak_rss_delta (growth of the peak
+            RSS in bytes during the stage).
+        """
+        return {'stage': self.stage, 'column': self.column,
+                'path': self.path, 'offset': self.offset, 'rows': self.rows,
+                'wall_s': round(self.wall, 6), 'cpu_s': round(self.cpu, 6),
+                'rows_per_sec': round(self.rows / self.wall, 1)
+                if self.rows and self.wall else None,
+                'bytes': self.bytes, 'peak_rss_delta': self.rss}
+
+
+class Metrics:
+    """
+    Records the events of a run and passes every event, measured or log,
+    to the consumers, e.g. the console printer of DataGenerator. Log
+    events are not recorded.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.consumers = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'events': [], 'consumers': self.consumers}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def subscribe(self, consumer):
+        """
+        Pass the events to a consumer.
+        Args:
+            consumer (callable): Function (event) called for every event.
+        """
+        self.consumers.append(consumer)
+
+    def log(self, message):
+        """Send a message to the consumers."""
+        self.dispatch(Event('log', message=message))
+
+    def dispatch(self, event):
+        with self._lock:
+            for consumer in self.consumers:
+                consumer(event)
+
+    def record(self, *events):
+        """Record measured events, e.g. from worker processes."""
+        with self._lock:
+            self.events.extend(events)
+        for event in events:
+            self.dispatch(event)
+
+    def popEvents(self) -> list:
+        """Remove and return the recorded events."""
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    @contextlib.contextmanager
+    def measure(self, stage, column=None, path=None, offset=None, rows=None,
+                thread=False):
+        """
+        Measure the wall time, CPU time and peak RSS growth of a block
+        and record it as an event. The block may set the rows, path and
+        bytes of the yielded event.
+        Args:
+            stage (str): One of STAGES.
+            column (str): The column of the stage.
+            path (str): The file of the stage.
+            offset (int): Index of the first row of the chunk.
+            rows (int): Number of rows of the stage.
+            thread (bool): Measure the CPU time of the current thread only,
+            for columns generated concurrently.
+        Yields:
+            Event: The event of the block.
+        """
+        event = Event(stage, column, path, offset, rows)
+        clock = time.thread_time if thread else time.process_time
+        rss, cpu, start = peakRSS(), clock(), time.perf_counter()
+        yield event
+        event.wall = time.perf_counter() - start
+        event.cpu = clock() - cpu
+        event.rss = peakRSS() - rss
+        self.record(event)
+
+    def summary(self) -> dict:
+        """
+        Totals of the recorded events by stage and by column.
+        Returns:
+            dict: {'stages': {stage: totals}, 'columns': {column: totals}},
+            totals holding wall_s, cpu_s, rows, bytes and rows_per_sec.
+        """
+        summary = {'stages': {}, 'columns': {}}
+        for event in self.events:
+            groups = [('stages', event.stage)]
+            if event.column is not None:
+                groups.append(('columns', event.column))
+            for group, key in groups:
+                totals = summary[group].setdefault(key, {
+                    'wall_s': 0.0, 'cpu_s': 0.0, 'rows': 0, 'bytes': 0})
+                totals['wall_s'] += event.wall
+                totals['cpu_s'] += event.cpu
+                totals['rows'] += event.rows or 0
+                totals['bytes'] += event.bytes
+        for group in summary.values():
+            for totals in group.values():
+                totals['rows_per_sec'] = round(
+                    totals['rows'] / totals['wall_s'], 1) \
+                    if totals['wall_s'] else None
+        return summary
+
+    def save(self, path):
+        """
+        Write the recorded events to a file: one JSON object per line for
+        a '.jsonl' file, otherwise a JSON document with the events and
+        their summary.
+        Args:
+            path (str): The metrics file.
+        """
+        events = [event.asDict() for event in self.events]
+        with open(path, 'w') as file:
+            if path.endswith('.jsonl'):
+                file.writelines(json.dumps(event) + '\n' for event in events)
+            else:
+                json.dump({'events': events, 'summary': self.summary()},
+                          file, indent=2)
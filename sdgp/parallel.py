@@ -0,0 +1,52 @@
+"""Multi-process generation of row ranges."""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_generator = None
+_seed_df = None
+
+
+def _initWorker(generator, df):
+    """Keep the generator and seed data once per worker process."""
+    global _generator, _seed_df
+    _generator, _seed_df = generator, df
+    # Nested process pools would oversubscribe the cores
+    _generator.hashWorkers = 1
+    # Forked workers inherit the events already recorded by the parent
+    _generator.metrics.popEvents()
+
+
+def _generateRange(offset, rows):
+    chunk = _generator.generateRange(offset, rows, _seed_df)
+    # The metrics of the chunk go back to the parent with it
+    return chunk, _generator.metrics.popEvents()
+
+
+def orderedChunks(generator, ranges, df=None, workers=2):
+    """
+    Generate row ranges in a process pool and yield them in order. At most
+    two chunks per worker are in flight, so memory stays bounded when the
+    writer is slower than the workers. The metrics of the chunks are
+    recorded in the metrics of the generator.
+    Args:
+        generator (DataGenerator): The generator to run in each worker.
+        ranges (list): List of (offset, rows) row ranges.
+        df (pd.DataFrame): Seed data for the 'e' and 'g' modes.
+        workers (int): Number of worker processes.
+    Yields:
+        pd.DataFrame: The generated chunk of each range, in order.
+    """
+    with ProcessPoolExecutor(workers, initializer=_initWorker,
+                             initargs=(generator, df)) as pool:
+        pending = deque()
+
+        def result():
+            chunk, events = pending.popleft().result()
+            generator.metrics.record(*events)
+            return chunk
+        for offset, rows in ranges:
+            pending.append(pool.submit(_generateRange, offset, rows))
+            if len(pending) >= 2 * workers:
+                yield result()
+        while pending:
+            yield result()
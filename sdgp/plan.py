@@ -0,0 +1,683 @@
+"""Compiled generation plan of the columns of a configuration file."""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .hashing import checkAlgorithm, hashColumns
+from .regexsampler import UnsupportedPattern, compileRegex
+from .timeformat import (NS_PER_DAY, NS_PER_SECOND, SECONDS_PER_DAY,
+                         daysCategories, formatArrow, formatTimestamps,
+                         isDayGranular, sampleTimestamps, truncateTimestamps)
+
+# Largest integers of decimal128 columns, by their number of digits
+DECIMAL_DIGITS = 38
+MAX_DECIMAL = 10**DECIMAL_DIGITS
+
+
+def splitByPipe(data):
+    """
+    Split a string by pipe character and strip the parts.
+    Args:
+        data (str): The string to split.
+    Returns:
+        list: A list of strings after splitting by pipe character.
+    """
+    return [*map(str.strip, data.split("|"))]
+
+
+def checkFormat(format):
+    """
+    Check if a date format string is valid.
+    Args:
+        format (str): A date format like "%Y-%m-%d %H:%M:%S".
+    Returns:
+        pd.Timestamp: The current time rendered and parsed with the format.
+    Raises:
+        ValueError: If the date format is invalid.
+    """
+    try:
+        return pd.Timestamp(datetime.now().strftime(format))
+    except ValueError:
+        raise ValueError(
+            f"Invalid date format {format}.",
+            "The format like '%Y-%m-%d %H:%M:%S',",
+            "e.g. '2023-10-11 12:48:14'.")
+
+
+def checkDuration(start_duration, end_duration):
+    """
+    Check if the start duration is shorter than the end duration.
+    Args:
+        start_duration (str): A duration like "1D", "1W", etc.
+        end_duration (str): A duration like "1D", "1W", etc.
+    Returns:
+        bool: True if the start duration is not longer than the end one.
+    Raises:
+        ValueError: If the start duration is longer than the end one.
+    """
+    if pd.to_timedelta(start_duration).total_seconds() > \
+            pd.to_timedelta(end_duration).total_seconds():
+        raise ValueError(
+            "Start date must be before end date. \
+(start duration < end duration) e.g. 1D < 1W will \
+genterate random date between next (1) day to next \
+(1) week from start date")
+    return True
+
+
+def toArrow(values, n) -> pa.Array:
+    """
+    Convert generated values to an Arrow array.
+    Args:
+        values (np.ndarray or scalar): Values of a column, scalars are
+        repeated n times.
+        n (int): Number of rows.
+    Returns:
+        pa.Array: The values; strings use large_string buffers when their
+        size could overflow 32-bit offsets. Integers beyond 64 bits are
+        decimal128, or large_string beyond 38 digits.
+    """
+    if np.ndim(values) == 0:
+        values = np.full(n, values)
+    if values.dtype.kind == 'U':
+        values = pa.array(values, type=pa.large_string()
+                          if values.nbytes >= 2**31 else pa.string())
+    else:
+        try:
+            values = pa.array(values)
+        except OverflowError:
+            values = bigIntegers(values)
+    # Large inputs are converted in chunks
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values
+
+
+def bigIntegers(values) -> pa.Array:
+    """
+    Integers too large for int64, e.g. a uniqueIndex starting at 8e29, as
+    an Arrow array written like their Python strings.
+    Args:
+        values (np.ndarray): Python integers in an object array.
+    Returns:
+        pa.Array: decimal128(38, 0) values, or large_string values if some
+        have more than 38 digits.
+    """
+    if all(abs(value) < MAX_DECIMAL for value in values):
+        return pa.array(values, type=pa.decimal128(DECIMAL_DIGITS, 0))
+    return pa.array(values.astype(str), type=pa.large_string())
+
+
+def codesDtype(size):
+    """
+    Smallest signed integer type of the codes of a dictionary.
+    Args:
+        size (int): Number of entries of the dictionary.
+    Returns:
+        str: The NumPy dtype of the codes.
+    """
+    if size <= np.iinfo('int8').max:
+        return 'int8'
+    if size <= np.iinfo('int16').max:
+        return 'int16'
+    return 'int32'
+
+
+def constantCategorical(value, n) -> pd.Categorical:
+    """
+    A constant column as a one entry Categorical, one byte per row.
+    Args:
+        value (str): The constant.
+        n (int): Number of rows.
+    Returns:
+        pd.Categorical: The column.
+    """
+    return pd.Categorical.from_codes(np.zeros(n, dtype='int8'), [value])
+
+
+def constantArrow(value, n) -> pa.DictionaryArray:
+    """
+    A constant column as a one entry Arrow dictionary array, stored with
+    dictionary and run length encoding in Parquet.
+    Args:
+        value (str): The constant.
+        n (int): Number of rows.
+    Returns:
+        pa.DictionaryArray: The column.
+    """
+    return pa.DictionaryArray.from_arrays(np.zeros(n, dtype='int8'),
+                                          pa.array([value]))
+
+
+def parseDate(date):
+    """
+    Parse a date of the configuration file.
+    Args:
+        date (str): A date like "2022-01-01".
+    Returns:
+        pd.Timestamp: The parsed date.
+    Raises:
+        ValueError: If the date can not be parsed.
+    """
+    try:
+        return pd.to_datetime(date)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid date '{date}'. {e}")
+
+
+class ColumnSpec:
+    """
+    A column of the configuration file with its values parsed and
+    validated once. generate() only draws and renders the values, so a spec
+    is reused for every chunk and every worker of a run.
+    Args:
+        name (str): The column name.
+        values (str): The 'values' field of the configuration file.
+    """
+    __slots__ = ('name', 'values', 'deps')
+    type = None
+    # Saved in the column store, False for columns cheaper to generate
+    # than to read
+    memoize = True
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+        self.deps = ()  # Columns that must be generated before this one
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.values!r})"
+
+    def describe(self, color):
+        """
+        Progress message of the column.
+        Args:
+            color (callable): Highlights a literal of the message.
+        Returns:
+            str: The message.
+        """
+        return f"Generating {self.type} data for '{color(self.name)}' with \
+'{color(self.values)}'"
+
+    def memoParts(self) -> list:
+        """Everything the values of the column depend on but the rows."""
+        return [self.type, self.name, self.values]
+
+    def generate(self, generator):
+        """
+        Generate the values of the column for the current chunk.
+        Args:
+            generator (DataGenerator): The generator holding the rows of the
+            chunk (offset, n), its random streams and the columns generated
+            so far (column(), nativeDates).
+        Returns:
+            np.ndarray or pd.Categorical: The values of the column.
+        """
+        raise NotImplementedError
+
+    def arrow(self, generator) -> pa.Array:
+        """
+        Generate the values of the column for the current chunk as an
+        Arrow array.
+        Args:
+            generator (DataGenerator): The generator of the chunk.
+        Returns:
+            pa.Array: The values of the column.
+        """
+        return toArrow(self.generate(generator), generator.n)
+
+
+class UniqueIndexSpec(ColumnSpec):
+    __slots__ = ('start',)
+    type = 'uniqueIndex'
+    memoize = False
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        self.start = int(values)
+
+    def describe(self, color):
+        return f"Generating unique index for '{color(self.name)}' starting \
+value {color(self.start)}"
+
+    def generate(self, generator):
+        start = self.start + generator.offset
+        return np.arange(start, start + generator.n)
+
+
+class DateSpec(ColumnSpec):
+    __slots__ = ('date', 'format', 'value')
+    type = 'date'
+    memoize = False
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        self.date, self.format = splitByPipe(values)
+        self.value = parseDate(self.date).strftime(self.format)
+
+    def describe(self, color):
+        return f"Generating date data for '{color(self.name)}' with \
+'{color(self.date)}' and format '{color(self.format)}'"
+
+    def generate(self, generator):
+        return constantCategorical(self.value, generator.n)
+
+    def arrow(self, generator):
+        return constantArrow(self.value, generator.n)
+
+
+class CategorySpec(ColumnSpec):
+    __slots__ = ('choices', 'p', 'dictionary', 'dictionaryCodes')
+    type = 'category'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        data, p = values.split("~") if '~' in values else (values, None)
+        self.choices = np.array(splitByPipe(data))
+        # Repeated choices share one entry of the dictionary
+        index = {}
+        codes = [index.setdefault(choice, len(index))
+                 for choice in self.choices]
+        self.dictionaryCodes = np.array(codes, dtype=codesDtype(len(index)))
+        self.dictionary = np.array(list(index), dtype=self.choices.dtype)
+        self.p = None
+        if p is not None:
+            self.p = [*map(float, splitByPipe(p))]
+            if len(self.p) != len(self.choices) or \
+                    not np.isclose(sum(self.p), 1):
+                raise ValueError(
+                    f"Sum of probability must be 1. in '{name}' category "
+                    f"type column in conf.csv file eg: 'A|B~0.5|0.5' or "
+                    f"'A|B|C|D~0.2|0.1|0.5|0.2'")
+
+    def describe(self, color):
+        message = f"Generating category data for '{color(self.name)}' with \
+'{color(self.choices.tolist())}'"
+        if self.p is None:
+            return message
+        return f"{message} and probabilities per value {color(self.p)}"
+
+    def codes(self, generator) -> np.ndarray:
+        """Indices of the drawn categories into self.choices."""
+        size, p = len(self.choices), self.p
+        if p is None:
+            return generator.random(self.name).draw(
+                lambda rng, rows: rng.integers(0, size, rows))
+        return generator.random(self.name).draw(
+            lambda rng, rows: rng.choice(size, rows, p=p))
+
+    def generate(self, generator):
+        return pd.Categorical.from_codes(
+            self.dictionaryCodes[self.codes(generator)], self.dictionary)
+
+    def arrow(self, generator):
+        return pa.DictionaryArray.from_arrays(
+            self.dictionaryCodes[self.codes(generator)],
+            toArrow(self.dictionary, len(self.dictionary)))
+
+
+class FloatRangeSpec(ColumnSpec):
+    __slots__ = ('start', 'end', 'precision')
+    type = 'floatRange'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        start, end, precision = map(float, splitByPipe(values))
+        self.start, self.end, self.precision = start, end, int(precision)
+
+    def describe(self, color):
+        return f"Generating float data for '{color(self.name)}' between \
+{color(self.start)} to {color(self.end)} with precision \
+{color(self.precision)} decimals"
+
+    def generate(self, generator):
+        return np.round(generator.random(self.name).draw(
+            lambda rng, rows: rng.uniform(self.start, self.end, rows)),
+            self.precision)
+
+
+class IntRangeSpec(ColumnSpec):
+    __slots__ = ('start', 'end')
+    type = 'intRange'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        self.start, self.end = map(int, splitByPipe(values))
+
+    def describe(self, color):
+        return f"Generating integer data for '{color(self.name)}' between \
+{color(self.start)} to {color(self.end)}"
+
+    def generate(self, generator):
+        return generator.random(self.name).draw(
+            lambda rng, rows: rng.integers(self.start, self.end, rows))
+
+
+class ConstantSpec(ColumnSpec):
+    __slots__ = ()
+    type = 'constant'
+    memoize = False
+
+    def describe(self, color):
+        return f"Assingning constant to '{color(self.name)}' with \
+'{color(self.values)}'"
+
+    def generate(self, generator):
+        return constantCategorical(self.values, generator.n)
+
+    def arrow(self, generator):
+        return constantArrow(self.values, generator.n)
+
+
+class TimeSpec(ColumnSpec):
+    __slots__ = ('start', 'end', 'format')
+    type = 'time'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        s, e, *format = splitByPipe(values)
+        self.format = format[0] if format else "%H:%M:%S"
+        self.start = int(pd.to_timedelta(s).total_seconds())
+        self.end = int(pd.to_timedelta(e).total_seconds())
+        checkFormat(self.format)
+        if not 0 <= self.start <= self.end < SECONDS_PER_DAY:
+            raise ValueError(
+                "Start time must be before end time within a day. \
+(00:00:00 <= start time <= end time <= 23:59:59)")
+
+    def describe(self, color):
+        return f"Generating times for '{color(self.name)}' with \
+'{color(self.values)}'"
+
+    def generate(self, generator):
+        seconds = generator.random(self.name).draw(
+            lambda rng, rows: rng.integers(self.start, self.end + 1, rows,
+                                           dtype='int64'))
+        # Formats with date directives render the epoch day, so the output
+        # only depends on the seed, not on the day of the run
+        return formatTimestamps(seconds * NS_PER_SECOND, self.format)
+
+
+class DateRangeSpec(ColumnSpec):
+    __slots__ = ('start', 'end', 'format')
+    type = 'dateRange'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        s, e, self.format = splitByPipe(values)
+        self.start, self.end = parseDate(s), parseDate(e)
+        checkFormat(self.format)
+        if self.start > self.end:
+            raise ValueError(
+                "Start date must be before end date. (start date < end date)")
+
+    def describe(self, color):
+        return f"Generating dates for '{color(self.name)}' with \
+'{color(self.values)}'"
+
+    def timestamps(self, generator) -> np.ndarray:
+        """Epoch nanoseconds of the chunk, kept for dependent columns."""
+        values = generator.random(self.name).draw(
+            lambda rng, rows: sampleTimestamps(rng, self.start, self.end,
+                                               rows))
+        if self.name:
+            generator.nativeDates[self.name] = truncateTimestamps(
+                values, self.format)
+        return values
+
+    def dayCodes(self, values) -> tuple:
+        """
+        Codes of day granular dates into the days of the whole range, so
+        every chunk shares the same dictionary.
+        Args:
+            values (np.ndarray): Epoch nanoseconds as int64.
+        Returns:
+            tuple: (categories, codes) of the values.
+        """
+        first = self.start.value // NS_PER_DAY
+        categories, codes = daysCategories(
+            first, self.end.value // NS_PER_DAY, self.format)
+        codes = codes.astype(codesDtype(len(categories)))
+        return categories, codes[values // NS_PER_DAY - first]
+
+    def generate(self, generator):
+        values = self.timestamps(generator)
+        if not isDayGranular(self.format):
+            return pd.arrays.ArrowStringArray(
+                formatArrow(values, self.format))
+        categories, codes = self.dayCodes(values)
+        return pd.Categorical.from_codes(codes, categories)
+
+    def arrow(self, generator):
+        values = self.timestamps(generator)
+        if not isDayGranular(self.format):
+            return formatArrow(values, self.format)
+        categories, codes = self.dayCodes(values)
+        return pa.DictionaryArray.from_arrays(
+            codes, toArrow(categories, len(categories)))
+
+
+class DependentDateRangeSpec(ColumnSpec):
+    __slots__ = ('parent', 'low', 'high', 'format')
+    type = 'dependentDateRange'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        self.parent, so, eo, self.format = splitByPipe(values)
+        checkDuration(so, eo)
+        checkFormat(self.format)
+        self.low = pd.to_timedelta(so).value
+        self.high = pd.to_timedelta(eo).value
+        self.deps = (self.parent,)
+
+    def describe(self, color):
+        return f"Generating dependent dates for '{color(self.name)}' with \
+'{color(self.values)}'"
+
+    def timestamps(self, generator) -> np.ndarray:
+        """Epoch nanoseconds of the chunk, kept for dependent columns."""
+        parent = generator.nativeDates.get(self.parent)
+        if parent is None:
+            parent = np.asarray(
+                pd.to_datetime(generator.column(self.parent)),
+                dtype='datetime64[ns]').view('int64')
+        values = parent + generator.random(self.name).draw(
+            lambda rng, rows: rng.integers(self.low, self.high, rows,
+                                           dtype='int64', endpoint=True))
+        if self.name:
+            generator.nativeDates[self.name] = truncateTimestamps(
+                values, self.format)
+        return values
+
+    def generate(self, generator):
+        return pd.arrays.ArrowStringArray(
+            formatArrow(self.timestamps(generator), self.format))
+
+    def arrow(self, generator):
+        return formatArrow(self.timestamps(generator), self.format)
+
+
+class RegexPatternSpec(ColumnSpec):
+    __slots__ = ('sampler',)
+    type = 'regexPattern'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        try:
+            self.sampler = compileRegex(values)
+        except UnsupportedPattern as e:
+            # Every row must come from the seeded streams
+            raise ValueError(f"Unsupported regexPattern '{values}' for \
+'{name}': {e}")
+
+    def describe(self, color):
+        return f"Generating regex pattern data for '{color(self.name)}' \
+with '{color(self.values)}'"
+
+    def generate(self, generator):
+        return generator.random(self.name).draw(self.sampler.sample)
+
+    def arrow(self, generator):
+        return generator.random(self.name).draw(self.sampler.sampleArrow,
+                                                pa.concat_arrays)
+
+
+class CompositeSpec(ColumnSpec):
+    __slots__ = ('keys', 'algorithm')
+    type = 'composite'
+
+    def __init__(self, name, values):
+        super().__init__(name, values)
+        data, algorithm = values.split("~") if '~' in values \
+            else (values, 'sha1')
+        self.keys = splitByPipe(data)
+        self.algorithm = algorithm.strip()
+        checkAlgorithm(self.algorithm)
+        self.deps = tuple(self.keys)
+
+    def describe(self, color):
+        return f"Generating composite key data for '{color(self.name)}' \
+with {color(self.keys)}"
+
+    def generate(self, generator):
+        return hashColumns([generator.column(key) for key in self.keys],
+                           self.algorithm, generator.hashWorkers)
+
+
+COLUMN_SPECS = {spec.type: spec for spec in (
+    UniqueIndexSpec, DateSpec, CategorySpec, ConstantSpec, FloatRangeSpec,
+    IntRangeSpec, TimeSpec, DateRangeSpec, DependentDateRangeSpec,
+    CompositeSpec, RegexPatternSpec)}
+
+
+def compileColumn(name, type, values) -> ColumnSpec:
+    """
+    Compile one column of the configuration file.
+    Args:
+        name (str): The column name.
+        type (str): The column type, one of COLUMN_SPECS.
+        values (str): The 'values' field of the column.
+    Returns:
+        ColumnSpec: The compiled column.
+    Raises:
+        ValueError: If the type is unknown or the values are invalid.
+    """
+    if type not in COLUMN_SPECS:
+        raise ValueError(
+            f"Invalid input '{type}' type in conf csv file. \
+Allowed types are '{', '.join(COLUMN_SPECS)}'")
+    return COLUMN_SPECS[type](name, values)
+
+
+def sortLevels(specs) -> list:
+    """
+    Sort columns topologically by their dependencies. Dependencies on
+    columns that are not in the plan are left to the seed data.
+    Args:
+        specs (list): Compiled columns in configuration order.
+    Returns:
+        list: Lists of columns; a column only depends on columns of the
+        previous lists. Columns keep the configuration order in a list.
+    Raises:
+        ValueError: If the dependencies are circular.
+    """
+    names = {spec.name for spec in specs}
+    done, levels, pending = set(), [], list(specs)
+    while pending:
+        level = [spec for spec in pending
+                 if all(dep in done or dep not in names
+                        for dep in spec.deps)]
+        if not level:
+            raise ValueError(
+                f"Circular dependency between columns \
+'{', '.join(spec.name for spec in pending)}' in conf csv file")
+        levels.append(level)
+        done.update(spec.name for spec in level)
+        pending = [spec for spec in pending if spec.name not in done]
+    return levels
+
+
+def confFrame(conf) -> pd.DataFrame:
+    """
+    A conf given as a Python structure, as it is read from a conf csv file.
+    Args:
+        conf (list, dict or pd.DataFrame): The rows of the conf: a list of
+        dicts with 'name', 'type' and 'values' keys or of (name, type,
+        values) tuples, a dict of (type, values) by column name, or a
+        DataFrame with these columns. A list of values is joined by pipes,
+        e.g. ['a', 'b'] for 'a|b'.
+    Returns:
+        pd.DataFrame: The rows of the conf with string fields.
+    Raises:
+        ValueError: If a row is not a name, type and values.
+    """
+    if isinstance(conf, pd.DataFrame):
+        rows = conf.to_dict(orient='records')
+    elif isinstance(conf, dict):
+        rows = [(name, *item) for name, item in conf.items()]
+    else:
+        rows = list(conf)
+    fields = ['name', 'type', 'values']
+    frame = []
+    for row in rows:
+        if isinstance(row, dict):
+            row = [row.get(field) for field in fields]
+        if len(row) != 3 or any(value is None for value in row):
+            raise ValueError(f"Invalid conf row '{row}', expected \
+'{', '.join(fields)}'")
+        frame.append([value if isinstance(value, str) else
+                      '|'.join(map(str, value))
+                      if isinstance(value, (list, tuple)) else str(value)
+                      for value in row])
+    return pd.DataFrame(frame, columns=fields, dtype='str')
+
+
+class GenerationPlan:
+    """
+    Columns of a configuration file compiled once, in an order where every
+    column comes after the columns it depends on.
+    Args:
+        specs (list): Compiled columns in configuration order.
+    """
+    __slots__ = ('levels', 'columns')
+
+    def __init__(self, specs):
+        self.levels = sortLevels(specs)
+        self.columns = [spec for level in self.levels for spec in level]
+
+    @classmethod
+    def fromConf(cls, conf_dict):
+        """
+        Compile the configuration dictionary of a conf csv file.
+        Args:
+            conf_dict (dict): Rows of the conf csv file with 'name', 'type'
+            and 'values' fields.
+        Returns:
+            GenerationPlan: The compiled plan.
+        """
+        return cls([compileColumn(item.get('name').strip(),
+                                  item.get('type').strip(),
+                                  item.get('values').strip())
+                    for item in conf_dict.values()])
+
+    def byType(self, type) -> list:
+        """
+        Columns of a type, in generation order.
+        Args:
+            type (str): The column type.
+        Returns:
+            list: The compiled columns of the type.
+        """
+        return [spec for spec in self.columns if spec.type == type]
+
+    def stages(self) -> list:
+        """
+        Columns to generate grouped in stages. The columns of a stage only
+        depend on columns of earlier stages, so they can be generated
+        concurrently.
+        Returns:
+            list: Lists of compiled columns, in generation order.
+        """
+        return self.levels
@@ -0,0 +1,144 @@
+"""cProfile and tracemalloc profiles of the column generators and writers."""
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import tracemalloc
+
+# Functions and allocation sites kept per profile in the summary
+TOP = 10
+
+
+class Profiler:
+    """
+    Profiles each column generator and writer separately: one cProfile
+    profile per stage and column, accumulated over the profiled chunks,
+    and the memory allocated by the block and still alive at its end,
+    traced by tracemalloc, by source line. Only the first chunks are
+    profiled when chunks is given.
+    Profiled blocks run one at a time, as a profile only covers its
+    thread and tracemalloc traces every thread: the columns of a stage
+    are serialized while profiling.
+    Args:
+        directory (str): Directory of the .pstats files and the summary.
+        chunks (int): Number of chunks to profile, all if None.
+        top (int): Functions and allocation sites kept per profile.
+    """
+
+    def __init__(self, directory, chunks=None, top=TOP):
+        self.directory = directory
+        self.chunks = chunks
+        self.top = top
+        self.profiles = {}
+        # Bytes and blocks allocated by source line, peak traced bytes
+        self.allocations = {}
+        self.peaks = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def sampled(self, chunk) -> bool:
+        """Whether the chunk of this index is profiled."""
+        return self.chunks is None or chunk < self.chunks
+
+    @contextlib.contextmanager
+    def profile(self, stage, column=None):
+        """
+        Profile a block under the stage and the column.
+        Args:
+            stage (str): 'generate', 'amplify' or 'write'.
+            column (str): The column, or the format of a writer.
+        """
+        key = (stage, column)
+        with self._lock:
+            profile = self.profiles.setdefault(key, cProfile.Profile())
+            tracemalloc.start()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                sites = self.allocations.setdefault(key, {})
+                for stat in snapshot.statistics('lineno'):
+                    frame = stat.traceback[0]
+                    size, count = sites.get((frame.filename, frame.lineno),
+                                            (0, 0))
+                    sites[frame.filename, frame.lineno] = (
+                        size + stat.size, count + stat.count)
+                self.peaks[key] = max(self.peaks.get(key, 0), peak)
+                self.calls[key] = self.calls.get(key, 0) + 1
+
+    def fileName(self, key) -> str:
+        """File name of the profile of a stage and column."""
+        stage, column = key
+        name = stage if column is None else f"{stage}-{column}"
+        return re.sub(r'[^\w.-]', '_', name) + '.pstats'
+
+    def summary(self) -> list:
+        """
+        The top functions by self time and the top allocation sites of each
+        profile.
+        Returns:
+            list: One dict per profile with stage, column, file, blocks,
+            peak_traced_bytes, self_time (function, calls, self_s,
+            cumulative_s) and allocations (site, bytes, blocks).
+        """
+        profiles = []
+        for key, profile in self.profiles.items():
+            stats = pstats.Stats(profile).stats
+            functions = sorted(stats.items(), key=lambda item: -item[1][2])
+            sites = sorted(self.allocations.get(key, {}).items(),
+                           key=lambda item: -item[1][0])
+            profiles.append({
+                'stage': key[0], 'column': key[1],
+                'file': self.fileName(key), 'blocks': self.calls[key],
+                'peak_traced_bytes': self.peaks.get(key, 0),
+                'self_time': [{
+                    'function': f"{file}:{line}({name})", 'calls': calls,
+                    'self_s': round(self_time, 6),
+                    'cumulative_s': round(cumulative, 6)}
+                    for (file, line, name), (_, calls, self_time,
+                                             cumulative, _) in
+                    functions[:self.top]],
+                'allocations': [{
+                    'site': f"{file}:{line}", 'bytes': size,
+                    'blocks': count}
+                    for (file, line), (size, count) in sites[:self.top]]})
+        return profiles
+
+    def save(self) -> list:
+        """
+        Write a .pstats file per profile, readable with pstats or snakeviz,
+        and the summary as summary.json and summary.txt.
+        Returns:
+            list: The summary.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for key, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.directory,
+                                            self.fileName(key)))
+        summary = self.summary()
+        with open(os.path.join(self.directory, 'summary.json'), 'w') as file:
+            json.dump(summary, file, indent=2)
+        with open(os.path.join(self.directory, 'summary.txt'), 'w') as file:
+            for profile in summary:
+                file.write(f"{profile['stage']} {profile['column'] or ''} "
+                           f"({profile['blocks']} blocks, peak traced "
+                           f"{profile['peak_traced_bytes']:,} bytes)\n")
+                file.write("  self s      cumul s     calls  function\n")
+                for function in profile['self_time']:
+                    file.write(f"  {function['self_s']:<11.6f} "
+                               f"{function['cumulative_s']:<11.6f} "
+                               f"{function['calls']:<6} "
+                               f"{function['function']}\n")
+                file.write("  bytes         blocks  allocation site\n")
+                for site in profile['allocations']:
+                    file.write(f"  {site['bytes']:<13,} {site['blocks']:<7} "
+                               f"{site['site']}\n")
+                file.write("\n")
+        return summary
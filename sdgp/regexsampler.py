@@ -0,0 +1,460 @@
+"""Compiled, vectorized sampling of strings matching a regular expression.
+
+A pattern is parsed once into a plan of nodes mirroring the way
+``exrex.getone`` walks the expression: character classes pick one of their
+characters uniformly, repeats pick a length uniformly between their bounds
+(unbounded repeats are capped by ``limit``) and alternations pick one of
+their branches uniformly. Each node fills a block of unicode code points
+for a whole column at once, zero code points mark empty cells and are
+squeezed out before the block is viewed as fixed width strings, or skipped
+while the block is encoded to an Arrow string array.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Largest finite language that is enumerated and sampled by index
+MAX_TABLE_SIZE = 4096
+# Rows sampled at once, bounds the size of the intermediate code blocks
+BLOCK_ROWS = 1 << 18
+
+CATEGORIES = {
+    sre_parse.CATEGORY_SPACE: sorted(sre_parse.WHITESPACE),
+    sre_parse.CATEGORY_DIGIT: sorted(sre_parse.DIGITS),
+    sre_parse.CATEGORY_WORD: [chr(x) for x in range(256) if
+                              re.match(r'\w', chr(x), re.U)],
+    sre_parse.CATEGORY_NOT_WORD: [chr(x) for x in range(256) if
+                                  re.match(r'\W', chr(x), re.U)],
+    'category_any': [chr(x) for x in range(32, 123)]
+}
+# Complements of digits and spaces among the printable characters
+CATEGORIES[sre_parse.CATEGORY_NOT_DIGIT] = [
+    c for c in CATEGORIES['category_any'] if re.match(r'\D', c, re.U)]
+CATEGORIES[sre_parse.CATEGORY_NOT_SPACE] = [
+    c for c in CATEGORIES['category_any'] if re.match(r'\S', c, re.U)]
+
+
+class UnsupportedPattern(ValueError):
+    """Raised when a pattern uses a construct the plan cannot sample."""
+
+
+class _Chars:
+    """One character drawn uniformly from a character class."""
+    __slots__ = ('codes', 'width')
+
+    def __init__(self, chars):
+        if not chars or '\x00' in chars:
+            raise UnsupportedPattern("Empty or NUL character class")
+        self.codes = np.array([ord(c) for c in chars], dtype='uint32')
+        self.width = 1
+
+    def language(self):
+        chars, counts = np.unique(self.codes, return_counts=True)
+        return {chr(c): k / len(self.codes) for c, k in zip(chars, counts)}
+
+    def fill(self, rng, n, groups):
+        if len(self.codes) == 1:
+            return np.full((n, 1), self.codes[0], dtype='uint32')
+        return self.codes[rng.integers(0, len(self.codes), (n, 1))]
+
+
+class _Table:
+    """A small finite language enumerated once and sampled by index."""
+    __slots__ = ('codes', 'p', 'width')
+
+    def __init__(self, language):
+        strings = list(language)
+        self.width = max(map(len, strings), default=0)
+        self.codes = np.zeros((len(strings), self.width), dtype='uint32')
+        for i, string in enumerate(strings):
+            self.codes[i, :len(string)] = [ord(c) for c in string]
+        p = np.array([language[s] for s in strings])
+        self.p = p / p.sum()
+
+    def fill(self, rng, n, groups):
+        if len(self.codes) == 1:
+            return np.repeat(self.codes, n, axis=0)
+        return self.codes[rng.choice(len(self.codes), n, p=self.p)]
+
+
+class _Sequence:
+    """Nodes rendered one after another."""
+    __slots__ = ('nodes', 'width')
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.width = sum(node.width for node in nodes)
+
+    def language(self):
+        result = {'': 1.0}
+        for node in self.nodes:
+            part = _language(node)
+            if part is None or len(result) * len(part) > MAX_TABLE_SIZE:
+                return None
+            result = _product(result, part)
+        return result
+
+    def fill(self, rng, n, groups):
+        if not self.nodes:
+            return np.zeros((n, 0), dtype='uint32')
+        return np.hstack([node.fill(rng, n, groups) for node in self.nodes])
+
+
+class _Repeat:
+    """A node repeated a uniformly drawn number of times."""
+    __slots__ = ('node', 'min', 'max', 'width')
+
+    def __init__(self, node, min, max):
+        self.node, self.min, self.max = node, min, max
+        self.width = node.width * max
+
+    def language(self):
+        part = _language(self.node)
+        if part is None:
+            return None
+        result, power = {}, {'': 1.0}
+        weight = 1 / (self.max - self.min + 1)
+        for count in range(self.max + 1):
+            if count:
+                if len(power) * len(part) > MAX_TABLE_SIZE:
+                    return None
+                power = _product(power, part)
+            if count >= self.min:
+                for string, p in power.items():
+                    result[string] = result.get(string, 0) + p * weight
+            if len(result) > MAX_TABLE_SIZE:
+                return None
+        return result
+
+    def fill(self, rng, n, groups):
+        lengths = rng.integers(self.min, self.max + 1, n)
+        if isinstance(self.node, _Chars):
+            block = self.node.codes[
+                rng.integers(0, len(self.node.codes), (n, self.max))]
+            block[np.arange(self.max) >= lengths[:, None]] = 0
+            return block
+        width = self.node.width
+        block = np.zeros((n, self.width), dtype='uint32')
+        for count in range(self.max):
+            rows = np.flatnonzero(lengths > count)
+            block[rows, count * width:(count + 1) * width] = _fillRows(
+                self.node, rng, rows, n, groups)
+        return block
+
+
+class _Branch:
+    """One of several alternatives drawn uniformly."""
+    __slots__ = ('options', 'width')
+
+    def __init__(self, options):
+        self.options = options
+        self.width = max(option.width for option in options)
+
+    def language(self):
+        result = {}
+        for option in self.options:
+            part = _language(option)
+            if part is None:
+                return None
+            for string, p in part.items():
+                result[string] = result.get(string, 0) + p / len(self.options)
+            if len(result) > MAX_TABLE_SIZE:
+                return None
+        return result
+
+    def fill(self, rng, n, groups):
+        picks = rng.integers(0, len(self.options), n)
+        block = np.zeros((n, self.width), dtype='uint32')
+        for i, option in enumerate(self.options):
+            rows = np.flatnonzero(picks == i)
+            block[rows, :option.width] = _fillRows(
+                option, rng, rows, n, groups)
+        return block
+
+
+class _Group:
+    """A capturing group whose value is kept for back references."""
+    __slots__ = ('id', 'node', 'width')
+
+    def __init__(self, id, node):
+        self.id, self.node, self.width = id, node, node.width
+
+    def language(self):
+        return None
+
+    def fill(self, rng, n, groups):
+        block = self.node.fill(rng, n, groups)
+        groups[self.id] = block
+        return block
+
+
+class _GroupRef:
+    """A back reference repeating the value of a capturing group."""
+    __slots__ = ('id', 'width')
+
+    def __init__(self, id, width):
+        self.id, self.width = id, width
+
+    def language(self):
+        return None
+
+    def fill(self, rng, n, groups):
+        return groups.get(self.id, np.zeros((n, self.width), dtype='uint32'))
+
+
+def _language(node):
+    if isinstance(node, _Chars):
+        return node.language()
+    if isinstance(node, _Table):
+        return {''.join(map(chr, codes[codes != 0])): p
+                for codes, p in zip(node.codes, node.p)}
+    return node.language()
+
+
+def _product(left, right):
+    result = {}
+    for a, p_a in left.items():
+        for b, p_b in right.items():
+            result[a + b] = result.get(a + b, 0) + p_a * p_b
+    return result
+
+
+def _fillRows(node, rng, rows, n, groups):
+    """Fill a node for a subset of rows, keeping group values aligned."""
+    if len(rows) == n:
+        return node.fill(rng, n, groups)
+    subgroups = {}
+    block = node.fill(rng, len(rows), subgroups)
+    for id, value in subgroups.items():
+        target = groups.setdefault(
+            id, np.zeros((n, value.shape[1]), dtype='uint32'))
+        target[rows] = value
+    return block
+
+
+def _squeeze(block):
+    """Move the non empty cells of every row to the front."""
+    keep = block != 0
+    if (keep[:, 1:] <= keep[:, :-1]).all():
+        return block
+    order = np.argsort(~keep, axis=1, kind='stable')
+    return np.take_along_axis(block, order, axis=1)
+
+
+def utf8Strings(codes) -> pa.Array:
+    """
+    Encode a block of unicode code points to an Arrow string array without
+    building Python or fixed width strings. Zero code points are empty
+    cells and are skipped.
+    Args:
+        codes (np.ndarray): (rows, width) block of uint32 code points, e.g.
+        a unicode array viewed as '<u4'.
+    Returns:
+        pa.Array: The rows as a string array, large_string when the data
+        overflows 32-bit offsets.
+    """
+    rows = codes.shape[0]
+    keep = codes != 0
+    present = codes[keep]
+    if present.size and present.max() >= 0x80:
+        cells = (1 + (codes >= 0x80) + (codes >= 0x800) +
+                 (codes >= 0x10000)) * keep
+    else:
+        cells = keep
+    offsets = np.zeros(rows + 1, dtype='int64')
+    np.cumsum(cells.sum(axis=1, dtype='int64'), out=offsets[1:])
+    if cells is keep:
+        data = present.astype('uint8')
+    else:
+        # Lead byte then continuation bytes of 6 bits each
+        nbytes = cells[keep].astype('uint32')
+        starts = np.cumsum(nbytes) - nbytes
+        data = np.empty(offsets[-1], dtype='uint8')
+        data[starts] = np.select(
+            [nbytes == 1, nbytes == 2, nbytes == 3],
+            [present, 0xC0 | present >> 6, 0xE0 | present >> 12],
+            0xF0 | present >> 18)
+        for k in range(1, 4):
+            tail = nbytes > k
+            data[starts[tail] + k] = 0x80 | (
+                present[tail] >> 6 * (nbytes[tail] - 1 - k)) & 0x3F
+    large = offsets[-1] >= 2**31
+    return pa.Array.from_buffers(
+        pa.large_string() if large else pa.string(), rows,
+        [None, pa.py_buffer(offsets if large else offsets.astype('int32')),
+         pa.py_buffer(data)])
+
+
+class RegexSampler:
+    """
+    A regular expression compiled once into a sampling plan that produces
+    whole columns of matching strings.
+    Args:
+        pattern (str): The regular expression to sample from.
+        limit (int): Maximum length of unbounded repeats, like exrex.
+    Raises:
+        UnsupportedPattern: If the pattern uses a construct the plan
+        cannot sample, e.g. a conditional group reference.
+    """
+
+    def __init__(self, pattern, limit=20):
+        self.pattern = pattern
+        self.limit = limit
+        self.groupWidths = {}
+        self.groupRefs = {av for op, av in _walk(
+            sre_parse.parse(pattern, flags=re.U)) if op == sre_parse.GROUPREF}
+        self.plan = self.compile(sre_parse.parse(pattern, flags=re.U))
+
+    def compile(self, items):
+        """
+        Compile parsed regex items into a plan node.
+        Args:
+            items (list): Items from sre_parse.parse.
+        Returns:
+            object: The plan node sampling the items.
+        """
+        nodes = [self.compileItem(op, av) for op, av in items]
+        nodes = [node for node in nodes if node.width]
+        node = nodes[0] if len(nodes) == 1 else _Sequence(nodes)
+        return self.tabulate(node)
+
+    def tabulate(self, node):
+        if isinstance(node, (_Sequence, _Repeat, _Branch)):
+            language = node.language()
+            if language is not None and len(language) <= MAX_TABLE_SIZE:
+                return _Table(language)
+        return node
+
+    def compileItem(self, op, av):
+        if op == sre_parse.LITERAL:
+            return _Chars([chr(av)])
+        if op == sre_parse.NOT_LITERAL:
+            return _Chars([c for c in CATEGORIES['category_any']
+                           if c != chr(av)])
+        if op == sre_parse.ANY:
+            return _Chars(CATEGORIES['category_any'])
+        if op == sre_parse.CATEGORY:
+            return _Chars(CATEGORIES.get(av, []))
+        if op == sre_parse.IN:
+            return _Chars(_inChars(av))
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            min, max, items = av
+            # Only unbounded repeats are capped, bounded ones are sampled
+            # over their whole range
+            if max == sre_parse.MAXREPEAT:
+                max = min + self.limit - 1
+            return self.tabulate(_Repeat(self.compile(list(items)), min, max))
+        if op == sre_parse.BRANCH:
+            return self.tabulate(_Branch([self.compile(list(items))
+                                          for items in av[1]]))
+        if op == sre_parse.SUBPATTERN:
+            id, items = av[0], av[-1]
+            node = self.compile(list(items))
+            if id in self.groupRefs:
+                self.groupWidths[id] = node.width
+                return _Group(id, node)
+            return node
+        if op == sre_parse.ASSERT:
+            return self.compile(list(av[1]))
+        if op == sre_parse.GROUPREF:
+            if av not in self.groupWidths:
+                raise UnsupportedPattern(f"Unknown group reference {av}")
+            return _GroupRef(av, self.groupWidths[av])
+        if op in (sre_parse.AT, sre_parse.ASSERT_NOT):
+            return _Sequence([])
+        raise UnsupportedPattern(f"Cannot sample regex item {op}")
+
+    def sample(self, rng, n) -> np.ndarray:
+        """
+        Sample strings matching the pattern.
+        Args:
+            rng (np.random.Generator): Random generator to draw from.
+            n (int): Number of strings to sample.
+        Returns:
+            np.ndarray: Array of n matching strings.
+        """
+        width = max(self.plan.width, 1)
+        result = np.empty(n, dtype=f'<U{width}')
+        for start in range(0, n, BLOCK_ROWS):
+            rows = min(BLOCK_ROWS, n - start)
+            block = self.plan.fill(rng, rows, {})
+            if block.shape[1] == 0:
+                block = np.zeros((rows, 1), dtype='uint32')
+            block = np.ascontiguousarray(_squeeze(block), dtype='<u4')
+            result[start:start + rows] = block.view(f'<U{width}')[:, 0]
+        return result
+
+    def sampleArrow(self, rng, n) -> pa.Array:
+        """
+        Sample strings matching the pattern as an Arrow string array. Draws
+        the same strings as sample() for the same generator state, with
+        the code blocks encoded directly to UTF-8.
+        Args:
+            rng (np.random.Generator): Random generator to draw from.
+            n (int): Number of strings to sample.
+        Returns:
+            pa.Array: Array of n matching strings.
+        """
+        parts = [utf8Strings(self.plan.fill(rng, min(BLOCK_ROWS, n - start),
+                                            {}))
+                 for start in range(0, n, BLOCK_ROWS)]
+        if not parts:
+            return pa.array([], type=pa.string())
+        return parts[0] if len(parts) == 1 else pa.concat_arrays(parts)
+
+
+def _inChars(items):
+    """Characters of a parsed character class, like exrex does."""
+    chars, negate = [], False
+    for op, av in items:
+        if op == sre_parse.NEGATE:
+            chars, negate = list(CATEGORIES['category_any']), True
+            continue
+        if op == sre_parse.RANGE:
+            subs = [chr(c) for c in range(av[0], av[1] + 1)]
+        elif op == sre_parse.LITERAL:
+            subs = [chr(av)]
+        elif op == sre_parse.CATEGORY:
+            subs = CATEGORIES.get(av, [])
+        else:
+            raise UnsupportedPattern(f"Cannot sample class item {op}")
+        if negate:
+            chars = [c for c in chars if c not in subs]
+        else:
+            chars.extend(subs)
+    return chars
+
+
+def _walk(items):
+    """Yield every (op, av) item of a parsed pattern recursively."""
+    for op, av in items:
+        yield op, av
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            yield from _walk(av[2])
+        elif op == sre_parse.BRANCH:
+            for branch in av[1]:
+                yield from _walk(branch)
+        elif op == sre_parse.SUBPATTERN:
+            yield from _walk(av[-1])
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            yield from _walk(av[1])
+
+
+@lru_cache(maxsize=256)
+def compileRegex(pattern, limit=20) -> RegexSampler:
+    """
+    Compile a regular expression once into a cached sampler.
+    Args:
+        pattern (str): The regular expression to sample from.
+        limit (int): Maximum length of unbounded repeats.
+    Returns:
+        RegexSampler: The compiled sampler.
+    """
+    return RegexSampler(pattern, limit)
@@ -0,0 +1,164 @@
+"""Counter-based random streams addressable by column and row."""
+import hashlib
+
+import numpy as np
+
+# Rows drawn from one random stream. Part of the reproducibility contract:
+# changing it changes the data generated for a given seed.
+RNG_BLOCK_ROWS = 1 << 14
+
+
+def columnKey(column) -> int:
+    """
+    Stable integer key of a column name, independent of PYTHONHASHSEED.
+    Args:
+        column (str): The column name.
+    Returns:
+        int: A 64-bit key.
+    """
+    return int.from_bytes(hashlib.blake2b(
+        str(column).encode(), digest_size=8).digest(), 'little')
+
+
+def blockGenerator(seed, key, *counter) -> np.random.Generator:
+    """
+    Random generator of one block of rows of one column. The stream is
+    addressed by its key and counter through the SeedSequence, so no state
+    is carried from one block to the next.
+    Args:
+        seed (int): The root seed.
+        key (int): The column key from columnKey.
+        counter (int): Index of the block, plus an optional stream id.
+    Returns:
+        np.random.Generator: A PCG64 generator for the block.
+    """
+    return np.random.Generator(np.random.PCG64(
+        np.random.SeedSequence(seed, spawn_key=(key, *counter))))
+
+
+class RowRandom:
+    """
+    Random draws for rows [offset, offset + n) of one column. Draws are made
+    per block of RNG_BLOCK_ROWS rows with a generator keyed by (seed,
+    column, block), so the values of a row range only depend on the seed,
+    the column and the rows, whatever the chunking or the worker.
+    Args:
+        seed (int): The root seed.
+        column (str): The column name.
+        offset (int): Index of the first row.
+        n (int): Number of rows.
+    """
+    __slots__ = ('seed', 'key', 'offset', 'n')
+
+    def __init__(self, seed, column, offset, n):
+        self.seed = seed
+        self.key = columnKey(column)
+        self.offset = offset
+        self.n = n
+
+    def draw(self, sample, concat=np.concatenate) -> np.ndarray:
+        """
+        Draw values for the rows.
+        Args:
+            sample (callable): Function (rng, rows) returning an array of
+            rows values; called with RNG_BLOCK_ROWS rows for every block
+            overlapping the row range.
+            concat (callable): Joins the list of block arrays, e.g.
+            pa.concat_arrays for Arrow arrays.
+        Returns:
+            np.ndarray: The n values of the row range.
+        """
+        stop = self.offset + self.n
+        first = self.offset // RNG_BLOCK_ROWS
+        last = -(-stop // RNG_BLOCK_ROWS)
+        parts = []
+        for block in range(first, last):
+            start = block * RNG_BLOCK_ROWS
+            values = sample(blockGenerator(self.seed, self.key, block),
+                            RNG_BLOCK_ROWS)
+            parts.append(values[max(self.offset - start, 0):
+                                min(stop - start, RNG_BLOCK_ROWS)])
+        if not parts:
+            return sample(blockGenerator(self.seed, self.key, first), 0)
+        return parts[0] if len(parts) == 1 else concat(parts)
+
+
+def permutationIndex(seed, column, size, offset, n) -> np.ndarray:
+    """
+    Rows [offset, offset + n) of an endless sequence of independent random
+    permutations of range(size). Permutations are drawn in groups of about
+    RNG_BLOCK_ROWS rows, each group from a generator keyed by (seed,
+    column, group), so any slice can be reproduced on its own.
+    Args:
+        seed (int): The root seed.
+        column (str): The column name.
+        size (int): Number of rows to permute.
+        offset (int): Index of the first row.
+        n (int): Number of rows.
+    Returns:
+        np.ndarray: Row indices into range(size) as int64.
+    """
+    key = columnKey(column)
+    repeats = max(RNG_BLOCK_ROWS // size, 1)  # Permutations per group
+    rows = repeats * size
+    stop = offset + n
+    parts = []
+    for group in range(offset // rows, -(-stop // rows)):
+        rng = blockGenerator(seed, key, group, 1)
+        if repeats == 1:
+            index = rng.permutation(size)
+        else:
+            index = np.argsort(rng.random((repeats, size)), axis=1).ravel()
+        start = group * rows
+        parts.append(index[max(offset - start, 0):min(stop - start, rows)])
+    if not parts:
+        return np.empty(0, dtype='int64')
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+# Rounds of the Feistel network of shuffleIndex
+FEISTEL_ROUNDS = 6
+
+
+def _mix(x) -> np.ndarray:
+    """SplitMix64 finalizer of an uint64 array, wrapping on overflow."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def shuffleIndex(seed, column, size, offset, n) -> np.ndarray:
+    """
+    Rows [offset, offset + n) of an endless sequence of independent random
+    permutations of range(size), like permutationIndex, but computed row by
+    row with a keyed Feistel network and cycle walking, so memory depends
+    on n only, not on size. Used for seeds that do not fit in memory.
+    Args:
+        seed (int): The root seed.
+        column (str): The column name.
+        size (int): Number of rows to permute.
+        offset (int): Index of the first row.
+        n (int): Number of rows.
+    Returns:
+        np.ndarray: Row indices into range(size) as int64.
+    """
+    rows = np.arange(offset, offset + n, dtype='uint64')
+    if size <= 1 or not n:
+        return np.zeros(n, dtype='int64')
+    cycle, x = np.divmod(rows, np.uint64(size))
+    half = max(-(-int(size - 1).bit_length() // 2), 1)
+    mask = np.uint64((1 << half) - 1)
+    keys = blockGenerator(seed, columnKey(column), 0, 2).integers(
+        0, 2**63, FEISTEL_ROUNDS, dtype='uint64')
+    # Round keys of every permutation of the sequence
+    cycle = _mix(cycle + np.uint64(1))
+    pending = np.arange(n)
+    while len(pending):
+        value, salt = x[pending], cycle[pending]
+        left, right = value >> np.uint64(half), value & mask
+        for key in keys:
+            left, right = right, left ^ (_mix(right ^ salt ^ key) & mask)
+        x[pending] = (left << np.uint64(half)) | right
+        # Values out of range walk the cycle until they are in range
+        pending = pending[x[pending] >= size]
+    return x.astype('int64')
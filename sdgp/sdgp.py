@@ -27,18 +27,40 @@
 # ==================================================================================================================================================
 #     2023-09-06                            Damodhar Jangam                                                Initial Creation
 ####################################################################################################################################################
+import contextlib
+import os
+import shutil
+import uuid
 import pandas as pd
 import numpy as np
-import hashlib
 import random
+import tempfile
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import pyarrow as pa
-import pyarrow.parquet as pq
+import pyarrow.csv as pc
 # import sys
-import exrex
+from . import __version__
+from .cache import (DatasetCache, cacheKey, fileDigest, removePath,
+                    unlinkShared)
+from .parallel import orderedChunks
+from .loader import (fileFormat, loadTable, outputRows, parquetFiles,
+                     readColumns)
+from .memo import ColumnStore, columnKeys
+from .metrics import Metrics, pathSize
+from .profiling import Profiler
+from .plan import (CompositeSpec, DateRangeSpec, DependentDateRangeSpec,
+                   GenerationPlan, RegexPatternSpec, TimeSpec,
+                   UniqueIndexSpec, checkDuration,
+                   checkFormat, confFrame, splitByPipe)
+from .rng import RowRandom, permutationIndex
+from .spill import SpilledSeed
+from .writers import CSVOptions, ParquetOptions, compressionOf
 PADDING_LENGTH = 107
 ADDITIONAL_PADDING = 9
+# Rows per chunk when workers are used without an explicit chunk size
+DEFAULT_CHUNK_ROWS = 1000000
+ENGINES = ['pandas', 'arrow']
 
 
 class DataGenerator:
@@ -66,34 +88,158 @@ class DataGenerator:
     """
 
     def __init__(self, volume: int, file: str, conf_file: str,
-                 format: str, choice: str):
+                 format: str, choice: str, chunk_rows: int = None,
+                 workers: int = 1, seed: int = None, threads: int = 1,
+                 engine: str = "pandas",
+                 parquet_options: ParquetOptions = None,
+                 csv_options: CSVOptions = None,
+                 seed_columns: list = None, seed_types: dict = None,
+                 out_of_core: bool = False, spill_dir: str = None,
+                 verbose: bool = True, profile_dir: str = None,
+                 profile_chunks: int = None, cache_dir: str = None,
+                 cache_size: int = None, memo_dir: str = None,
+                 memo_size: int = None, append: str = None):
         """
         Constructor for the DataGenerator class.
         Args:
             volume (int): The number of rows to generate for the mock data.
             file (str): The name of the CSV file to generate /
             sameple file to edit and generate.
-            conf_file (str): The name of the configuration CSV file to read.
+            conf_file (str): The name of the configuration CSV file to read,
+            or the conf as a Python structure (see plan.confFrame).
             format (str): The format to save the mock data
-            (either "csv" or "parquet").
+            ("csv", "parquet" or "arrow" for an Arrow IPC file).
             choice (str): The type of function to select
             ("m" for mock data, "e" for edit mock data,
             "g" for generate high volume data).
+            chunk_rows (int): Generate and save the data in chunks of this
+            many rows, so memory depends on the chunk size, not the volume.
+            workers (int): Number of processes generating chunks in
+            parallel.
+            seed (int): Root seed. The values of any row range only depend
+            on the seed, the column and the rows, so a run or a slice of it
+            can be reproduced. A random seed is used when not given.
+            threads (int): Number of threads generating the independent
+            columns of a chunk concurrently.
+            engine (str): "pandas" to generate chunks as DataFrames, or
+            "arrow" to generate them as Arrow RecordBatches written to the
+            output without going through pandas object columns.
+            parquet_options (ParquetOptions): Codec, row group, statistics
+            and dataset (partitioning, file size) options of the Parquet
+            output.
+            csv_options (CSVOptions): Writer, compression, delimiter,
+            quoting and header options of the CSV output. A '.gz', '.zst'
+            or '.bz2' file name also selects the compression.
+            seed_columns (list): Only load these columns of the seed file.
+            seed_types (dict): Arrow types of seed columns by name, e.g.
+            {'id': pa.string()}, instead of the inferred ones.
+            out_of_core (bool): Scale the seed in mode 'g' without loading
+            it in memory: it is streamed to disk column by column and the
+            output is generated in chunks.
+            spill_dir (str): Directory of the spilled seed, the system
+            temporary directory by default.
+            verbose (bool): Print the progress messages to the console.
+            The timings of every stage and column are recorded in
+            self.metrics either way.
+            profile_dir (str): Save cProfile and tracemalloc profiles of
+            every column generator and writer in this directory.
+            profile_chunks (int): Only generate and profile the first
+            chunks, e.g. to profile a large volume without running it to
+            completion.
+            cache_dir (str): Serve the output from this cache directory
+            when a run with the same inputs was stored, see runCached. Only
+            used with a seed.
+            cache_size (int): Size cap of the cache in bytes, least recently
+            used outputs are evicted beyond it.
+            memo_dir (str): Save the generated columns of every chunk in
+            this directory and reuse them in later runs with the same seed
+            and chunks, see storedColumn. Only used with a seed.
+            memo_size (int): Size cap of the column store in bytes.
+            append (str): An existing CSV or Parquet output to extend to
+            the volume, see prepareAppend. It is moved to the output path.
         """
         self.n = int(volume)  # Number of rows to generate
         self.volume = int(volume)  # Number of rows to volume
+        self.csv_file_path = file.strip()  # to read CSV file path
+        self.csvOptions = csv_options or CSVOptions()
+        file, compression = compressionOf(file.strip())
+        if compression and not self.csvOptions.compression:
+            self.csvOptions.compression = compression
         self.file = file.split('.csv')[0] \
             if file.strip().endswith('.csv') else file
-        self.csv_file_path = file.strip()  # to read CSV file path
         self.start_time = time.time()
+        # Events of the stages, printed by the console consumer
+        self.metrics = Metrics()
+        if verbose:
+            self.metrics.subscribe(self.printEvent)
+        # Root of the random streams of every column and row block
+        self.seed = int(seed) if seed is not None else \
+            np.random.SeedSequence().entropy
+        self.metrics.log(f"Using seed {self.colorLiteral(self.seed)}")
+        # Epoch nanoseconds of generated date columns, aligned with df_mock
+        self.nativeDates = {}
+        self.workers = max(int(workers or 1), 1)
+        # Chunk size asked for, unlike the one derived from the workers
+        self.chunkRows = int(chunk_rows) if chunk_rows else None
+        if not chunk_rows and self.workers > 1:
+            chunk_rows = min(DEFAULT_CHUNK_ROWS,
+                             -(-self.volume // self.workers))
+        self.chunk_rows = int(chunk_rows) if chunk_rows else None
+        self.threads = max(int(threads or 1), 1)
+        if engine not in ENGINES:
+            raise ValueError(f"Invalid engine '{engine}'. Allowed engines \
+are '{', '.join(ENGINES)}'")
+        self.engine = engine
+        self.parquetOptions = parquet_options or ParquetOptions()
+        self.seedColumns = list(seed_columns) if seed_columns else None
+        self.seedTypes = seed_types
+        self.outOfCore = out_of_core
+        self.spillDir = spill_dir
+        if profile_chunks is not None and int(profile_chunks) < 1:
+            raise ValueError(f"Invalid profile chunks '{profile_chunks}'. \
+At least one chunk is profiled")
+        self.profiler = Profiler(profile_dir, profile_chunks) \
+            if profile_dir else None
+        self.cache = None
+        if cache_dir and seed is None:
+            self.metrics.log("The cache is only used with a seed")
+        elif cache_dir and not self.profiler:
+            self.cache = DatasetCache(cache_dir, *(
+                [cache_size] if cache_size is not None else []))
+        self.memo = None
+        self.memoKeys = {}  # Keys of the columns of the current chunk
+        self.seedDigest = None
+        if memo_dir and seed is None:
+            self.metrics.log("The column store is only used with a seed")
+        elif memo_dir:
+            self.memo = ColumnStore(memo_dir, *(
+                [memo_size] if memo_size is not None else []))
+        # Columns of the current chunk with the arrow engine
+        self.arrowColumns = {}
+        self.batch = None
+        self.hashWorkers = None  # Processes hashing composite keys
+        self.offset = 0  # Index of the first row of the current chunk
+        self.start = 0  # Rows of the output appended to, not generated
+        self.appendPath = None
+        self.appendColumns = None  # Columns of the output appended to
+        self.lastChunk = True
         self.outputFormat = format
+        self.outputBytes = 0  # Size of the output file after the last chunk
         self.choice = choice
-        if conf_file:
+        self.conf_file_path = None
+        self.conf_df = None
+        self.conf_columns = None  # Output columns, in order
+        if conf_file is not None and not isinstance(conf_file, str):
+            # A conf given as a Python structure
+            self.conf_df = confFrame(conf_file)
+        elif conf_file:
             if conf_file.strip().split('.csv')[0] == file.strip().\
                     split('.csv')[0]:
                 self.file = self.file+'_'
             self.conf_file_path = conf_file.strip()
-            self.conf_df = self.checkFile(self.conf_file_path).astype('str')
+            self.conf_df = self.checkFile(self.conf_file_path,
+                                          strings=True).astype('str')
+        if self.conf_df is not None:
             self.conf_dict = self.conf_df.to_dict(
                 orient='index')  # Configuration dictionary
             self.conf_types = {x.get('type').strip() for x in self.conf_dict.values()}
@@ -110,6 +256,25 @@ class DataGenerator:
                     raise ValueError(
                         f"Invalid input '{x}' type in conf csv file. \
 Allowed types are '{', '.join(self.allowed_types)}'")
+            # Parsed and validated once, reused for every chunk and worker
+            with self.metrics.measure('plan', path=self.conf_file_path,
+                                      rows=len(self.conf_dict)):
+                self.plan = GenerationPlan.fromConf(self.conf_dict)
+        if append:
+            self.prepareAppend(append)
+
+    def printEvent(self, event):
+        """
+        Console consumer of the metrics: print the log messages with the
+        elapsed time.
+        Args:
+            event (Event): An event of self.metrics.
+        """
+        if event.message:
+            # Widen the padding by the escape codes of the literals
+            literals = max(event.message.count("\033[0m"), 1)
+            print(event.message.ljust(PADDING_LENGTH + ADDITIONAL_PADDING * (
+                literals - 1), " "), self.clock)
 
     @property
     def clock(self):
@@ -135,94 +300,582 @@ Allowed types are '{', '.join(self.allowed_types)}'")
             print(e)
             pass
 
-    def checkFile(self, path) -> pd.DataFrame:
+    def checkFile(self, path, strings=False) -> pd.DataFrame:
+        return self.checkTable(path, strings=strings).to_pandas()
+
+    def checkTable(self, path, columns=None, types=None,
+                   strings=False) -> pa.Table:
+        """
+        Load a CSV, Parquet or Feather file with the multi-threaded,
+        memory-mapped loader.
+        Args:
+            path (str): The file path.
+            columns (list): Only load these columns.
+            types (dict): Arrow types by column name.
+            strings (bool): Read every column as text.
+        Returns:
+            pa.Table: The file contents, column names without prefixes.
+        """
         try:
-            df = pd.read_csv(path).rename(columns=lambda x: x.split(".")[-1])
-            print(f"Fetched the file {self.colorLiteral(path)} !".ljust(
-                PADDING_LENGTH, " "), self.clock)
-            return df
+            with self.metrics.measure('load', path=path) as event:
+                table = event.produced(loadTable(path, columns, types,
+                                                 strings))
+                event.rows = table.num_rows
+            table = table.rename_columns(
+                [x.split(".")[-1] for x in table.column_names])
+            self.metrics.log(f"Fetched the file {self.colorLiteral(path)} !")
+            return table
         except Exception as e:
             raise SystemExit(e)
 
-    def generateDates(self, s, e, format) -> list:
+    def generateDates(self, s, e, format, column=None):
         """
-        Generate random dates within a given range.
+        Generate random dates within a given range. The offsets are drawn in
+        a single call and formatted in bulk, day based formats are rendered
+        once per distinct day.
         Args:
             s (str): Start date in the format "YYYY-MM-DD".
             e (str): End date in the format "YYYY-MM-DD".
+            format (str): The format of the generated dates.
+            column (str): Column name keying the random stream and the
+            native values kept for dependent date columns.
+        Returns:
+            pd.Categorical or pd.arrays.ArrowStringArray: The generated
+            dates, a Categorical of the days of the range for day granular
+            formats.
+        """
+        return DateRangeSpec(column, f"{s}|{e}|{format}").generate(self)
+
+    def generateDependentDates(self, preDate, so, eo, format,
+                               column=None):
+        """
+        Generate dates by adding a random duration between two offsets to
+        a parent date column. The offsets are parsed once and drawn as a
+        whole vector, the parent is reused from its native values when it
+        was generated in this run and parsed in bulk otherwise.
+        Args:
+            preDate (str): Name of the parent date column.
+            so (str): Start offset like "1D".
+            eo (str): End offset like "3W".
+            format (str): The format of the generated dates.
+            column (str): Column name keying the random stream and the
+            native values kept for further dependent date columns.
+        Returns:
+            pd.arrays.ArrowStringArray: The generated dates.
+        """
+        return DependentDateRangeSpec(
+            column, f"{preDate}|{so}|{eo}|{format}").generate(self)
+
+    def generateTimes(self, s, e, format="%H:%M:%S",
+                      column=None) -> np.ndarray:
+        """
+        Generate random times of day within a given range. The seconds of
+        the day are drawn in a single call and rendered through a lookup
+        table of the 86,400 possible values.
+        Args:
+            s (str): Start time in the format "HH:MM:SS".
+            e (str): End time in the format "HH:MM:SS".
+            format (str): The format of the generated times.
+            column (str): Column name keying the random stream.
         Returns:
-            list: List of datetime objects representing the generated dates.
-        """
-        start = self.checkDate(s)
-        end = self.checkDate(e)
-        self.checkFormat(format)
-        if start > end:
-            raise ValueError(
-                "Start date must be before end date. (start date < end date)")
-        dates = []
-        for i in range(self.n):
-            date = start + (end - start) * random.random()
-            dates.append(date.strftime(str(format)))
-        return dates
+            np.ndarray: Array of strings representing the generated times.
+        """
+        return TimeSpec(column, f"{s}|{e}|{format}").generate(self)
+
+    def generateRegex(self, pattern, column=None) -> np.ndarray:
+        """
+        Generate strings matching a regular expression. The pattern is
+        compiled once into a sampling plan that fills the whole column.
+        Args:
+            pattern (str): The regular expression to sample from.
+            column (str): Column name keying the random stream.
+        Returns:
+            np.ndarray: Array of strings matching the pattern.
+        """
+        return RegexPatternSpec(column, pattern).generate(self)
+
+    def generateComposite(self, data) -> np.ndarray:
+        """
+        Generate composite keys by hashing the joined values of key
+        columns. The keys are joined with a separator into one buffer and
+        hashed in batches, in worker processes for large volumes. 'hash64'
+        hashes the typed column values without joining them.
+        Args:
+            data (str): Key columns separated by pipe, optionally followed
+            by '~' and the hash algorithm ('sha1', 'blake2b' or 'hash64'),
+            e.g. 'id|date~blake2b'.
+        Returns:
+            np.ndarray: Array of hex digests, or int64 hashes for 'hash64'.
+        """
+        return CompositeSpec(None, data).generate(self)
 
     def saveInCSV(self):
         """
-        Save a DataFrame in CSV format.
+        Save a DataFrame in CSV format. Chunks are streamed through a
+        single, optionally compressed, output file that is closed after the
+        last chunk; only the first chunk writes the header.
         Args:
             df (pd.DataFrame): DataFrame to save.
             file_name (str): File name for the CSV file.
         """
-        df = self.df_mock
-        self.mock_file_csv_path = f"{self.file}\
-_{self.choice}_{self.volume}.csv"
-        df.to_csv(self.mock_file_csv_path, index=False, header=True)
-        print(
-            f"File has been saved as \
-{ self.colorLiteral(self.mock_file_csv_path)} !".ljust(
-                PADDING_LENGTH, " "),
-            self.clock)
+        options = self.csvOptions
+        self.mock_file_csv_path = self.outputPath("csv")
+        first = self.offset == self.start
+        if first:
+            if self.appendPath:
+                self.extendOutput(self.mock_file_csv_path)
+            else:
+                unlinkShared(self.mock_file_csv_path)
+            self.csvStream = options.openStream(self.mock_file_csv_path,
+                                                append=bool(self.appendPath))
+        if options.writer == "arrow":
+            table = self.csvTable()
+            if first:
+                self.csvSchema = table.schema
+                write_options = options.writeOptions()
+                # Only the first row writes the header
+                write_options.include_header = options.header and \
+                    self.offset == 0
+                self.csvWriter = pc.CSVWriter(
+                    self.csvStream, table.schema,
+                    write_options=write_options)
+            else:
+                table = table.cast(self.csvSchema)
+            self.csvWriter.write_table(table)
+        else:
+            df = self.batch.to_pandas() if self.engine == "arrow" \
+                else self.df_mock
+            # Written to the stream in row blocks, not built as a string
+            df.to_csv(self.csvStream, mode='ab',
+                      header=options.header and self.offset == 0,
+                      **options.pandasOptions())
+        if self.lastChunk:
+            if options.writer == "arrow":
+                self.csvWriter.close()
+            self.csvStream.close()
+        self.savedMessage(self.mock_file_csv_path)
+
+    def csvTable(self) -> pa.Table:
+        """
+        The current chunk as an Arrow table for the CSV writer. Object
+        columns Arrow can not type, like integers beyond 64 bits, are
+        written as their strings.
+        Returns:
+            pa.Table: The chunk.
+        """
+        try:
+            return self.arrowTable()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            df = self.df_mock
+            return pa.Table.from_pandas(df.astype(
+                {column: str for column in df.columns
+                 if df[column].dtype == object}), preserve_index=False)
 
     def saveInParquet(self):
         """
-        Save a DataFrame in Parquet format.
+        Save a DataFrame in Parquet format. Chunks are written as row groups
+        through a single ParquetWriter that is closed after the last chunk,
+        or as files of a directory dataset when the Parquet options ask for
+        partitions or a file size.
         Args:
             df (pd.DataFrame): DataFrame to save.
             file_name (str): File name for the Parquet file.
         """
-        df = self.df_mock
-        self.mock_file_parquet_path = f"{self.file}\
-_{self.choice}_{self.volume}.parquet"
-        table = pa.Table.from_pandas(df, preserve_index=False)
-        pq.write_table(table,  self.mock_file_parquet_path,
-                       compression="snappy")
-        print(
-            f"File has been saved as \
-{self.colorLiteral(self.mock_file_parquet_path)} !".
-            ljust(PADDING_LENGTH, " "), self.clock)
+        options = self.parquetOptions
+        table = self.arrowTable()
+        self.mock_file_parquet_path = path = self.outputPath("parquet")
+        first = self.offset == self.start
+        if first and self.appendPath:
+            self.extendOutput(path)
+        if options.dataset:
+            if first:
+                options.prepareDataset(path, table.column_names,
+                                       clear=not self.appendPath)
+                self.parquetSchema = self.appendSchema(table, path) \
+                    if self.appendPath else table.schema
+            if not first or self.appendPath:
+                table = table.cast(self.parquetSchema)
+            options.writeDataset(table, path,
+                                 f"part-{self.offset}-{{i}}.parquet")
+            self.savedMessage(path)
+            return
+        if first:
+            import pyarrow.parquet as pq
+            schema, file = table.schema, path
+            if self.appendPath:
+                # The rows are a new file of the dataset appended to
+                schema = self.appendSchema(table, path)
+                file = os.path.join(path, f"part-{self.offset}.parquet")
+            else:
+                unlinkShared(path)
+            self.parquetWriter = pq.ParquetWriter(
+                file, schema, **options.writerOptions())
+        if not first or self.appendPath:
+            table = table.cast(self.parquetWriter.schema)
+        self.parquetWriter.write_table(table,
+                                       row_group_size=options.row_group_rows)
+        if self.lastChunk:
+            self.parquetWriter.close()
+        self.savedMessage(self.mock_file_parquet_path)
+
+    def saveInArrow(self):
+        """
+        Save the data as an Arrow IPC file. Chunks are written as record
+        batches through a single writer that is closed after the last
+        chunk.
+        """
+        self.mock_file_arrow_path = self.outputPath("arrow")
+        table = self.arrowTable()
+        if self.offset == 0:
+            unlinkShared(self.mock_file_arrow_path)
+            self.arrowSchema = table.schema
+            self.arrowWriter = pa.ipc.new_file(self.mock_file_arrow_path,
+                                               table.schema)
+        else:
+            table = table.cast(self.arrowSchema)
+        self.arrowWriter.write_table(table)
+        if self.lastChunk:
+            self.arrowWriter.close()
+        self.savedMessage(self.mock_file_arrow_path)
+
+    def outputPath(self, format=None) -> str:
+        """
+        Path of the output of the run, a file or the directory of a Parquet
+        dataset, named after the file, the mode and the rows written.
+        Args:
+            format (str): The output format, the format of the run if None.
+        """
+        format = format or self.outputFormat
+        path = f"{self.file}_{self.choice}_{self.outputVolume()}"
+        if format == "csv":
+            return path + self.csvOptions.extension()
+        if format == "parquet":
+            return path if self.parquetOptions.dataset else path + ".parquet"
+        return f"{path}.{format}"
+
+    def prepareAppend(self, path):
+        """
+        Extend an existing output instead of generating every row: only the
+        rows beyond those of the output are generated and appended to it,
+        as new Parquet files or CSV lines. They are the rows a run of the
+        whole volume with the same seed and conf would generate, so the
+        time only depends on the rows added. uniqueIndex columns continue
+        from their largest value in the output.
+        Args:
+            path (str): The CSV file, Parquet file or Parquet dataset
+            directory to extend, in the output format of the run.
+        Raises:
+            ValueError: If the output format can not be appended to or the
+            output already has the volume.
+        """
+        if self.outputFormat not in ("csv", "parquet"):
+            raise ValueError(f"Can not append to a {self.outputFormat} \
+output, only csv and parquet outputs are extended")
+        if not os.path.exists(path):
+            raise SystemExit(f"No output to append to at '{path}'")
+        parquet = os.path.isdir(path) or fileFormat(path) == 'parquet'
+        if parquet != (self.outputFormat == "parquet"):
+            raise ValueError(f"Can not append {self.outputFormat} rows to \
+'{path}'")
+        specs = [spec for spec in self.plan.columns
+                 if isinstance(spec, UniqueIndexSpec)] \
+            if self.conf_df is not None else []
+        try:
+            with self.metrics.measure('load', path=path) as event:
+                rows, columns, last = outputRows(
+                    path, [spec.name for spec in specs],
+                    self.csvOptions.delimiter, self.csvOptions.header)
+                event.rows = rows
+        except Exception as e:
+            raise SystemExit(e)
+        if rows >= self.volume:
+            raise ValueError(f"'{path}' already has {rows} rows, the \
+volume must be greater")
+        if not rows:
+            self.metrics.log(f"{self.colorLiteral(path)} has no rows, \
+generating every row")
+            return
+        for spec in specs:
+            if last[spec.name] is not None:
+                spec.start = last[spec.name] + 1 - rows
+        self.start = rows
+        self.appendPath = path
+        self.appendColumns = columns
+        self.outputBytes = pathSize(path)
+        self.chunk_rows = self.chunk_rows or DEFAULT_CHUNK_ROWS
+        if self.cache is not None:
+            # The output depends on the one appended to
+            self.metrics.log("The cache is not used when appending")
+            self.cache = None
+        self.metrics.log(f"Appending rows {self.colorLiteral(rows)} to \
+{self.colorLiteral(self.volume)} to {self.colorLiteral(path)}")
+
+    def extendOutput(self, path):
+        """
+        Move the output appended to to the output path of the run before
+        the first chunk. A single Parquet file becomes the first file of a
+        directory of that name, as a Parquet file can not grow, and a CSV
+        file hard linked elsewhere, e.g. served from the cache, is copied
+        so appending leaves the other links untouched.
+        Args:
+            path (str): The output path of the run.
+        """
+        source = self.appendPath
+        if self.outputFormat == "parquet" and not os.path.isdir(source):
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.move(source, temporary)
+            removePath(path)
+            os.makedirs(path)
+            os.rename(temporary, os.path.join(path, "part-0.parquet"))
+        elif os.path.abspath(source) != os.path.abspath(path):
+            removePath(path)
+            shutil.move(source, path)
+        if os.path.isfile(path) and os.stat(path).st_nlink > 1:
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.copy2(path, temporary)
+            os.replace(temporary, path)
+
+    def appendSchema(self, table, path) -> pa.Schema:
+        """
+        Schema of the rows appended to a Parquet output: the types of the
+        output files, so every file of the dataset has the same schema.
+        Args:
+            table (pa.Table): The first chunk.
+            path (str): The Parquet dataset directory.
+        Returns:
+            pa.Schema: The schema of the chunk with the existing types.
+        """
+        import pyarrow.parquet as pq
+        types = {field.name: field.type
+                 for field in pq.read_schema(parquetFiles(path)[0])}
+        return pa.schema([field.with_type(types.get(field.name, field.type))
+                          for field in table.schema])
+
+    def outputVolume(self) -> int:
+        """
+        Rows of the output: the volume, or the rows of the profiled chunks
+        when profiling stops after the first chunks.
+        """
+        if self.profiler and self.profiler.chunks and self.chunk_rows:
+            return min(self.volume, self.start +
+                       self.profiler.chunks * self.chunk_rows)
+        return self.volume
+
+    def cacheParts(self) -> dict:
+        """
+        Everything the output of the run depends on: the normalized conf
+        and the compiled columns, as in the keys of the column store, the
+        seed, the volume, the mode, the sdgp version, the output and
+        seed options and the contents of the seed file in modes 'e' and
+        'g'. Workers and threads do not change the output, so only the
+        chunk size asked for is part of the key, not the one derived from
+        the workers.
+        Returns:
+            dict: The inputs of the cache key.
+        """
+        def options(value):
+            return {slot: getattr(value, slot) for slot in value.__slots__}
+        conf = [[item.get(field).strip() for field in
+                 ('name', 'type', 'values')]
+                for item in self.conf_dict.values()] \
+            if self.conf_df is not None else None
+        specs = [spec.memoParts() for spec in self.plan.columns] \
+            if self.conf_df is not None else None
+        return {
+            'version': __version__, 'mode': self.choice, 'conf': conf,
+            'specs': specs,
+            'seed': self.seed, 'volume': self.volume,
+            'format': self.outputFormat, 'engine': self.engine,
+            'chunk_rows': self.chunkRows,
+            'csv': options(self.csvOptions)
+            if self.outputFormat == "csv" else None,
+            'parquet': options(self.parquetOptions)
+            if self.outputFormat == "parquet" else None,
+            'seed_file': fileDigest(self.csv_file_path)
+            if self.choice in ('e', 'g') else None,
+            'seed_columns': self.seedColumns,
+            'seed_types': {name: str(type) for name, type in
+                           (self.seedTypes or {}).items()},
+            'out_of_core': self.outOfCore and self.choice == 'g'}
+
+    def runCached(self, run):
+        """
+        Run a mode through the cache: an output stored by a run with the
+        same inputs (see cacheParts) is served at the output path,
+        otherwise the mode runs and its output is stored. Without a cache
+        the mode just runs.
+        Args:
+            run (callable): The mode, e.g. self.generateMockData.
+        """
+        if self.cache is None:
+            run()
+            return
+        try:
+            parts = self.cacheParts()
+        except OSError as e:
+            raise SystemExit(e)
+        key = cacheKey(parts)
+        path = self.outputPath()
+        if self.cache.fetch(key, path):
+            setattr(self, f"mock_file_{self.outputFormat}_path", path)
+            self.metrics.log(f"File has been served from the cache as \
+{self.colorLiteral(path)} !")
+            return
+        run()
+        self.cache.store(key, path, parts)
+
+    def arrowTable(self) -> pa.Table:
+        """
+        The current chunk as an Arrow table, converted from pandas only
+        with the pandas engine.
+        Returns:
+            pa.Table: The chunk.
+        """
+        if self.engine == "arrow":
+            return pa.Table.from_batches([self.batch])
+        return pa.Table.from_pandas(self.df_mock, preserve_index=False)
+
+    def savedMessage(self, path):
+        """
+        Print the progress of saving a chunk, or the saved file once the
+        last chunk is written.
+        Args:
+            path (str): Path of the output file.
+        """
+        if self.lastChunk:
+            self.metrics.log(
+                f"File has been saved as {self.colorLiteral(path)} !")
+        else:
+            self.metrics.log(f"Saved rows {self.colorLiteral(self.offset)} to \
+{self.colorLiteral(self.offset + self.n)} in {self.colorLiteral(path)}")
+
+    def random(self, column) -> RowRandom:
+        """
+        Random draws for the rows of the current chunk of a column.
+        Args:
+            column (str): The column name.
+        Returns:
+            RowRandom: Draws keyed by the seed, the column and the rows.
+        """
+        return RowRandom(self.seed, column, self.offset, self.n)
+
+    def generateRange(self, offset, rows, df=None) -> pd.DataFrame:
+        """
+        Generate the rows [offset, offset + rows). The result only depends
+        on the seed and the row range, so any slice of a run can be
+        regenerated on its own, e.g. to retry a failed chunk.
+        Args:
+            offset (int): Index of the first row.
+            rows (int): Number of rows.
+            df (pd.DataFrame): Seed data for the 'e' and 'g' modes.
+        Returns:
+            pd.DataFrame or pa.RecordBatch: The generated rows.
+        """
+        self.offset, self.n = offset, rows
+        self.nativeDates = {}
+        self.df_mock = pd.DataFrame()
+        self.arrowColumns = {}
+        if df is not None:
+            self.genMockData(df)
+        if self.choice != 'g':
+            self.generateWithConf()
+        return self.chunk()
+
+    def streamChunks(self, df=None):
+        """
+        Generate and save the data chunk by chunk, so only a few chunks are
+        in memory at a time.
+        Args:
+            df (pd.DataFrame): Seed data for the 'e' and 'g' modes.
+        """
+        for _ in self.iterChunks(df):
+            self.output()
+
+    def iterChunks(self, df=None):
+        """
+        Generate the data chunk by chunk, in memory. uniqueIndex columns
+        continue from the previous chunk. With several workers the chunks
+        are generated in a process pool and yielded in order.
+        Args:
+            df (pd.DataFrame): Seed data for the 'e' and 'g' modes.
+        Yields:
+            pd.DataFrame or pa.RecordBatch: Each chunk with the output
+            columns, a RecordBatch with the arrow engine.
+        """
+        ranges = [(offset, min(self.chunk_rows, self.volume - offset))
+                  for offset in range(self.start, self.volume,
+                                      self.chunk_rows)]
+        if self.profiler and self.profiler.chunks:
+            ranges = ranges[:self.profiler.chunks]
+        end = ranges[-1][0] + ranges[-1][1] if ranges else 0
+        # Profiles are taken in this process
+        if self.workers > 1 and not self.profiler:
+            chunks = orderedChunks(self, ranges, df, self.workers)
+        else:
+            chunks = (self.generateRange(offset, rows, df)
+                      for offset, rows in ranges)
+        for (offset, rows), chunk in zip(ranges, chunks):
+            self.offset, self.n = offset, rows
+            self.lastChunk = offset + rows >= end
+            if self.engine == "arrow":
+                self.batch = chunk
+            else:
+                self.df_mock = chunk
+            yield self.outputColumns()
+        if end < self.volume:
+            self.metrics.log(f"Stopped after \
+{self.colorLiteral(len(ranges))} profiled chunks, at row \
+{self.colorLiteral(end)}")
+        self.n = self.volume
+        self.offset = 0
 
     def genMockData(self, df) -> pd.DataFrame:
         """
         Create a mock DataFrame by randomly selecting values
-        from the original DataFrame.
+        from the original DataFrame. Every column is an independent
+        sequence of random permutations of its values, gathered with one
+        index array per column for the rows of the current chunk.
         Args:
-            df (pd.DataFrame): Original DataFrame.
+            df (pd.DataFrame, pa.Table or SpilledSeed): Original data, an
+            Arrow table with the arrow engine, or spilled to disk.
         Returns:
-            pd.DataFrame: Mock DataFrame.
-        """
-        self.columns = df.columns
-        self.df_mock = pd.concat(
-            [df.apply(lambda a: a.sample(frac=1).values)
-             for _ in range(int(self.n/df.shape[0]))],
-            ignore_index=True,
-        )
-        if self.df_mock.shape[0] < self.n:
-            self.df_mock = pd.concat(
-                [self.df_mock, df.apply(
-                    lambda a: a.sample(
-                        frac=1).values).sample(
-                    self.n - self.df_mock.shape[0])],
-                ignore_index=True,
-            )
+            pd.DataFrame or pa.RecordBatch: Mock data.
+        """
+        if df.shape[0] == 0:
+            raise ValueError("Can not generate mock data from an empty file")
+        self.nativeDates = {}
+        if isinstance(df, SpilledSeed):
+            self.columns = df.columns
+
+            def sample(column):
+                return df.sample(self.seed, column, self.offset, self.n)
+        elif isinstance(df, pa.Table):
+            self.columns = df.column_names
+
+            def sample(column):
+                return df.column(column).take(permutationIndex(
+                    self.seed, column, df.num_rows, self.offset,
+                    self.n)).combine_chunks()
+        else:
+            self.columns = df.columns
+
+            def sample(column):
+                return df[column].array.take(permutationIndex(
+                    self.seed, column, df.shape[0], self.offset, self.n))
+        columns = {}
+        for column in self.columns:
+            with self.metrics.measure('amplify', column, offset=self.offset,
+                                      rows=self.n) as event, \
+                    self.profiled('amplify', column):
+                columns[column] = event.produced(sample(column))
+        if isinstance(df, pd.DataFrame):
+            self.df_mock = pd.DataFrame(columns)
+            return self.df_mock
+        self.arrowColumns = columns
+        self.batch = pa.RecordBatch.from_pydict(self.arrowColumns)
+        if self.engine == "arrow" or isinstance(df, pa.Table):
+            return self.batch
+        self.df_mock = self.batch.to_pandas()
         return self.df_mock
 
     def splitByPipe(self, data):
@@ -233,7 +886,7 @@ _{self.choice}_{self.volume}.parquet"
         Returns:
             list: A list of strings after splitting by pipe character.
         """
-        return [*map(str.strip, data.split("|"))]
+        return splitByPipe(data)
 
     def getByType(self, type) -> list:
         """
@@ -266,15 +919,7 @@ _{self.choice}_{self.volume}.parquet"
         Raises:
             ValueError: If the start date is after the end date.
         """
-
-        if pd.to_timedelta(start_duration).total_seconds() > \
-                pd.to_timedelta(end_duration).total_seconds():
-            raise ValueError(
-                "Start date must be before end date. \
-(start duration < end duration) e.g. 1D < 1W will \
-genterate random date between next (1) day to next \
-(1) week from start date")
-        return True
+        return checkDuration(start_duration, end_duration)
 
     def checkFormat(self, format):
         """
@@ -290,13 +935,7 @@ genterate random date between next (1) day to next \
         Raises:
             ValueError: If the date format is invalid.
         """
-        try:
-            return pd.Timestamp(datetime.now().strftime(format))
-        except ValueError:
-            raise ValueError(
-                f"Invalid date format {format}.",
-                "The format like '%Y-%m-%d %H:%M:%S',",
-                "e.g. '2023-10-11 12:48:14'.")
+        return checkFormat(format)
 
     def addRandomDuration(self, start_date, so, eo, format):
         random_duration = pd.to_timedelta(
@@ -309,211 +948,215 @@ genterate random date between next (1) day to next \
     def colorLiteral(self, value):
         return f"\033[31m{value}\033[0m"
 
-    def generateWithConf(self, unique=False) -> pd.DataFrame:
+    def generateWithConf(self) -> pd.DataFrame:
+        """
+        Generates mock data for the columns of the compiled plan and
+        assigns them to columns in the mock DataFrame. Columns are
+        generated after the columns they depend on; with several threads
+        the independent columns of a stage are generated concurrently, as
+        their NumPy kernels release the GIL.
+        Returns:
+            pd.DataFrame or pa.RecordBatch: The mock data, a RecordBatch with
+            the arrow engine.
+        """
+        if self.engine == "arrow":
+            if any(len(values) != self.n
+                   for values in self.arrowColumns.values()):
+                self.arrowColumns = {}
+        elif len(self.df_mock.index) != self.n:
+            self.df_mock = pd.DataFrame(index=pd.RangeIndex(self.n))
+        if self.memo is not None:
+            self.memoKeys = columnKeys(self.plan.columns, {
+                'version': __version__, 'seed': self.seed,
+                'offset': self.offset, 'rows': self.n,
+                'engine': self.engine}, self.seedKey)
+        for stage in self.plan.stages():
+            for spec in stage:
+                self.metrics.log(spec.describe(self.colorLiteral))
+            if self.threads > 1 and len(stage) > 1:
+                with ThreadPoolExecutor(min(self.threads, len(stage))) as \
+                        pool:
+                    values = list(pool.map(self.generateColumn, stage))
+            else:
+                values = [self.generateColumn(spec) for spec in stage]
+            self.assignColumns(
+                {spec.name: value for spec, value in zip(stage, values)})
+        if self.engine == "arrow":
+            self.batch = pa.RecordBatch.from_pydict(self.arrowColumns)
+        return self.chunk()
+
+    def generateColumn(self, spec):
         """
-        Generates mock data for different types of configuration
-        items and assigns them to columns
-        in the mock DataFrame.
+        Generate a column of the plan for the current chunk. Arrays are
+        wrapped in a Series aligned with the mock DataFrame, so the
+        conversion to the pandas dtype runs in the column thread too.
+        Args:
+            spec (ColumnSpec): The compiled column.
+        Returns:
+            pd.Series, pa.Array or scalar: The values of the column.
+        """
+        with self.metrics.measure('generate', spec.name, offset=self.offset,
+                                  rows=self.n, thread=True) as event, \
+                self.profiled('generate', spec.name):
+            if self.engine == "arrow":
+                values, event.path = self.storedColumn(
+                    spec, lambda: spec.arrow(self))
+                return event.produced(values)
+            values, event.path = self.storedColumn(
+                spec, lambda: spec.generate(self))
+            if np.ndim(values) == 0:
+                return values
+            return event.produced(pd.Series(
+                values, index=self.df_mock.index, name=spec.name))
 
+    def storedColumn(self, spec, generate):
+        """
+        Values of a column memory-mapped from the column store, or
+        generated and saved in it. The key of a column covers its spec, the
+        seed, the rows of the chunk and the keys of the columns it depends
+        on, so only edited columns and their dependents are generated again.
+        Args:
+            spec (ColumnSpec): The compiled column.
+            generate (callable): Generates the values.
         Returns:
-            pd.DataFrame: The mock DataFrame with generated data.
-        """
-        self.uniqueIndexs = self.getByType("uniqueIndex")
-        self.dateRanges = self.getByType("dateRange")
-        self.dates = self.getByType("date")
-        self.categories = self.getByType("category")
-        self.constants = self.getByType("constant")
-        self.floatRanges = self.getByType("floatRange")
-        self.intRanges = self.getByType("intRange")
-        self.constants = self.getByType("constant")
-        self.times = self.getByType("time")
-        self.dependentDateRanges = self.getByType("dependentDateRange")
-        self.composites = self.getByType("composite")
-        self.regexPatterns = self.getByType("regexPattern")
-
-        if unique:
-            for column, start_number in self.uniqueIndexs:
-                print(f"Generating unique index for '\
-{self.colorLiteral(column)}' starting value {self.colorLiteral(start_number)}"
-                      .ljust(PADDING_LENGTH + ADDITIONAL_PADDING, " "),
-                      self.clock)
-                start_number = int(start_number)
-                self.df_mock[column] = np.arange(
-                    start_number, start_number + self.n)
-
-            for column, data in self.dependentDateRanges:
-                preDate, so, eo, format = self.splitByPipe(data)
-                print(f"Generating dependent dates data for '\
-{self.colorLiteral(column)}' with '{self.colorLiteral(data)}'".ljust(
-                    PADDING_LENGTH + ADDITIONAL_PADDING, " "),
-                    self.clock)
-                if self.checkDuration(so, eo) and self.checkFormat(format):
-                    self.df_mock[column] = pd.to_datetime(
-                        self.df_mock[preDate]
-                    ).apply(lambda x: self.addRandomDuration(
-                        x, so, eo, format))
-
-            for column, data in self.composites:
-                keys = self.splitByPipe(data)
-                print(f"Generating composite key data for '\
-{self.colorLiteral(column)}' with {self.colorLiteral(keys)}".ljust(
-                    PADDING_LENGTH, " "),
-                    self.clock)
-                self.df_mock[column] = self.df_mock[keys].astype(
-                    'str').sum(1).apply(
-                    lambda x: hashlib.sha1(x.encode()).hexdigest())
-            return self.df_mock
+            tuple: (values, path of the stored file if loaded, else None).
+        """
+        if self.memo is None or not spec.memoize:
+            return generate(), None
+        key = self.memoKeys[spec.name]
+        stored = self.memo.load(key, self.engine)
+        if stored is not None:
+            values, native = stored
+            if native is not None:
+                self.nativeDates[spec.name] = native
+            return values, self.memo.path(key)
+        values = generate()
+        if np.ndim(values):
+            self.memo.save(key, values, self.nativeDates.get(spec.name))
+        return values, None
 
-        for column, start_number in self.uniqueIndexs:
-            print(f"Generating unique index for '\
-{self.colorLiteral(column)}' starting value {self.colorLiteral(start_number)}".
-                  ljust(PADDING_LENGTH+ADDITIONAL_PADDING, " "), self.clock)
-            start_number = int(start_number)
-            self.df_mock[column] = np.arange(
-                start_number, start_number + self.n)
-
-        for column, date in self.dates:
-            date, formate = self.splitByPipe(date)
-            print(f"Generating date data for '{self.colorLiteral(column)}' \
-with '{self.colorLiteral(date)}' and format '{self.colorLiteral(formate)}'".
-                  ljust(PADDING_LENGTH+ADDITIONAL_PADDING*2, " "), self.clock)
-            self.df_mock[column] = pd.to_datetime(date).strftime(formate)
-
-        for column, data in self.categories:
-            if '~' in data:
-                data, p = data.split("~")
-                suffle_data = self.splitByPipe(data)
-                p = [*map(float, self.splitByPipe(p))]
-                if sum(p) == 1:
-                    print(f"Generating category data for '\
-{self.colorLiteral(column)}' with '{self.colorLiteral(suffle_data)}' \
-and probabilities per value {self.colorLiteral(p)}"
-                          .ljust(PADDING_LENGTH + ADDITIONAL_PADDING, " "),
-                          self.clock)
-                    self.df_mock[column] = np.random.choice(
-                        suffle_data, self.n, p=p
-                    )
-                else:
-                    raise ValueError(
-                        f"Sum of probability must be 1. in '"
-                        f"{self.colorLiteral(column)}' category type column in"
-                        f" conf.csv file eg: 'A|B~0.5|0.5' or "
-                        f"'A|B|C|D~0.2|0.1|0.5|0.2'"
-                    )
+    def seedKey(self) -> str:
+        """Key of the seed file, for columns depending on seed data."""
+        if self.seedDigest is None:
+            self.seedDigest = cacheKey({
+                'file': fileDigest(self.csv_file_path),
+                'types': {name: str(type) for name, type in
+                          (self.seedTypes or {}).items()}})
+        return self.seedDigest
+
+    def assignColumns(self, columns):
+        """
+        Assign generated columns to the mock DataFrame. New columns are
+        added with a single concat, so wide tables are not fragmented by
+        one insert per column.
+        Args:
+            columns (dict): Column values by name, arrays or scalars.
+        """
+        if self.engine == "arrow":
+            self.arrowColumns.update(columns)
+            return
+        new = {}
+        for column, values in columns.items():
+            if column in self.df_mock.columns:
+                self.df_mock[column] = values
             else:
-                suffle_data = self.splitByPipe(data)
-                print(f"Generating category data for '\
-{self.colorLiteral(column)}' with '{self.colorLiteral(suffle_data)}'"
-                      .ljust(PADDING_LENGTH + ADDITIONAL_PADDING, " "),
-                      self.clock)
-                self.df_mock[column] = np.random.choice(suffle_data, self.n)
-
-        for column, data in self.floatRanges:
-            s, e, precision = [*map(float, self.splitByPipe(data))]
-            print(f"Generating float data for '{self.colorLiteral(column)}' \
-between {self.colorLiteral(s)} to {self.colorLiteral(e)} with \
-precision {self.colorLiteral(int(precision))} decimals".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING*3, " "),
-                self.clock)
-            self.df_mock[column] = np.round(
-                np.random.uniform(s, e, self.n), int(precision)
-            )
-
-        for column, data in self.intRanges:
-            s, e = [*map(int, self.splitByPipe(data))]
-            print(f"Generating integer data for '{self.colorLiteral(column)}' \
-between {self.colorLiteral(s)} to {self.colorLiteral(e)}".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING*2, " "),
-                self.clock)
-            self.df_mock[column] = np.random.randint(s, e, self.n)
-
-        for column, data in self.constants:
-            print(f"Assingning constant to '{self.colorLiteral(column)}' with \
-'{self.colorLiteral(data)}'".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING, " "), self.clock)
-            self.df_mock[column] = data
-
-        for column, data in self.times:
-            print(f"Generating times for '{self.colorLiteral(column)}' with \
-'{self.colorLiteral(data)}'".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING, " "), self.clock)
-            s, e, format = self.splitByPipe(data)
-            random_dates = [
-                datetime.now()
-                + timedelta(
-                    hours=random.randint(0, 24),
-                    minutes=random.randint(0, 60),
-                    seconds=random.randint(0, 60),
-                )
-                for _ in range(self.n)
-            ]
-            self.df_mock[column] = [
-                pd.to_datetime(date).strftime(format) for date in random_dates
-            ]
+                new[column] = values
+        if new:
+            self.df_mock = pd.concat([self.df_mock, pd.DataFrame(
+                new, index=self.df_mock.index)], axis=1)
 
-        for column, data in self.dateRanges:
-            print(f"Generating dates for '{self.colorLiteral(column)}' with \
-'{self.colorLiteral(data)}'".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING, " "), self.clock)
-            s, e, format = self.splitByPipe(data)
-            self.df_mock[column] = self.generateDates(s, e, format)
-
-        for column, data in self.dependentDateRanges:
-            print(f"Generating dates for '{self.colorLiteral(column)}' with \
-'{self.colorLiteral(data)}'".ljust(
-                PADDING_LENGTH + ADDITIONAL_PADDING, " "), self.clock)
-            preDate, so, eo, format = self.splitByPipe(data)
-            if self.checkDuration(so, eo) and self.checkFormat(format):
-                self.df_mock[column] = pd.to_datetime(
-                    self.df_mock[preDate]
-                ).apply(lambda x: self.addRandomDuration(x, so, eo, format))
-
-        for column, data in self.regexPatterns:
-            print(
-                f"Generating regex pattern data for '\
-{self.colorLiteral(column)}' with '{self.colorLiteral(data)}'".ljust(
-                    PADDING_LENGTH + ADDITIONAL_PADDING, " "),
-                self.clock,
-            )
-            self.df_mock[column] = self.df_mock.iloc[:, 0].apply(
-                lambda x: exrex.getone(data)
-            )
-
-        for column, data in self.composites:
-            print(f"Generating composite data for '{self.colorLiteral(column)}\
-' with '{self.colorLiteral(data)}'".ljust(PADDING_LENGTH, " "),
-                  self.clock)
-            keys = self.splitByPipe(data)
-            self.df_mock[column] = self.df_mock[keys].astype('str').sum(1)\
-                .apply(
-                lambda x: hashlib.sha1(x.encode()).hexdigest()
-            )
+    def column(self, name):
+        """
+        Values of a column of the current chunk, generated or seed data.
+        Args:
+            name (str): The column name.
+        Returns:
+            pd.Series or np.ndarray: The values of the column.
+        """
+        if self.engine == "arrow":
+            values = self.arrowColumns[name]
+            if pa.types.is_dictionary(values.type):
+                values = values.dictionary_decode()
+            return values.to_numpy(zero_copy_only=False)
+        return self.df_mock[name]
 
-        return self.df_mock
+    def profiled(self, stage, column=None):
+        """
+        Context of a profiled block of the current chunk: a profile of the
+        stage and column if profiling and the chunk is sampled.
+        Args:
+            stage (str): 'generate', 'amplify' or 'write'.
+            column (str): The column, or the format of a writer.
+        """
+        chunk = (self.offset - self.start) // self.chunk_rows \
+            if self.chunk_rows else 0
+        if self.profiler and self.profiler.sampled(chunk):
+            return self.profiler.profile(stage, column)
+        return contextlib.nullcontext()
+
+    def chunk(self):
+        """
+        The current chunk, a RecordBatch with the arrow engine and a
+        DataFrame otherwise.
+        """
+        return self.batch if self.engine == "arrow" else self.df_mock
+
+    def outputColumns(self):
+        """
+        Select the output columns of the current chunk, in the order of the
+        conf file or of the seed data.
+        Returns:
+            pd.DataFrame or pa.RecordBatch: The current chunk.
+        """
+        columns = self.conf_columns
+        if columns and self.appendColumns:
+            if sorted(columns) != sorted(self.appendColumns):
+                raise ValueError(f"The columns of '{self.appendPath}' are \
+not the output columns '{', '.join(columns)}'")
+            # In the order of the output appended to
+            columns = self.appendColumns
+        if columns:
+            if self.engine == "arrow":
+                self.batch = self.batch.select(columns)
+            else:
+                self.df_mock = self.df_mock[columns]
+        return self.chunk()
 
     def output(self):
         """
         Checks the output format and calls the corresponding
         method to save the generated data.
         """
-        if self.conf_columns:
-            self.df_mock = self.df_mock[self.conf_columns]
-        if self.outputFormat == "csv":
-            self.saveInCSV()
-        elif self.outputFormat == "parquet":
-            self.saveInParquet()
+        self.outputColumns()
+        if self.outputFormat not in ("csv", "parquet", "arrow"):
+            return
+        with self.metrics.measure('write', offset=self.offset,
+                                  rows=self.n) as event, \
+                self.profiled('write', self.outputFormat):
+            if self.outputFormat == "csv":
+                self.saveInCSV()
+            elif self.outputFormat == "parquet":
+                self.saveInParquet()
+            else:
+                self.saveInArrow()
+            # Bytes added to the output file or dataset by the chunk
+            event.path = getattr(self, f"mock_file_{self.outputFormat}_path",
+                                 None)
+            if event.path:
+                size = pathSize(event.path)
+                event.bytes = size - (self.outputBytes
+                                      if self.offset or self.appendPath
+                                      else 0)
+                self.outputBytes = size
 
     def generateMockData(self):
         """
         Generates mock data based on the given configuration and saves it.
         """
-        self.df_mock = pd.DataFrame()
-        if self.volume > 15000:
-            self.df_mock = self.generateWithConf()
-            self.genMockData(self.df_mock)
-            self.generateWithConf(unique=True)
-        else:
-            self.df_mock = self.generateWithConf()
+        if self.chunk_rows:
+            self.streamChunks()
+            return
+        self.generateRange(0, self.volume)
         self.output()
 
     def editMockDataAndGenerate(self):
@@ -522,20 +1165,82 @@ between {self.colorLiteral(s)} to {self.colorLiteral(e)}".ljust(
         on the existing data, edit
         and saves it.
         """
-        df = self.checkFile(self.csv_file_path)
+        # Columns regenerated from the conf file are not loaded
+        df = self.seedData(
+            exclude=[spec.name for spec in self.plan.columns])
         if df.shape[0] > self.n:
             raise ValueError(f"given no. of rows is greater than {self.n}")
-        self.conf_columns = [*df.columns]
+        self.conf_columns = [*self.columns]
+        if self.chunk_rows:
+            self.streamChunks(df)
+            return
         self.genMockData(df)
         self.generateWithConf()
         self.output()
 
+    def seedData(self, exclude=()):
+        """
+        Load the seed file in the representation of the engine. Only the
+        seed_columns, if given, are loaded, and self.columns is set to the
+        output columns in the order of the file.
+        Args:
+            exclude (list): Output columns not loaded, as they are
+            generated.
+        Returns:
+            pd.DataFrame or pa.Table: The seed data, an Arrow table with the
+            arrow engine.
+        """
+        columns = self.seedColumns
+        if exclude:
+            try:
+                columns = columns or readColumns(self.csv_file_path)
+            except Exception as e:
+                raise SystemExit(e)
+            self.columns = [x.split(".")[-1] for x in columns]
+            # One column is still needed for the number of rows
+            columns = [x for x, name in zip(columns, self.columns)
+                       if name not in exclude] or columns[:1]
+        table = self.checkTable(self.csv_file_path, columns, self.seedTypes)
+        if not exclude:
+            self.columns = table.column_names
+        return table if self.engine == "arrow" else table.to_pandas()
+
     def justScaleData(self):
         """
         Reads a CSV file, generates mock data based
         on the existing data, and saves it.
         """
-        df = self.checkFile(self.csv_file_path)
-        self.conf_columns = [*df.columns]
+        if self.outOfCore:
+            self.scaleOutOfCore()
+            return
+        df = self.seedData()
+        self.conf_columns = [*self.columns]
+        if self.chunk_rows:
+            self.streamChunks(df)
+            return
         self.genMockData(df)
         self.output()
+
+    def scaleOutOfCore(self):
+        """
+        Scale a seed file larger than memory. The seed is streamed batch by
+        batch to a temporary directory, one memory-mapped file per column,
+        and the output is generated and saved in chunks, each gathering its
+        rows from the spilled columns. Memory depends on the chunk size,
+        not on the size of the seed or the volume.
+        """
+        self.chunk_rows = self.chunk_rows or DEFAULT_CHUNK_ROWS
+        with tempfile.TemporaryDirectory(dir=self.spillDir) as directory:
+            try:
+                with self.metrics.measure('load',
+                                          path=self.csv_file_path) as event:
+                    seed = SpilledSeed.spill(self.csv_file_path, directory,
+                                             self.seedColumns, self.seedTypes)
+                    event.rows = seed.num_rows
+            except Exception as e:
+                raise SystemExit(e)
+            self.metrics.log(f"Spilled {self.colorLiteral(seed.num_rows)} \
+rows of {self.colorLiteral(self.csv_file_path)} to disk")
+            self.columns = seed.columns
+            self.conf_columns = [*self.columns]
+            self.streamChunks(seed)
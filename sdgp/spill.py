@@ -0,0 +1,141 @@
+"""Seed data spilled to disk, for seeds larger than memory."""
+import os
+
+import numpy as np
+import pyarrow as pa
+
+from .loader import iterBatches
+from .rng import shuffleIndex
+
+# Bytes per record batch of a spilled column
+SPILL_BATCH_BYTES = 8 << 20
+
+
+def gather(values, index) -> pa.Array:
+    """
+    Take rows of a chunked array without concatenating its chunks. The
+    indices are sorted, so the chunks of a memory-mapped column are read
+    in file order, and only the gathered values are in memory.
+    Args:
+        values (pa.ChunkedArray): The column.
+        index (np.ndarray): Row indices.
+    Returns:
+        pa.Array: values[index].
+    """
+    if values.num_chunks == 1:
+        return values.chunk(0).take(pa.array(index))
+    order = np.argsort(index, kind='stable')
+    index = index[order]
+    offsets = np.cumsum([0] + [len(chunk) for chunk in values.chunks])
+    bounds = np.searchsorted(index, offsets)
+    parts = [values.chunk(i).take(pa.array(index[start:stop] - offsets[i]))
+             for i, (start, stop) in enumerate(zip(bounds, bounds[1:]))
+             if stop > start]
+    if not parts:
+        return pa.array([], type=values.type)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return pa.concat_arrays(parts).take(pa.array(inverse))
+
+
+class SpilledSeed:
+    """
+    Seed data streamed to one uncompressed Arrow IPC file per column, read
+    back memory-mapped. The rows of an output chunk are gathered column by
+    column with shuffleIndex, so memory depends on the chunk size, not on
+    the size of the seed. Pickled by path for worker processes.
+    Args:
+        directory (str): Directory of the column files.
+        columns (list): The column names.
+        num_rows (int): Number of rows of the seed.
+    """
+
+    def __init__(self, directory, columns, num_rows):
+        self.directory = directory
+        self.columns = list(columns)
+        self.num_rows = num_rows
+        self._tables = {}
+
+    @classmethod
+    def spill(cls, path, directory, columns=None, types=None):
+        """
+        Stream a seed file to disk, one batch at a time.
+        Args:
+            path (str): The CSV, Parquet or Feather seed file.
+            directory (str): Directory of the column files.
+            columns (list): Only spill these columns.
+            types (dict): Arrow types by column name.
+        Returns:
+            SpilledSeed: The spilled seed.
+        """
+        writers, buffers, names, num_rows = [], [], None, 0
+
+        def flush(writer, buffer):
+            writer.write_batch(pa.record_batch(
+                [pa.concat_arrays(buffer)], names=['values']))
+            buffer.clear()
+
+        try:
+            for batch in iterBatches(path, columns, types):
+                if names is None:
+                    names = [x.split(".")[-1] for x in batch.schema.names]
+                    writers = [pa.ipc.new_file(
+                        os.path.join(directory, f"{i}.arrow"),
+                        pa.schema([('values', field.type)]))
+                        for i, field in enumerate(batch.schema)]
+                    buffers = [[] for _ in writers]
+                num_rows += batch.num_rows
+                # Each column is buffered up to its own batch size
+                for writer, buffer, values in zip(writers, buffers,
+                                                  batch.columns):
+                    buffer.append(values)
+                    if sum(x.nbytes for x in buffer) >= SPILL_BATCH_BYTES:
+                        flush(writer, buffer)
+            for writer, buffer in zip(writers, buffers):
+                if buffer:
+                    flush(writer, buffer)
+        finally:
+            for writer in writers:
+                writer.close()
+        return cls(directory, names or [], num_rows)
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'columns': self.columns,
+                'num_rows': self.num_rows}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def shape(self):
+        return (self.num_rows, len(self.columns))
+
+    def column(self, name) -> pa.ChunkedArray:
+        """
+        A column, memory-mapped from its file on first use.
+        Args:
+            name (str): The column name.
+        Returns:
+            pa.ChunkedArray: The column.
+        """
+        if name not in self._tables:
+            path = os.path.join(self.directory,
+                                f"{self.columns.index(name)}.arrow")
+            with pa.ipc.open_file(pa.memory_map(path)) as reader:
+                self._tables[name] = reader.read_all().column(0)
+        return self._tables[name]
+
+    def sample(self, seed, name, offset, n) -> pa.Array:
+        """
+        Values of a column for the output rows [offset, offset + n), from
+        an endless sequence of random permutations of the seed rows.
+        Args:
+            seed (int): The root seed.
+            name (str): The column name.
+            offset (int): Index of the first row.
+            n (int): Number of rows.
+        Returns:
+            pa.Array: The n values.
+        """
+        return gather(self.column(name),
+                      shuffleIndex(seed, name, self.num_rows, offset, n))
@@ -0,0 +1,244 @@
+"""Vectorized sampling and formatting of datetime columns."""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NS_PER_SECOND = 10**9
+SECONDS_PER_DAY = 86400
+NS_PER_DAY = SECONDS_PER_DAY * NS_PER_SECOND
+# strftime directives whose output only depends on the calendar day
+DATE_DIRECTIVES = set('aAbBCdDeFgGhjmuUVwWxyY')
+# strftime directives whose output only depends on the second of the day
+TIME_DIRECTIVES = set('HIklMpPrRSTX')
+
+
+def splitFormat(format):
+    """
+    Split a strftime format into runs that depend either on the day or on
+    the second of the day.
+
+    Args:
+        format (str): A date format like '%Y-%m-%d %H:%M:%S'.
+    Returns:
+        list: A list of (kind, text) tuples where kind is 'date', 'time' or
+        'literal', or None when the format uses a directive that needs the
+        full timestamp (e.g. '%f', '%c', '%s', '%z').
+    """
+    runs = []
+    i = 0
+    while i < len(format):
+        char = format[i]
+        if char == '%' and i + 1 < len(format):
+            directive = format[i + 1]
+            token = format[i:i + 2]
+            i += 2
+            if directive == '%':
+                kind = 'literal'
+            elif directive in DATE_DIRECTIVES:
+                kind = 'date'
+            elif directive in TIME_DIRECTIVES:
+                kind = 'time'
+            else:
+                return None
+        else:
+            token = char
+            i += 1
+            kind = 'literal'
+        if runs and (kind == 'literal' or runs[-1][0] in (kind, 'literal')):
+            last_kind, text = runs[-1]
+            runs[-1] = (kind if last_kind == 'literal' else last_kind,
+                        text + token)
+        else:
+            runs.append((kind, token))
+    return runs
+
+
+def isDayGranular(format):
+    """
+    Check if a date format only renders the calendar day.
+
+    Args:
+        format (str): A date format like '%Y-%m-%d'.
+    Returns:
+        bool: True if every directive in the format is day based.
+    """
+    runs = splitFormat(format)
+    return runs is not None and all(kind != 'time' for kind, _ in runs)
+
+
+@lru_cache(maxsize=64)
+def secondsTable(format):
+    """
+    Render a time format for each of the 86,400 seconds of a day.
+
+    Args:
+        format (str): A time format like '%H:%M:%S'.
+    Returns:
+        np.ndarray: Array of 86,400 strings indexed by second of day.
+    """
+    seconds = np.arange(SECONDS_PER_DAY, dtype='int64').astype('datetime64[s]')
+    return np.asarray(pd.DatetimeIndex(seconds).strftime(format), dtype='U')
+
+
+def daysTable(days, format):
+    """
+    Render a date format once per distinct day.
+
+    Args:
+        days (np.ndarray): Days since the epoch as int64.
+        format (str): A date format like '%Y-%m-%d'.
+    Returns:
+        tuple: (table, index) such that table[index] renders every day.
+    """
+    first, last = days.min(), days.max()
+    if last - first + 1 <= max(len(days), 1):
+        distinct = np.arange(first, last + 1, dtype='int64')
+        index = days - first
+    else:
+        distinct, index = np.unique(days, return_inverse=True)
+    table = pd.DatetimeIndex(distinct.astype('datetime64[D]')).strftime(format)
+    return np.asarray(table, dtype='U'), index
+
+
+def truncateTimestamps(values, format):
+    """
+    Floor epoch nanoseconds to the resolution rendered by a format, so the
+    native values match what the formatted strings show.
+
+    Args:
+        values (np.ndarray): Epoch nanoseconds as int64.
+        format (str): A date format like '%Y-%m-%d %H:%M:%S'.
+    Returns:
+        np.ndarray: Truncated epoch nanoseconds as int64.
+    """
+    runs = splitFormat(format)
+    if runs is None:
+        return values
+    if all(kind != 'time' for kind, _ in runs):
+        return values - values % NS_PER_DAY
+    return values - values % NS_PER_SECOND
+
+
+def sampleTimestamps(rng, start, end, n):
+    """
+    Draw uniformly distributed timestamps in [start, end).
+
+    Args:
+        rng (np.random.Generator): Random generator to draw from.
+        start (pd.Timestamp): Lower bound.
+        end (pd.Timestamp): Upper bound.
+        n (int): Number of timestamps to draw.
+    Returns:
+        np.ndarray: Epoch nanoseconds as int64.
+    """
+    start, end = pd.Timestamp(start).value, pd.Timestamp(end).value
+    if end <= start:
+        return np.full(n, start, dtype='int64')
+    return start + rng.integers(0, end - start, n, dtype='int64')
+
+
+def formatTimestamps(values, format):
+    """
+    Format epoch nanoseconds in bulk. Day based parts of the format are
+    rendered once per distinct day and time based parts are looked up in a
+    table of the 86,400 seconds of a day, then the parts are joined.
+
+    Args:
+        values (np.ndarray): Epoch nanoseconds as int64.
+        format (str): A date format like '%Y-%m-%d %H:%M:%S'.
+    Returns:
+        np.ndarray: Array of formatted strings.
+    """
+    values = np.asarray(values, dtype='int64')
+    runs = splitFormat(format)
+    if runs is None:
+        return np.asarray(pd.DatetimeIndex(values).strftime(format),
+                          dtype=object)
+    if len(values) == 0:
+        return np.array([], dtype=object)
+    days = seconds = None
+    parts = []
+    for kind, text in runs:
+        if kind == 'date':
+            if days is None:
+                days = values // NS_PER_DAY
+            table, index = daysTable(days, text)
+            parts.append(table[index])
+        elif kind == 'time':
+            if seconds is None:
+                seconds = values // NS_PER_SECOND % SECONDS_PER_DAY
+            parts.append(secondsTable(text)[seconds])
+        else:
+            parts.append(text.replace('%%', '%'))
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    if isinstance(result, str):
+        return np.full(len(values), result, dtype=object)
+    return result
+
+
+@lru_cache(maxsize=64)
+def daysCategories(first, last, format):
+    """
+    Render a day granular format for every day of a range, as the unique
+    rendered strings and the code of each day into them.
+
+    Args:
+        first (int): First day of the range, in days since the epoch.
+        last (int): Last day of the range, included.
+        format (str): A day granular format like '%Y-%m-%d'.
+    Returns:
+        tuple: (categories, codes) such that categories[codes[day - first]]
+        renders a day.
+    """
+    days = np.arange(first, last + 1, dtype='int64')
+    table = pd.DatetimeIndex(days.astype('datetime64[D]')).strftime(format)
+    return np.unique(np.asarray(table, dtype='U'), return_inverse=True)
+
+
+def formatArrow(values, format) -> pa.Array:
+    """
+    Format epoch nanoseconds as an Arrow string array. The day and second
+    tables are gathered and joined by Arrow, so neither a fixed width
+    unicode array nor a Python string is built per row.
+
+    Args:
+        values (np.ndarray): Epoch nanoseconds as int64.
+        format (str): A date format like '%Y-%m-%d %H:%M:%S'.
+    Returns:
+        pa.Array: The formatted strings, large_string when their size could
+        overflow 32-bit offsets.
+    """
+    values = np.asarray(values, dtype='int64')
+    runs = splitFormat(format)
+    if runs is None or len(values) == 0 or \
+            all(kind == 'literal' for kind, _ in runs):
+        return pa.array(formatTimestamps(values, format), type=pa.string())
+    days = seconds = None
+    parts = []
+    for kind, text in runs:
+        if kind == 'date':
+            if days is None:
+                days = values // NS_PER_DAY
+            parts.append(daysTable(days, text))
+        elif kind == 'time':
+            if seconds is None:
+                seconds = values // NS_PER_SECOND % SECONDS_PER_DAY
+            parts.append((secondsTable(text), seconds))
+        else:
+            parts.append(text.replace('%%', '%'))
+    # Same bound as the unicode array the parts would be joined into
+    width = sum(part[0].itemsize if isinstance(part, tuple) else
+                4 * len(part) for part in parts)
+    type = pa.large_string() if len(values) * width >= 2**31 \
+        else pa.string()
+    parts = [pa.array(part[0], type=type).take(part[1])
+             if isinstance(part, tuple) else pa.scalar(part, type=type)
+             for part in parts]
+    if len(parts) == 1:
+        return parts[0]
+    return pc.binary_join_element_wise(*parts, pa.scalar('', type=type))
@@ -0,0 +1,239 @@
+"""
+Options of the output files. pyarrow is imported by the writers that use
+it, so the CLI can read these options without loading it.
+"""
+import bz2
+import csv
+import gzip
+import os
+import shutil
+
+PARQUET_CODECS = ['snappy', 'zstd', 'lz4', 'gzip', 'brotli', 'none']
+CSV_WRITERS = ['pandas', 'arrow']
+# Streaming codecs of the CSV output by file extension
+CSV_COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst', 'bz2': '.bz2'}
+CSV_QUOTING = {'needed': csv.QUOTE_MINIMAL, 'all_valid': csv.QUOTE_ALL,
+               'none': csv.QUOTE_NONE}
+# Largest row group of a dataset file when only a file size is given
+DATASET_ROW_GROUP_ROWS = 1 << 20
+
+
+class ParquetOptions:
+    """
+    Parquet output options. With partition columns, rows per file or a
+    target file size the output is a directory dataset written with
+    pyarrow.dataset, otherwise a single Parquet file.
+    Args:
+        partition_by (list): Columns of the hive style partitions
+        (column=value directories).
+        compression (str): Codec, one of PARQUET_CODECS.
+        compression_level (int): Level of the codec, codec default if None.
+        row_group_rows (int): Rows per row group.
+        file_rows (int): Largest number of rows per dataset file.
+        file_size (float): Target size of the dataset files in MB, from
+        the in-memory size of the rows, so compressed files are smaller.
+        dictionary (bool): Dictionary encode the columns.
+        statistics (bool): Write column statistics used to prune files.
+    """
+    __slots__ = ('partition_by', 'compression', 'compression_level',
+                 'row_group_rows', 'file_rows', 'file_size', 'dictionary',
+                 'statistics')
+
+    def __init__(self, partition_by=None, compression='snappy',
+                 compression_level=None, row_group_rows=None,
+                 file_rows=None, file_size=None, dictionary=True,
+                 statistics=True):
+        if compression not in PARQUET_CODECS:
+            raise ValueError(
+                f"Invalid compression '{compression}'. Allowed codecs are \
+'{', '.join(PARQUET_CODECS)}'")
+        for name, value in [('row_group_rows', row_group_rows),
+                            ('file_rows', file_rows),
+                            ('file_size', file_size)]:
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive, got {value}")
+        self.partition_by = list(partition_by or [])
+        self.compression = compression
+        self.compression_level = compression_level
+        self.row_group_rows = row_group_rows
+        self.file_rows = file_rows
+        self.file_size = file_size
+        self.dictionary = dictionary
+        self.statistics = statistics
+
+    @property
+    def dataset(self) -> bool:
+        """True if the output is a directory dataset."""
+        return bool(self.partition_by or self.file_rows or self.file_size)
+
+    def writerOptions(self) -> dict:
+        """
+        Keyword arguments of pq.ParquetWriter.
+        Returns:
+            dict: The codec, dictionary and statistics options.
+        """
+        return dict(
+            compression=self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=self.dictionary,
+            write_statistics=self.statistics)
+
+    def fileRows(self, table) -> int:
+        """
+        Largest number of rows per dataset file.
+        Args:
+            table (pa.Table): A chunk, sizing the rows for file_size.
+        Returns:
+            int: Rows per file, or None for no limit.
+        """
+        rows = [self.file_rows] if self.file_rows else []
+        if self.file_size and table.num_rows:
+            row_bytes = max(table.nbytes / table.num_rows, 1)
+            rows.append(max(int(self.file_size * 2**20 / row_bytes), 1))
+        return min(rows) if rows else None
+
+    def prepareDataset(self, path, columns, clear=True):
+        """
+        Check the partition columns and empty the dataset directory before
+        the first chunk, as a single output file would be overwritten.
+        Args:
+            path (str): The dataset directory.
+            columns (list): The output columns.
+            clear (bool): Remove the files of the directory, False when
+            appending to it.
+        Raises:
+            ValueError: If a partition column is not an output column.
+        """
+        for column in self.partition_by:
+            if column not in columns:
+                raise ValueError(
+                    f"Partition column '{column}' is not an output column")
+        if clear and os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def writeDataset(self, table, path, basename):
+        """
+        Write a chunk to the dataset directory. Files of the partitions
+        are written in parallel threads.
+        Args:
+            table (pa.Table): The chunk.
+            path (str): The dataset directory.
+            basename (str): Template of the file names of the chunk, with
+            '{i}' replaced by the file number.
+        """
+        import pyarrow.dataset as ds
+        file_rows = self.fileRows(table)
+        group_rows = self.row_group_rows or DATASET_ROW_GROUP_ROWS
+        if file_rows:
+            group_rows = min(group_rows, file_rows)
+        partitioning = None
+        if self.partition_by:
+            partitioning = ds.partitioning(
+                table.select(self.partition_by).schema, flavor='hive')
+        ds.write_dataset(
+            table, path, format='parquet', partitioning=partitioning,
+            basename_template=basename,
+            file_options=ds.ParquetFileFormat().make_write_options(
+                **self.writerOptions()),
+            max_rows_per_file=file_rows or 0, max_rows_per_group=group_rows,
+            min_rows_per_group=min(group_rows, table.num_rows) or None,
+            existing_data_behavior='overwrite_or_ignore')
+
+
+def compressionOf(path):
+    """
+    CSV codec implied by the extension of a file name.
+    Args:
+        path (str): A file name like 'table.csv.gz'.
+    Returns:
+        tuple: (path without the codec extension, codec or None).
+    """
+    for codec, extension in CSV_COMPRESSIONS.items():
+        if path.endswith(extension):
+            return path[:-len(extension)], codec
+    return path, None
+
+
+class CSVOptions:
+    """
+    CSV output options. The pandas writer, the default, keeps the
+    DataFrame.to_csv formatting of earlier versions (minimal quoting,
+    True/False booleans). The arrow writer streams the chunks through
+    pyarrow's faster, multi-threaded CSVWriter, with pyarrow's formatting:
+    quoted header and strings, true/false booleans and shortest floats.
+    Args:
+        writer (str): 'pandas' or 'arrow'.
+        compression (str): Streaming codec, one of CSV_COMPRESSIONS, or
+        None for plain text.
+        compression_level (int): Level of gzip and bz2 (6 and 9 by
+        default); zstd uses pyarrow's default level.
+        delimiter (str): Field delimiter, one character.
+        quoting (str): 'needed' quotes strings (arrow) or values with
+        special characters (pandas), 'all_valid' quotes every value and
+        'none' never quotes.
+        header (bool): Write the header line.
+    """
+    __slots__ = ('writer', 'compression', 'compression_level', 'delimiter',
+                 'quoting', 'header')
+
+    def __init__(self, writer='pandas', compression=None,
+                 compression_level=None, delimiter=',', quoting='needed',
+                 header=True):
+        if writer not in CSV_WRITERS:
+            raise ValueError(f"Invalid CSV writer '{writer}'. Allowed \
+writers are '{', '.join(CSV_WRITERS)}'")
+        if compression not in (None, *CSV_COMPRESSIONS):
+            raise ValueError(f"Invalid CSV compression '{compression}'. \
+Allowed codecs are '{', '.join(CSV_COMPRESSIONS)}'")
+        if quoting not in CSV_QUOTING:
+            raise ValueError(f"Invalid quoting '{quoting}'. Allowed values \
+are '{', '.join(CSV_QUOTING)}'")
+        if len(delimiter) != 1:
+            raise ValueError(f"Delimiter must be one character, got \
+'{delimiter}'")
+        self.writer = writer
+        self.compression = compression
+        self.compression_level = compression_level
+        self.delimiter = delimiter
+        self.quoting = quoting
+        self.header = header
+
+    def extension(self) -> str:
+        """Extension of the output file, e.g. '.csv.gz'."""
+        return '.csv' + CSV_COMPRESSIONS.get(self.compression, '')
+
+    def openStream(self, path, append=False):
+        """
+        Open the output file, compressing on the fly.
+        Args:
+            path (str): The output file.
+            append (bool): Write after the end of an existing file, in a
+            new compressed stream for a compressed file.
+        Returns:
+            file: A binary file object.
+        """
+        mode = 'ab' if append else 'wb'
+        if self.compression == 'gzip':
+            return gzip.open(path, mode, compresslevel=self.compression_level
+                             if self.compression_level is not None else 6)
+        if self.compression == 'bz2':
+            return bz2.open(path, mode, compresslevel=self.compression_level
+                            if self.compression_level is not None else 9)
+        import pyarrow as pa
+        if not append:
+            return pa.output_stream(path, compression=self.compression)
+        stream = pa.OSFile(path, 'a')
+        return pa.CompressedOutputStream(stream, self.compression) \
+            if self.compression else stream
+
+    def writeOptions(self):
+        """Options of the arrow CSVWriter, a pyarrow.csv.WriteOptions."""
+        import pyarrow.csv as pc
+        return pc.WriteOptions(include_header=self.header,
+                               delimiter=self.delimiter,
+                               quoting_style=self.quoting)
+
+    def pandasOptions(self) -> dict:
+        """Keyword arguments of DataFrame.to_csv."""
+        return dict(index=False, sep=self.delimiter,
+                    quoting=CSV_QUOTING[self.quoting])
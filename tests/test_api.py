@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.api` module."""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+from sdgp.api import generate
+from sdgp.loader import loadTable
+from sdgp.plan import confFrame
+from sdgp.sdgp import DataGenerator
+
+CONF = 'tests/test_assect/test_conf_p.csv'
+DATA = 'tests/test_assect/test_data.csv'
+
+
+class TestApi(unittest.TestCase):
+    """Tests for `sdgp.api` module."""
+
+    def test_conf_frame(self):
+        conf = confFrame([('id', 'uniqueIndex', 1),
+                          {'name': 'model', 'type': 'category',
+                           'values': ['a', 'b']}])
+        self.assertEqual(conf.to_dict(orient='records'), [
+            {'name': 'id', 'type': 'uniqueIndex', 'values': '1'},
+            {'name': 'model', 'type': 'category', 'values': 'a|b'}])
+        self.assertTrue(confFrame({'id': ('uniqueIndex', 1)}).equals(
+            confFrame(conf.iloc[:1])))
+        with self.assertRaises(ValueError):
+            confFrame([{'name': 'id', 'type': 'uniqueIndex'}])
+
+    def test_generate(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            chunks = list(generate(CONF, rows=250, batch_rows=100, seed=7))
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        tmp = tempfile.mkdtemp()
+        try:
+            with contextlib.redirect_stdout(output):
+                data_gen = DataGenerator(
+                    volume=250, file=os.path.join(tmp, 'mock'),
+                    conf_file=CONF, format="csv", choice="m",
+                    chunk_rows=100, seed=7)
+                data_gen.generateMockData()
+            expected = pd.read_csv(data_gen.mock_file_csv_path)
+        finally:
+            shutil.rmtree(tmp)
+        # The same rows as the file written with the same seed
+        df = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(df['id1'].tolist(), expected['id1'].tolist())
+        # Empty strings are read back as NaN
+        self.assertEqual(df['model1'].tolist(),
+                         expected['model1'].fillna('').tolist())
+        batches = list(generate(
+            {'id': ('uniqueIndex', 5), 'model': ('category', ['a', 'b'])},
+            rows=30, batch_rows=20, seed=7, engine='arrow'))
+        self.assertTrue(all(isinstance(batch, pa.RecordBatch)
+                            for batch in batches))
+        self.assertEqual(pa.Table.from_batches(batches).column(
+            'id').to_pylist(), list(range(5, 35)))
+        with self.assertRaises(ValueError):
+            generate()
+
+    def test_generate_data(self):
+        table = loadTable(DATA)
+        scaled = list(generate(data=table, rows=300, batch_rows=120,
+                               seed=3))
+        self.assertEqual([chunk.shape for chunk in scaled],
+                         [(120, table.num_columns)] * 2 +
+                         [(60, table.num_columns)])
+        edited = list(generate({'model1': ('category', 'x|y')}, data=table,
+                               rows=300, batch_rows=120, seed=3,
+                               engine='arrow'))
+        self.assertEqual(edited[0].schema.names, table.column_names)
+        self.assertEqual(set(pa.Table.from_batches(edited).column(
+            'model1').to_pylist()), {'x', 'y'})
+        with self.assertRaises(ValueError):
+            list(generate(data=table, rows=10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+"""Tests for `benchmarks` package."""
+import unittest
+from benchmarks.cases import allCases
+from benchmarks.run import compare
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Tests for `benchmarks` package."""
+
+    def test_cases(self):
+        names = [case.name for case in allCases(
+            ['types', 'mock', 'writers', 'cli', 'startup'], 1000,
+            [10**5, 10**7])]
+        self.assertEqual(len(names), len(set(names)))
+        for name in ['type/regexPattern/arrow', 'type/composite/pandas',
+                     'mock/arrow', 'writer/parquet', 'cli/g/1e7',
+                     'startup/import']:
+            self.assertIn(name, names)
+        with self.assertRaises(ValueError):
+            allCases(['unknown'], 1000, [])
+
+    def test_compare(self):
+        baseline = {'a': {'rows_per_sec': 100.0, 'peak_rss_mb': 100.0},
+                    'b': {'rows_per_sec': 100.0, 'peak_rss_mb': 100.0}}
+        results = {'a': {'rows_per_sec': 85.0, 'peak_rss_mb': 110.0},
+                   'b': {'rows_per_sec': 70.0, 'peak_rss_mb': 130.0},
+                   'c': {'rows_per_sec': 1.0, 'peak_rss_mb': 1.0}}
+        regressions = compare(results, baseline, 0.2, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(x.startswith('b: ') for x in regressions))
+        self.assertEqual(compare({'a': {'error': 'ValueError'}}, baseline),
+                         ['a: ValueError'])
+
+
+if __name__ == '__main__':
+    unittest.main()
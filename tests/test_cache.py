@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.cache` module."""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sdgp.cache import DatasetCache, cacheKey, fileDigest
+from sdgp.cli import main
+from sdgp.sdgp import DataGenerator
+
+CONF = 'tests/test_assect/test_conf_p.csv'
+
+
+class TestCache(unittest.TestCase):
+    """Tests for `sdgp.cache` module."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, size):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as file:
+            file.write(b'x' * size)
+        return path
+
+    def test_cache(self):
+        self.assertEqual(cacheKey({'a': 1, 'b': 2}),
+                         cacheKey({'b': 2, 'a': 1}))
+        self.assertNotEqual(cacheKey({'a': 1}), cacheKey({'a': 2}))
+        cache = DatasetCache(self.directory, max_bytes=250)
+        for key in 'abc':
+            cache.store(key, self.write(key, 100))
+            time.sleep(0.01)
+        # The least recently used entry is evicted beyond 250 bytes
+        self.assertEqual([entry['key'] for entry in cache.entries()],
+                         ['c', 'b'])
+        target = os.path.join(self.tmp, 'served')
+        self.assertFalse(cache.fetch('a', target))
+        self.assertTrue(cache.fetch('b', target))
+        self.assertEqual(os.path.getsize(target), 100)
+        self.assertEqual(cache.entries()[0]['key'], 'b')
+        # Directories are stored and served with their files
+        dataset = os.path.join(self.tmp, 'dataset')
+        os.makedirs(os.path.join(dataset, 'p=1'))
+        shutil.move(self.write('part', 10), os.path.join(dataset, 'p=1'))
+        digest = fileDigest(dataset)
+        cache.store('d', dataset)
+        shutil.rmtree(dataset)
+        self.assertTrue(cache.fetch('d', dataset))
+        self.assertEqual(fileDigest(dataset), digest)
+        self.assertEqual(cache.size(), 210)
+        self.assertEqual(len(cache.clear()), 3)
+        self.assertEqual(cache.entries(), [])
+
+    def test_run_cached(self):
+        def generator(seed, workers=1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return DataGenerator(
+                    volume=500, file=os.path.join(self.tmp, 'mock'),
+                    conf_file=CONF, format="csv", choice="m", seed=seed,
+                    workers=workers, cache_dir=self.directory)
+        data_gen = generator(3)
+        data_gen.runCached(data_gen.generateMockData)
+        path = data_gen.mock_file_csv_path
+        expected = pd.read_csv(path)
+        os.remove(path)
+        data_gen = generator(3)
+        with patch.object(data_gen, 'generateMockData') as generate:
+            data_gen.runCached(data_gen.generateMockData)
+        generate.assert_not_called()
+        self.assertTrue(pd.read_csv(path).equals(expected))
+        # Rewriting the output does not change the cached file
+        data_gen = generator(4)
+        data_gen.runCached(data_gen.generateMockData)
+        self.assertEqual(len(DatasetCache(self.directory).entries()), 2)
+        self.assertFalse(pd.read_csv(path).equals(expected))
+        self.assertIsNone(generator(None).cache)
+        # Compiled column values the output depends on are in the key
+        data_gen = generator(3)
+        self.assertEqual(data_gen.cacheParts()['specs'], [
+            spec.memoParts() for spec in data_gen.plan.columns])
+        # Chunks derived from the workers do not change the key
+        self.assertEqual(generator(3, workers=2).cacheParts(),
+                         generator(3).cacheParts())
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main(['cache', 'list', '--cache-dir', self.directory])
+            main(['cache', 'clear', '--cache-dir', self.directory])
+        self.assertIn("2 entries", output.getvalue())
+        self.assertIn("Removed 2 entries", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
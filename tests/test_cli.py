@@ -1,8 +1,10 @@
 
 import io
 import os
+import subprocess
 import sys
 from unittest.mock import patch
+import pyarrow.parquet as pq
 from sdgp.cli import main
 
 
@@ -120,3 +122,44 @@ _{mode}_{records}.{file_format}')
             assert True
         else:
             assert False
+
+
+def test_main_mock_data_in_chunks():
+    mock_file_name = r'tests/mock_table.csv'
+    mock_file_outfile = mock_file_name.split('.csv')[0]
+    conf_file = r'tests/test_assect/test_conf_p.csv'
+    file_format = 'parquet'
+    mode = 'm'
+    records = str(2500)
+    with patch.object(sys, 'argv', ['sdgp', '-c', mode, records, file_format,
+                                    mock_file_name, conf_file,
+                                    '--chunk-rows', '1000']):
+        main()
+        path = f'{mock_file_outfile}_{mode}_{records}.{file_format}'
+        assert os.path.exists(path)
+        metadata = pq.ParquetFile(path).metadata
+        os.remove(path)
+        assert metadata.num_rows == 2500
+        assert metadata.num_row_groups == 3
+
+
+def test_import_is_light():
+    # A fresh interpreter, as this one already imported pyarrow
+    code = ("import sys, sdgp.cli; print(sorted({m.split('.')[0] for m in "
+            "sys.modules} & {'pyarrow', 'pandas', 'numpy', 'exrex'}))")
+    result = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_main_invalid_seed_types():
+    with patch.object(sys, 'argv', ['sdgp', '-c', 'g', '10', 'csv',
+                                    'tests/test_assect/test_data.csv',
+                                    '--seed-types', 'id:text']):
+        with patch('sys.stderr', new=io.StringIO()) as fake_error:
+            try:
+                main()
+                assert False
+            except SystemExit as e:
+                assert e.code == 2
+        assert "Invalid type 'text'" in fake_error.getvalue()
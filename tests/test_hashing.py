@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.hashing` module."""
+import hashlib
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from sdgp.hashing import hashColumns, hashKeys, hashPool, joinKeys
+
+
+class TestHashing(unittest.TestCase):
+    """Tests for `sdgp.hashing` module."""
+
+    def setUp(self):
+        self.df = pd.DataFrame({"a": [1, 12, 3], "b": ["23", "3", "x"]})
+
+    def test_join_keys(self):
+        keys = joinKeys([self.df.a, self.df.b])
+        self.assertEqual(list(keys), ["1|23", "12|3", "3|x"])
+
+    def test_hash_keys(self):
+        keys = joinKeys([self.df.a, self.df.b])
+        result = hashKeys(keys)
+        self.assertEqual(result[0], hashlib.sha1(b"1|23").hexdigest())
+        # The separator keeps '1|23' and '12|3' apart
+        self.assertNotEqual(result[0], result[1])
+        result = hashKeys(keys, "blake2b")
+        self.assertEqual(result[2], hashlib.blake2b(
+            b"3|x", digest_size=20).hexdigest())
+        with self.assertRaises(ValueError):
+            hashKeys(keys, "md4")
+
+    def test_hash_columns(self):
+        result = hashColumns([self.df.a, self.df.b])
+        self.assertEqual(result[1], hashlib.sha1(b"12|3").hexdigest())
+        result = hashColumns([self.df.a, self.df.b], "hash64")
+        self.assertEqual(result.dtype, np.int64)
+        self.assertEqual(len(set(result)), 3)
+        self.assertEqual(list(result), list(hashColumns(
+            [self.df.a.copy(), self.df.b.copy()], "hash64")))
+
+    @patch('sdgp.hashing.PARALLEL_MIN_ROWS', 4)
+    @patch('sdgp.hashing.HASH_BATCH_ROWS', 2)
+    def test_hash_keys_parallel(self):
+        keys = joinKeys([np.arange(10)])
+        self.assertEqual(list(hashKeys(keys, workers=2)),
+                         list(hashKeys(keys, workers=1)))
+        # The pool is reused by later calls
+        pool = hashPool(2)
+        hashKeys(keys, workers=2)
+        self.assertIs(hashPool(2), pool)
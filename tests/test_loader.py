@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.loader` module."""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from sdgp.loader import (fileFormat, loadTable, outputRows, parseTypes,
+                         readColumns)
+from sdgp.sdgp import DataGenerator
+
+DATA = 'tests/test_assect/test_data.csv'
+
+
+class TestLoader(unittest.TestCase):
+    """Tests for `sdgp.loader` module."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_parse_types(self):
+        self.assertEqual(parseTypes('id:string, n:int32'),
+                         {'id': pa.string(), 'n': pa.int32()})
+        self.assertEqual(parseTypes(None), {})
+        with self.assertRaises(ValueError):
+            parseTypes('id')
+        with self.assertRaises(ValueError):
+            parseTypes('id:text')
+        self.assertEqual(fileFormat('seed.PARQUET'), 'parquet')
+        self.assertEqual(fileFormat('seed.arrow'), 'feather')
+        self.assertEqual(fileFormat('seed.csv.gz'), 'csv')
+
+    def test_load_csv(self):
+        table = loadTable(DATA)
+        df = pd.read_csv(DATA)
+        self.assertEqual(table.column_names, list(df.columns))
+        # Large integers, dates and times keep their text as in pandas
+        self.assertEqual(table.column('id1').to_pylist()[:2],
+                         [str(x) for x in df.id1[:2]])
+        self.assertEqual(table.column('date1').to_pylist(),
+                         df.date1.tolist())
+        self.assertEqual(table.schema.field('time1').type, pa.string())
+        self.assertEqual(table.column('model').null_count,
+                         df.model.isna().sum())
+        table = loadTable(DATA, columns=['model1', 'id1'],
+                          types={'number1': pa.string()})
+        self.assertEqual(table.column_names, ['model1', 'id1'])
+        conf = loadTable('tests/test_assect/test_conf.csv', strings=True)
+        self.assertTrue(all(pa.types.is_string(field.type)
+                            for field in conf.schema))
+
+    def test_load_formats(self):
+        table = loadTable(DATA)
+        path = os.path.join(self.tmp, 'seed.csv.gz')
+        with open(DATA, 'rb') as source, gzip.open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        self.assertTrue(loadTable(path).equals(table))
+        path = os.path.join(self.tmp, 'seed.parquet')
+        pq.write_table(table, path)
+        self.assertEqual(readColumns(path), table.column_names)
+        loaded = loadTable(path, columns=['number1'],
+                           types={'number1': pa.int32()})
+        self.assertEqual(loaded.schema, pa.schema([('number1', pa.int32())]))
+        path = os.path.join(self.tmp, 'seed.feather')
+        feather.write_feather(table, path)
+        self.assertEqual(readColumns(path), table.column_names)
+        self.assertTrue(loadTable(path, columns=['id1', 'model1']).equals(
+            table.select(['id1', 'model1'])))
+
+    def test_seed_projection(self):
+        path = os.path.join(self.tmp, 'seed.parquet')
+        table = loadTable(DATA)
+        pq.write_table(table.append_column('extra', table.column('id1')),
+                       path)
+        data_gen = DataGenerator(
+            volume=100, file=path,
+            conf_file=r'tests/test_assect/test_conf.csv',
+            format="csv", choice="e", seed=7)
+        # Columns generated from the conf file are not loaded
+        df = data_gen.seedData(
+            exclude=[spec.name for spec in data_gen.plan.columns])
+        self.assertEqual(data_gen.columns, readColumns(path))
+        self.assertEqual(list(df.columns), ['extra'])
+        data_gen.seedColumns = ['model1', 'id1']
+        data_gen.engine = 'arrow'
+        table = data_gen.seedData()
+        self.assertEqual(table.column_names, ['model1', 'id1'])
+        self.assertEqual(data_gen.columns, ['model1', 'id1'])
+
+    def test_output_rows(self):
+        # Rows and largest values of CSV files, Parquet files and datasets
+        df = pd.DataFrame({'id': [3, 4, 9], 'name': ['a', 'b,c', 'd']})
+        path = os.path.join(self.tmp, 'out.csv.gz')
+        with gzip.open(path, 'wt') as file:
+            df.to_csv(file, index=False)
+        self.assertEqual(outputRows(path, ['id', 'name']),
+                         (3, ['id', 'name'], {'id': 9, 'name': None}))
+        path = os.path.join(self.tmp, 'out.csv')
+        df.to_csv(path, index=False, header=False, sep=';')
+        self.assertEqual(outputRows(path, ['id'], ';', header=False),
+                         (3, None, {'id': None}))
+        path = os.path.join(self.tmp, 'out')
+        os.makedirs(path)
+        pq.write_table(pa.Table.from_pandas(df), os.path.join(
+            path, 'part-0.parquet'), row_group_size=2)
+        pq.write_table(pa.Table.from_pandas(df.iloc[:1]), os.path.join(
+            path, 'part-3.parquet'), write_statistics=False)
+        self.assertEqual(outputRows(path, ['id']),
+                         (4, ['id', 'name'], {'id': 9}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.memo` module."""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sdgp.memo import ColumnStore, columnKeys
+from sdgp.plan import compileColumn
+from sdgp.sdgp import DataGenerator
+
+
+class TestMemo(unittest.TestCase):
+    """Tests for `sdgp.memo` module."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, 'memo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_column_keys(self):
+        specs = [compileColumn('a', 'category', 'x|y'),
+                 compileColumn('b', 'intRange', '1|5'),
+                 compileColumn('c', 'composite', 'a|b')]
+        keys = columnKeys(specs, {'seed': 1})
+        specs[0] = compileColumn('a', 'category', 'x|z')
+        edited = columnKeys(specs, {'seed': 1})
+        self.assertEqual([keys[x] == edited[x] for x in 'abc'],
+                         [False, True, False])
+        self.assertNotEqual(columnKeys(specs, {'seed': 2})['b'], edited['b'])
+
+    def test_store(self):
+        store = ColumnStore(self.directory, max_bytes=10**6)
+        store.save('f', np.arange(1000, dtype='float64'))
+        store.save('c', pd.Categorical(['x', 'y', 'x']))
+        store.save('d', np.array(['2020', '2021']), np.array([1, 2]))
+        values, native = store.load('f')
+        np.testing.assert_array_equal(values, np.arange(1000))
+        self.assertIsNone(native)
+        values, native = store.load('c')
+        self.assertIsInstance(values, pd.Categorical)
+        self.assertEqual(list(values), ['x', 'y', 'x'])
+        values, native = store.load('d', engine='arrow')
+        self.assertIsInstance(values, pa.Array)
+        self.assertEqual(native.tolist(), [1, 2])
+        self.assertIsNone(store.load('missing'))
+        # The least recently used columns are removed beyond the cap
+        time.sleep(0.01)
+        store.load('f')
+        store.prune(os.path.getsize(store.path('f')))
+        self.assertEqual(os.listdir(self.directory), ['f.arrow'])
+        self.assertEqual(store.bytes, os.path.getsize(store.path('f')))
+
+    def test_stored_columns(self):
+        conf = pd.read_csv('tests/test_assect/test_conf_p.csv', dtype=str,
+                           keep_default_na=False)
+
+        def run(conf, name):
+            with contextlib.redirect_stdout(io.StringIO()):
+                data_gen = DataGenerator(
+                    volume=600, file=os.path.join(self.tmp, name),
+                    conf_file=conf, format="csv", choice="m", seed=9,
+                    chunk_rows=250, memo_dir=self.directory)
+                data_gen.generateMockData()
+            with open(data_gen.mock_file_csv_path) as file:
+                output = file.read()
+            return output, {event.column for event in data_gen.metrics.events
+                            if event.stage == 'generate' and event.path}
+        output, loaded = run(conf, 'a')
+        self.assertEqual(loaded, set())
+        again, loaded = run(conf, 'b')
+        self.assertEqual(again, output)
+        self.assertIn('dateRange1', loaded)
+        self.assertIn('compositeKey1', loaded)
+        conf.loc[conf.name == 'model1', 'values'] = 'X|Y'
+        edited, loaded_edited = run(conf, 'c')
+        self.assertEqual(loaded - loaded_edited, {'model1', 'compositeKey1'})
+        self.assertNotEqual(edited, output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.metrics` module."""
+import contextlib
+import io
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from sdgp.metrics import Metrics
+from sdgp.sdgp import DataGenerator
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for `sdgp.metrics` module."""
+
+    def test_measure(self):
+        metrics = Metrics()
+        seen = []
+        metrics.subscribe(seen.append)
+        metrics.log("hello")
+        with metrics.measure('generate', 'a', offset=0, rows=1000,
+                             thread=True) as event:
+            event.produced(np.zeros(1000))
+        with metrics.measure('write', path='out.csv', rows=1000) as event:
+            event.bytes = 10
+        self.assertEqual([event.stage for event in seen],
+                         ['log', 'generate', 'write'])
+        # Log events only go to the consumers
+        self.assertEqual(len(metrics.events), 2)
+        event = metrics.events[0].asDict()
+        self.assertEqual((event['column'], event['rows'], event['bytes']),
+                         ('a', 1000, 8000))
+        self.assertGreater(event['wall_s'], 0)
+        summary = metrics.summary()
+        self.assertEqual(summary['stages']['write']['bytes'], 10)
+        self.assertEqual(summary['columns']['a']['rows'], 1000)
+        copy = pickle.loads(pickle.dumps(metrics))
+        self.assertEqual(copy.events, [])
+        self.assertEqual(len(metrics.popEvents()), 2)
+        self.assertEqual(metrics.events, [])
+
+    def test_generator_metrics(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            data_gen = DataGenerator(
+                volume=900, file="tests/test_assect/test_metrics",
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format="csv", choice="m", chunk_rows=400, seed=42,
+                threads=2, verbose=False)
+            data_gen.generateMockData()
+        os.remove(data_gen.mock_file_csv_path)
+        self.assertEqual(output.getvalue(), "")
+        summary = data_gen.metrics.summary()
+        self.assertEqual(list(summary['stages']),
+                         ['load', 'plan', 'generate', 'write'])
+        self.assertEqual(summary['stages']['write']['rows'], 900)
+        self.assertEqual(summary['columns']['model1']['rows'], 900)
+        self.assertTrue(all(event.bytes > 0 for event in
+                            data_gen.metrics.events
+                            if event.stage == 'write'))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics.jsonl')
+            data_gen.metrics.save(path)
+            with open(path) as file:
+                events = [json.loads(line) for line in file]
+            self.assertEqual(len(events), len(data_gen.metrics.events))
+            path = os.path.join(directory, 'metrics.json')
+            data_gen.metrics.save(path)
+            with open(path) as file:
+                self.assertEqual(set(json.load(file)),
+                                 {'events', 'summary'})
+
+
+if __name__ == '__main__':
+    unittest.main()
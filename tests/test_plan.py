@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.plan` module."""
+import pickle
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sdgp.plan import (CategorySpec, GenerationPlan, UniqueIndexSpec,
+                       codesDtype, compileColumn, toArrow)
+from sdgp.sdgp import DataGenerator
+
+
+def conf(*rows):
+    return {i: {'name': name, 'type': type, 'values': values}
+            for i, (name, type, values) in enumerate(rows)}
+
+
+class TestPlan(unittest.TestCase):
+    """Tests for `sdgp.plan` module."""
+
+    def test_compile_column(self):
+        spec = compileColumn('id', 'uniqueIndex', '10')
+        self.assertIsInstance(spec, UniqueIndexSpec)
+        self.assertEqual(spec.start, 10)
+        self.assertFalse(hasattr(spec, '__dict__'))
+        spec = compileColumn('c', 'category', 'A|B~0.25|0.75')
+        self.assertIsInstance(spec, CategorySpec)
+        self.assertEqual(spec.choices.tolist(), ['A', 'B'])
+        self.assertEqual(spec.p, [0.25, 0.75])
+        with self.assertRaises(ValueError):
+            compileColumn('c', 'category', 'A|B~0.5|0.6')
+        with self.assertRaises(ValueError):
+            compileColumn('d', 'dateRange', '2022-01-02|2022-01-01|%Y')
+        with self.assertRaises(ValueError):
+            compileColumn('k', 'composite', 'a|b~md5')
+        with self.assertRaises(ValueError):
+            compileColumn('x', 'unknown', '1')
+
+    def test_dependency_order(self):
+        plan = GenerationPlan.fromConf(conf(
+            ('key', 'composite', 'id|code|end'),
+            ('end', 'dependentDateRange', 'mid|1D|2D|%Y-%m-%d'),
+            ('mid', 'dependentDateRange', 'start|1D|2D|%Y-%m-%d'),
+            ('start', 'dateRange', '2022-01-01|2022-02-01|%Y-%m-%d'),
+            ('id', 'uniqueIndex', '1'),
+            ('code', 'regexPattern', '[A-Z]{3}')))
+        self.assertEqual([[spec.name for spec in level]
+                          for level in plan.levels],
+                         [['start', 'id', 'code'], ['mid'], ['end'],
+                          ['key']])
+        self.assertEqual([spec.name for spec in plan.byType('composite')],
+                         ['key'])
+
+    def test_circular_dependency(self):
+        with self.assertRaises(ValueError):
+            GenerationPlan.fromConf(conf(
+                ('a', 'dependentDateRange', 'b|1D|2D|%Y-%m-%d'),
+                ('b', 'dependentDateRange', 'a|1D|2D|%Y-%m-%d')))
+
+    def test_generate_plan(self):
+        data_gen = DataGenerator(
+            volume=50, file="tests/test_assect/test_data",
+            conf_file=r'tests/test_assect/test_conf.csv',
+            format="csv", choice="m", seed=7)
+        data_gen.plan = GenerationPlan.fromConf(conf(
+            ('end', 'dependentDateRange', 'start|1D|3D|%Y-%m-%d'),
+            ('start', 'dateRange', '2022-01-01|2022-02-01|%Y-%m-%d'),
+            ('day', 'date', '2022-10-26|%d/%m/%Y'),
+            ('hour', 'time', '08:00:00|09:00:00|%Y-%m-%d %H')))
+        # The plan survives pickling, as done for worker processes
+        data_gen.plan = pickle.loads(pickle.dumps(data_gen.plan))
+        data_gen.df_mock = pd.DataFrame()
+        df = data_gen.generateWithConf()
+        self.assertEqual(df.shape, (50, 4))
+        gap = pd.to_datetime(df.end) - pd.to_datetime(df.start)
+        self.assertTrue(gap.between(pd.Timedelta('1D'),
+                                    pd.Timedelta('3D')).all())
+        self.assertTrue((df.day == '26/10/2022').all())
+        # Times with date directives do not depend on the day of the run
+        self.assertTrue(df.hour.isin(['1970-01-01 08', '1970-01-01 09']).all())
+        np.testing.assert_array_equal(
+            df.start, data_gen.generateDates(
+                '2022-01-01', '2022-02-01', '%Y-%m-%d', 'start'))
+
+    def test_date_range_column(self):
+        data_gen = DataGenerator(
+            volume=400, file="tests/test_assect/test_data",
+            conf_file=r'tests/test_assect/test_conf.csv',
+            format="csv", choice="m", seed=7)
+        spec = compileColumn('d', 'dateRange', '2022-01-01|2022-12-31|%Y-%m')
+        chunks = []
+        for offset in [0, 200]:
+            data_gen.offset, data_gen.n = offset, 200
+            chunks.append(spec.generate(data_gen))
+            values = spec.arrow(data_gen)
+            self.assertEqual(values.dictionary_decode().to_pylist(),
+                             chunks[-1].tolist())
+        # Every chunk shares the days of the whole range as categories
+        self.assertIsInstance(chunks[0], pd.Categorical)
+        self.assertEqual([list(chunk.categories) for chunk in chunks],
+                         [[f'2022-{month:02}' for month in range(1, 13)]] * 2)
+        self.assertEqual(
+            chunks[1].tolist(), list(pd.DatetimeIndex(
+                data_gen.nativeDates['d']).strftime('%Y-%m')))
+        spec = compileColumn('t', 'dateRange', '2022-01-01|2022-12-31|%H:%M')
+        values = spec.generate(data_gen)
+        self.assertIsInstance(values, pd.arrays.ArrowStringArray)
+        self.assertEqual(spec.arrow(data_gen).to_pylist(), values.tolist())
+
+    def test_to_arrow(self):
+        self.assertEqual(toArrow(np.array(["a", "bc"]), 2).type, pa.string())
+        self.assertEqual(toArrow("x", 3).to_pylist(), ["x", "x", "x"])
+        self.assertEqual(toArrow(np.arange(3), 3).type, pa.int64())
+
+    def test_category_arrow(self):
+        data_gen = DataGenerator(
+            volume=200, file="tests/test_assect/test_data",
+            conf_file=r'tests/test_assect/test_conf.csv',
+            format="csv", choice="m", seed=7)
+        data_gen.offset, data_gen.n = 0, 200
+        spec = compileColumn('c', 'category', 'A|B||')
+        values = spec.arrow(data_gen)
+        # Repeated choices share an entry of the dictionary
+        self.assertEqual(values.dictionary.to_pylist(), ['A', 'B', ''])
+        self.assertEqual(values.dictionary_decode().to_pylist(),
+                         spec.generate(data_gen).tolist())
+
+    def test_dictionary_encoding(self):
+        data_gen = DataGenerator(
+            volume=300, file="tests/test_assect/test_data",
+            conf_file=r'tests/test_assect/test_conf.csv',
+            format="csv", choice="m", seed=7)
+        data_gen.offset, data_gen.n = 0, 300
+        values = compileColumn('c', 'category', 'A|B~0.5|0.5').generate(
+            data_gen)
+        self.assertIsInstance(values, pd.Categorical)
+        self.assertEqual(values.codes.dtype, np.int8)
+        # Constants are one entry dictionaries
+        values = compileColumn('k', 'constant', 'Done').generate(data_gen)
+        self.assertEqual(list(values.categories), ['Done'])
+        self.assertEqual(len(values), 300)
+        values = compileColumn('d', 'date', '2022-10-26|%d/%m/%Y').arrow(
+            data_gen)
+        self.assertEqual(values.dictionary.to_pylist(), ['26/10/2022'])
+        self.assertEqual(codesDtype(200), 'int16')
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.profiling` module."""
+import contextlib
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from sdgp.profiling import Profiler
+from sdgp.sdgp import DataGenerator
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for `sdgp.profiling` module."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_profile(self):
+        profiler = Profiler(self.tmp, chunks=2, top=3)
+        self.assertTrue(profiler.sampled(1))
+        self.assertFalse(profiler.sampled(2))
+        for _ in range(2):
+            with profiler.profile('generate', 'a/b'):
+                values = [str(x) for x in range(10000)]
+        del values
+        summary = profiler.save()
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]['file'], 'generate-a_b.pstats')
+        self.assertEqual(summary[0]['blocks'], 2)
+        self.assertLessEqual(len(summary[0]['self_time']), 3)
+        self.assertTrue(any('test_profiling.py' in site['site']
+                            for site in summary[0]['allocations']))
+        stats = pstats.Stats(os.path.join(self.tmp, 'generate-a_b.pstats'))
+        self.assertGreater(stats.total_calls, 0)
+        with open(os.path.join(self.tmp, 'summary.json')) as file:
+            self.assertEqual(json.load(file), summary)
+
+    def test_profile_chunks(self):
+        directory = os.path.join(self.tmp, 'profile')
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_gen = DataGenerator(
+                volume=1000, file=os.path.join(self.tmp, 'mock'),
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format="csv", choice="m", chunk_rows=300, seed=42,
+                workers=2, profile_dir=directory, profile_chunks=2)
+            data_gen.generateMockData()
+        # Only the profiled chunks are generated, and named by their rows
+        self.assertTrue(data_gen.mock_file_csv_path.endswith('_m_600.csv'))
+        self.assertEqual(len(pd.read_csv(data_gen.mock_file_csv_path)), 600)
+        data_gen.profiler.save()
+        files = set(os.listdir(directory))
+        self.assertIn('write-csv.pstats', files)
+        self.assertIn('generate-model1.pstats', files)
+        self.assertEqual(data_gen.profiler.calls['write', 'csv'], 2)
+        with self.assertRaises(ValueError):
+            DataGenerator(volume=10, file="mock", conf_file=None,
+                          format="csv", choice="m", verbose=False,
+                          profile_dir=directory, profile_chunks=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.regexsampler` module."""
+import re
+import unittest
+import numpy as np
+import pandas as pd
+from sdgp.plan import GenerationPlan
+from sdgp.regexsampler import (RegexSampler, UnsupportedPattern, compileRegex,
+                               utf8Strings)
+
+
+class TestRegexSampler(unittest.TestCase):
+    """Tests for `sdgp.regexsampler` module."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+        self.conf = pd.read_csv(r'tests/test_assect/test_conf.csv')
+
+    def test_conf_patterns(self):
+        # Every regexPattern of the test conf must produce matching strings
+        patterns = self.conf[self.conf.type == "regexPattern"]["values"]
+        self.assertEqual(len(patterns), 4)
+        for pattern in patterns:
+            result = compileRegex(pattern).sample(self.rng, 2000)
+            self.assertEqual(len(result), 2000)
+            self.assertTrue(all(re.fullmatch(pattern, x) for x in result))
+
+    def test_constructs(self):
+        for pattern in [r"(ab|c(d|e)){1,3}x?", r"(a|b)\1-\d+\s\w*",
+                        r"[^a-y]{2}.", r"^abc$", r"a*?b+", r""]:
+            result = RegexSampler(pattern).sample(self.rng, 500)
+            self.assertTrue(all(re.fullmatch(pattern, x) for x in result))
+
+    def test_distribution(self):
+        # Repeat lengths and alternations are uniform like exrex.getone
+        result = compileRegex(r"[a-z]{3,10}").sample(self.rng, 40000)
+        counts = np.bincount(np.char.str_len(result))[3:]
+        self.assertEqual(len(counts), 8)
+        self.assertTrue((abs(counts / 5000 - 1) < 0.1).all())
+        result = compileRegex(r"(com|net|org|in)").sample(self.rng, 40000)
+        values, counts = np.unique(result, return_counts=True)
+        self.assertEqual(list(values), ["com", "in", "net", "org"])
+        self.assertTrue((abs(counts / 10000 - 1) < 0.1).all())
+
+    def test_complement_categories(self):
+        for pattern in [r"\D{3}", r"\S{2}", r"[^\d]{4}", r"\D\s\S"]:
+            result = RegexSampler(pattern).sample(self.rng, 500)
+            self.assertTrue(all(re.fullmatch(pattern, x) for x in result))
+
+    def test_repeat_limit(self):
+        # The limit caps unbounded repeats only
+        lengths = np.char.str_len(compileRegex(r"a{2,100}").sample(
+            self.rng, 20000))
+        self.assertEqual((lengths.min(), lengths.max()), (2, 100))
+        lengths = np.char.str_len(compileRegex(r"a{3,}", limit=5).sample(
+            self.rng, 2000))
+        self.assertEqual((lengths.min(), lengths.max()), (3, 7))
+
+    def test_sample_arrow(self):
+        # Arrow strings are the same draws, encoded to UTF-8 directly
+        pattern = r"[a-z]{0,3}(x|yy)?\u00e9{1,2}[\U0001F600-\U0001F603]"
+        expected = compileRegex(pattern).sample(
+            np.random.default_rng(5), 500)
+        result = compileRegex(pattern).sampleArrow(
+            np.random.default_rng(5), 500)
+        self.assertEqual(result.to_pylist(), expected.tolist())
+        codes = np.array(["ab", "", "\u65e5\u672c"]).view("<u4")
+        self.assertEqual(utf8Strings(codes.reshape(3, -1)).to_pylist(),
+                         ["ab", "", "\u65e5\u672c"])
+
+    def test_unsupported_pattern(self):
+        # Constructs outside the plan are rejected, as they could not be
+        # drawn from the seeded streams
+        with self.assertRaises(UnsupportedPattern):
+            RegexSampler(r"(?P<a>x)(?(a)y|z)")
+        with self.assertRaises(ValueError):
+            GenerationPlan.fromConf({0: {
+                'name': 'code', 'type': 'regexPattern',
+                'values': r"(?P<a>x)(?(a)y|z)"}})
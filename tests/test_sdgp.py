@@ -4,10 +4,18 @@
 # import datetime
 # import pytest
 import unittest
-from sdgp.sdgp import DataGenerator
+from sdgp.loader import loadTable
+from sdgp.plan import toArrow
+from sdgp.sdgp import ENGINES, DataGenerator
+from sdgp.writers import CSVOptions, ParquetOptions
 import pandas as pd
-# import numpy as np
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import os
+import shutil
+import tempfile
 import time
 from unittest.mock import patch
 
@@ -55,8 +63,10 @@ class TestSdgp(unittest.TestCase):
         e = "2022-12-31"
         format = "%Y-%m-%d"
         result = self.data_gen.generateDates(s, e, format)
-        self.assertIsInstance(result, list)
+        self.assertIsInstance(result, pd.Categorical)
         self.assertEqual(len(result), self.volume)
+        dates = pd.to_datetime(result, format=format)
+        self.assertTrue(((dates >= s) & (dates <= e)).all())
 
         # Test generateDates method with an invalid date range
         s = "2022-12-31"
@@ -72,6 +82,23 @@ class TestSdgp(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.data_gen.generateDates(s, e, format)
 
+    def test_generate_times(self):
+        # Test generateTimes method with a valid time range
+        result = self.data_gen.generateTimes("08:30:00", "17:00:00",
+                                             "%H:%M:%S")
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(len(result), self.volume)
+        self.assertTrue(((result >= "08:30:00") & (result <= "17:00:00"))
+                        .all())
+
+        # Test generateTimes method with the default format
+        result = self.data_gen.generateTimes("00:00:00", "00:00:59")
+        self.assertTrue(all(x.startswith("00:00:") for x in result))
+
+        # Test generateTimes method with an invalid time range
+        with self.assertRaises(ValueError):
+            self.data_gen.generateTimes("17:00:00", "08:30:00", "%H:%M:%S")
+
     def test_split_by_pipe(self):
         # Test splitByPipe method with a valid data string
         data = "preDate | 1 | 2 "
@@ -152,6 +179,46 @@ _{self.choice}_{self.volume}.{self.format}')
         with self.assertRaises(ValueError):
             self.data_gen.addRandomDuration(start_date, so, eo, format)
 
+    def test_generate_dependent_dates(self):
+        # Test generateDependentDates reusing the native parent values
+        format = "%Y-%m-%d %H:%M:%S"
+        self.data_gen.df_mock = pd.DataFrame()
+        self.data_gen.df_mock["start"] = self.data_gen.generateDates(
+            "2022-01-01", "2022-12-31", format, "start")
+        result = self.data_gen.generateDependentDates(
+            "start", "1D", "1W", format, "end")
+        self.assertIn("end", self.data_gen.nativeDates)
+        delta = pd.to_datetime(result) - pd.to_datetime(
+            self.data_gen.df_mock["start"])
+        self.assertTrue(((delta >= pd.Timedelta("1D")) &
+                         (delta <= pd.Timedelta("1W"))).all())
+
+        # Test generateDependentDates parsing the parent column in bulk
+        self.data_gen.nativeDates = {}
+        result = self.data_gen.generateDependentDates(
+            "start", "2h", "3h", "%Y-%m-%d %H")
+        delta = pd.to_datetime(result, format="%Y-%m-%d %H") - \
+            pd.to_datetime(self.data_gen.df_mock["start"])
+        self.assertTrue(((delta > pd.Timedelta("1h")) &
+                         (delta <= pd.Timedelta("3h"))).all())
+
+        # Test generateDependentDates with invalid offsets
+        with self.assertRaises(ValueError):
+            self.data_gen.generateDependentDates("start", "1W", "1D", format)
+
+    def test_generate_composite(self):
+        # Test generateComposite method with each hash algorithm
+        self.data_gen.df_mock = pd.DataFrame({"a": [1, 12], "b": [23, 3]})
+        result = self.data_gen.generateComposite("a | b")
+        self.assertEqual(len(result[0]), 40)
+        self.assertNotEqual(result[0], result[1])
+        result = self.data_gen.generateComposite("a|b~blake2b")
+        self.assertEqual(len(result[0]), 40)
+        result = self.data_gen.generateComposite("a|b~hash64")
+        self.assertEqual(result.dtype, np.int64)
+        with self.assertRaises(ValueError):
+            self.data_gen.generateComposite("a|b~crc")
+
     def test_check_duration(self):
         # Test check_date_duration with valid input
         start_duration = "1D"
@@ -219,7 +286,7 @@ _{data_gen.choice}_{data_gen.volume}.{data_gen.outputFormat}')
         data_gen.df_mock = pd.DataFrame()
         data_gen.df_mock = data_gen.generateWithConf()
         data_gen.genMockData(data_gen.df_mock)
-        df = data_gen.generateWithConf(unique=True)
+        df = data_gen.generateWithConf()
 
         # Assert that the returned value is a pd.DataFrame object
         assert isinstance(df, pd.DataFrame)
@@ -231,16 +298,17 @@ _{data_gen.choice}_{data_gen.volume}.{data_gen.outputFormat}')
         assert df.shape == expected_shape
 
         # Check that the unique index columns have unique values
-        for column, start_number in data_gen.uniqueIndexs:
-            assert df[column].nunique() == 100
+        for spec in data_gen.plan.byType('uniqueIndex'):
+            assert df[spec.name].nunique() == 100
 
         # Check that the dependent date range columns have valid dates
-        for column, data in data_gen.dependentDateRanges:
-            assert pd.to_datetime(df[column], errors='coerce').notnull().all()
+        for spec in data_gen.plan.byType('dependentDateRange'):
+            assert pd.to_datetime(df[spec.name],
+                                  errors='coerce').notnull().all()
 
         # Check that the composite columns have unique values
-        for column, data in data_gen.composites:
-            assert df[column].nunique() == 100
+        for spec in data_gen.plan.byType('composite'):
+            assert df[spec.name].nunique() == 100
 
     def test_gen_mock_data(self):
         # Create a mock DataFrame
@@ -261,6 +329,19 @@ _{data_gen.choice}_{data_gen.volume}.{data_gen.outputFormat}')
         for col in df.columns:
             self.assertTrue(mock_df[col].isin(df[col]).all())
 
+    def test_gen_mock_data_offset(self):
+        # Amplified rows only depend on their index, not on the chunk
+        df = pd.DataFrame({"A": range(7), "B": list("abcdefg")})
+        self.data_gen.volume = self.data_gen.n = 100
+        whole = self.data_gen.genMockData(df).copy()
+        self.data_gen.offset, self.data_gen.n = 30, 30
+        chunk = self.data_gen.genMockData(df)
+        pd.testing.assert_frame_equal(
+            whole.iloc[30:60].reset_index(drop=True),
+            chunk.reset_index(drop=True))
+        # Every run of 7 rows is a permutation of the original column
+        self.assertEqual(sorted(whole["A"][7:14]), list(range(7)))
+
     def test_get_by_type(self):
         # Create a mock configuration dictionary
         self.data_gen.conf_dict = {
@@ -321,8 +402,8 @@ _{data_gen.choice}_{data_gen.volume}.{data_gen.outputFormat}')
         # Call the generateMockData method and check if the corresponding
         # methods are called
         data_gen.generateMockData()
-        mock_generateWithConf.assert_called_with(unique=True)
-        mock_genMockData.assert_called()
+        mock_generateWithConf.assert_called_with()
+        mock_genMockData.assert_not_called()
         mock_output.assert_called()
 
     @patch('sdgp.sdgp.DataGenerator.generateWithConf')
@@ -366,6 +447,298 @@ _{data_gen.choice}_{data_gen.volume}.{data_gen.outputFormat}')
         mock_genMockData.assert_called()
         mock_output.assert_called()
 
+    def test_stream_chunks(self):
+        # Chunked generation must produce the same layout as a single pass
+        for format in ["csv", "parquet"]:
+            data_gen = DataGenerator(
+                volume=1000, file="tests/test_assect/test_chunk",
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format=format, choice="m", chunk_rows=300)
+            data_gen.generateMockData()
+            path = f'{data_gen.file}_{data_gen.choice}_1000.{format}'
+            df = pd.read_csv(path) if format == "csv" else \
+                pd.read_parquet(path)
+            os.remove(path)
+            self.assertEqual(df.shape, (1000, 16))
+            # uniqueIndex continues across chunks
+            self.assertEqual(list(df["id1"]),
+                             list(range(800000000, 800001000)))
+            self.assertEqual(data_gen.n, 1000)
+
+    def test_stream_chunks_scale(self):
+        data_gen = DataGenerator(volume=250,
+                                 file=r'tests/test_assect/test_data.csv',
+                                 conf_file=None, format="csv", choice="g",
+                                 chunk_rows=40)
+        data_gen.justScaleData()
+        df = pd.read_csv(data_gen.mock_file_csv_path)
+        os.remove(data_gen.mock_file_csv_path)
+        self.assertEqual(df.shape, (250, 18))
+
+    def test_stream_chunks_workers(self):
+        # Chunks from a process pool match the chunks of a single process
+        frames = []
+        for workers in [1, 2]:
+            data_gen = DataGenerator(
+                volume=900, file="tests/test_assect/test_workers",
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format="csv", choice="m", chunk_rows=200, workers=workers,
+                seed=42)
+            data_gen.generateMockData()
+            frames.append(pd.read_csv(data_gen.mock_file_csv_path))
+            os.remove(data_gen.mock_file_csv_path)
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+        self.assertEqual(frames[1]["id1"].is_unique, True)
+        self.assertEqual(len(frames[1]), 900)
+        # Chunks get independent random streams
+        self.assertFalse((frames[1]["name1"].iloc[:200].values ==
+                          frames[1]["name1"].iloc[200:400].values).all())
+
+    def test_generate_with_conf_threads(self):
+        # Columns generated on a thread pool match the serial ones
+        frames = []
+        for threads in [1, 4]:
+            data_gen = DataGenerator(
+                volume=1000, file=self.file,
+                conf_file=r'tests/test_assect/test_conf.csv',
+                format=self.format, choice="m", seed=3, threads=threads)
+            frames.append(data_gen.generateRange(0, 1000))
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+        self.assertEqual(frames[1].shape, (1000, 18))
+
+    def test_stream_chunks_arrow(self):
+        # The arrow engine writes the same data without pandas columns
+        tables = {}
+        for engine, format in [("pandas", "parquet"), ("arrow", "arrow")]:
+            data_gen = DataGenerator(
+                volume=900, file="tests/test_assect/test_engine",
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format=format, choice="m", chunk_rows=400, seed=42,
+                engine=engine)
+            data_gen.generateMockData()
+            if engine == "arrow":
+                path = data_gen.mock_file_arrow_path
+                tables[engine] = pa.ipc.open_file(path).read_all()
+            else:
+                path = data_gen.mock_file_parquet_path
+                tables[engine] = pq.read_table(path)
+            os.remove(path)
+        self.assertEqual(tables["arrow"].num_rows, 900)
+        # Categories and constants stay dictionary encoded in the files
+        for engine in tables:
+            for column in ["model1", "test1", "date1"]:
+                self.assertTrue(pa.types.is_dictionary(
+                    tables[engine].schema.field(column).type))
+        for column in tables["pandas"].column_names:
+            self.assertEqual(
+                tables["arrow"].column(column).to_pylist(),
+                tables["pandas"].column(column).to_pylist())
+
+    def test_arrow_big_integers(self):
+        # uniqueIndex values beyond 64 bits, as in the test confs
+        for conf_file, choice, file in [
+                ('test_conf.csv', 'm', 'test_big'),
+                ('test_conf_e.csv', 'e', 'test_data.csv')]:
+            tables = {}
+            for engine in ENGINES:
+                data_gen = DataGenerator(
+                    volume=900, file=f"tests/test_assect/{file}",
+                    conf_file=f"tests/test_assect/{conf_file}",
+                    format="csv", choice=choice, chunk_rows=400, seed=42,
+                    engine=engine, verbose=False)
+                if choice == 'm':
+                    data_gen.generateMockData()
+                else:
+                    data_gen.editMockDataAndGenerate()
+                path = data_gen.mock_file_csv_path
+                tables[engine] = loadTable(path, strings=True)
+                os.remove(path)
+            self.assertEqual(tables["arrow"].column("id1")[-1].as_py(),
+                             str(8 * 10**29 + 899))
+            self.assertTrue(tables["arrow"].equals(tables["pandas"]))
+        array = toArrow(np.array([10**40, 1], dtype=object), 2)
+        self.assertEqual(array.to_pylist(), [str(10**40), "1"])
+
+    def test_stream_csv_writers(self):
+        # The arrow CSV writer streams compressed chunks with the same data
+        frames = []
+        for file, options in [
+                ("tests/test_assect/test_csv", None),
+                ("tests/test_assect/test_csv.csv.gz",
+                 CSVOptions(writer="arrow")),
+                ("tests/test_assect/test_csv", CSVOptions(
+                    writer="arrow", compression="bz2", delimiter="|",
+                    header=False))]:
+            data_gen = DataGenerator(
+                volume=900, file=file,
+                conf_file=r'tests/test_assect/test_conf_p.csv',
+                format="csv", choice="m", chunk_rows=400, seed=42,
+                csv_options=options)
+            data_gen.generateMockData()
+            path = data_gen.mock_file_csv_path
+            if options and not options.header:
+                frames.append(pd.read_csv(path, sep="|", header=None,
+                                          names=frames[0].columns))
+            else:
+                frames.append(pd.read_csv(path))
+            os.remove(path)
+        self.assertTrue(path.endswith("_m_900.csv.bz2"))
+        self.assertEqual(len(frames[0]), 900)
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+        pd.testing.assert_frame_equal(frames[0], frames[2])
+
+    def test_default_csv_format(self):
+        # The default CSV output is DataFrame.to_csv, as before chunking
+        conf_file = r'tests/test_assect/test_conf_p.csv'
+        data_gen = DataGenerator(
+            volume=900, file=self.file, conf_file=conf_file,
+            format="csv", choice="m", seed=42, verbose=False)
+        data_gen.generateRange(0, 900)
+        expected = data_gen.outputColumns().to_csv(index=False, header=True)
+        for engine in ENGINES:
+            data_gen = DataGenerator(
+                volume=900, file="tests/test_assect/test_format",
+                conf_file=conf_file, format="csv", choice="m",
+                chunk_rows=400, seed=42, engine=engine, verbose=False)
+            data_gen.generateMockData()
+            path = data_gen.mock_file_csv_path
+            with open(path, newline='') as file:
+                output = file.read()
+            os.remove(path)
+            self.assertEqual(output, expected)
+
+    def test_parquet_dataset(self):
+        # Partitioned output is a hive style directory of chunk files
+        data_gen = DataGenerator(
+            volume=900, file="tests/test_assect/test_dataset",
+            conf_file=r'tests/test_assect/test_conf_p.csv',
+            format="parquet", choice="m", chunk_rows=400, seed=42,
+            parquet_options=ParquetOptions(
+                partition_by=["model1"], file_rows=100, compression="zstd"))
+        data_gen.generateMockData()
+        path = data_gen.mock_file_parquet_path
+        try:
+            dataset = ds.dataset(path, partitioning="hive")
+            self.assertEqual(dataset.count_rows(), 900)
+            self.assertTrue(os.path.isdir(os.path.join(
+                path, "model1=Lending")))
+            files = dataset.files
+            self.assertTrue(all(pq.ParquetFile(file).metadata.num_rows <= 100
+                                for file in files))
+            self.assertEqual(pq.ParquetFile(files[0]).metadata.row_group(0)
+                             .column(0).compression, "ZSTD")
+            self.assertEqual(dataset.to_table(
+                filter=ds.field("model1") == "Lending").num_rows,
+                sum(data == "Lending" for data in
+                    dataset.to_table()["model1"].to_pylist()))
+        finally:
+            shutil.rmtree(path)
+
+    def test_scale_out_of_core(self):
+        # The seed is spilled to disk and gathered chunk by chunk
+        seed = pd.read_csv(r'tests/test_assect/test_data.csv')
+        frames = {}
+        for engine in ["pandas", "arrow"]:
+            data_gen = DataGenerator(
+                volume=2 * len(seed), file=r'tests/test_assect/test_data.csv',
+                conf_file=None, format="parquet", choice="g",
+                chunk_rows=300, seed=42, engine=engine, out_of_core=True,
+                seed_columns=["model1", "number1"])
+            data_gen.justScaleData()
+            path = data_gen.mock_file_parquet_path
+            df = pd.read_parquet(path)
+            os.remove(path)
+            self.assertEqual(list(df.columns), ["model1", "number1"])
+            self.assertEqual(len(df), 2 * len(seed))
+            self.assertEqual(df["number1"].value_counts().to_dict(),
+                             (seed["number1"].value_counts() * 2).to_dict())
+            frames[engine] = df
+        pd.testing.assert_frame_equal(frames["pandas"], frames["arrow"])
+
+    def test_generate_range(self):
+        # Any row range is reproducible on its own from the seed
+        conf_file = r'tests/test_assect/test_conf_p.csv'
+        data_gen = DataGenerator(volume=50000, file=self.file,
+                                 conf_file=conf_file,
+                                 format=self.format, choice="m", seed=7)
+        whole = data_gen.generateRange(0, 50000).copy()
+        part = data_gen.generateRange(20000, 100).copy()
+        pd.testing.assert_frame_equal(
+            whole.iloc[20000:20100].reset_index(drop=True), part)
+        other = DataGenerator(volume=50000, file=self.file,
+                              conf_file=conf_file,
+                              format=self.format, choice="m", seed=8)
+        self.assertFalse(whole["name1"].iloc[:100].equals(
+            other.generateRange(0, 100)["name1"]))
+
+    def test_append(self):
+        # Appended rows are the rows of a run of the whole volume
+        conf_file = r'tests/test_assect/test_conf_p.csv'
+        tmp = tempfile.mkdtemp()
+        try:
+            for format in ["csv", "parquet"]:
+                outputs = {}
+                for name, volume, append in [("full", 900, None),
+                                             ("part", 400, None),
+                                             ("part", 900, "part_m_400")]:
+                    if append:
+                        append = os.path.join(tmp, f"{append}.{format}")
+                    data_gen = DataGenerator(
+                        volume=volume, file=os.path.join(tmp, name),
+                        conf_file=conf_file, format=format, choice="m",
+                        chunk_rows=300, seed=7, append=append)
+                    data_gen.generateMockData()
+                    outputs[name] = getattr(
+                        data_gen, f"mock_file_{format}_path")
+                self.assertFalse(os.path.exists(append))
+                read = pd.read_csv if format == "csv" else pd.read_parquet
+                full, part = read(outputs["full"]), read(outputs["part"])
+                if format == "parquet":
+                    self.assertEqual(sorted(os.listdir(outputs["part"])),
+                                     ["part-0.parquet", "part-400.parquet"])
+                    part = part.sort_values("id1", ignore_index=True)
+                pd.testing.assert_frame_equal(full, part)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_append_unique_index(self):
+        # uniqueIndex columns continue from the last value of the output
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "seed.csv")
+            pd.DataFrame({"id": [5, 6, 7]}).to_csv(path, index=False)
+            data_gen = DataGenerator(
+                volume=5, file=os.path.join(tmp, "out"),
+                conf_file=[("id", "uniqueIndex", 1)], format="csv",
+                choice="m", seed=7, append=path)
+            self.assertEqual(data_gen.start, 3)
+            data_gen.generateMockData()
+            self.assertEqual(pd.read_csv(data_gen.mock_file_csv_path)
+                             ["id"].tolist(), [5, 6, 7, 8, 9])
+            with self.assertRaises(ValueError):
+                DataGenerator(volume=5, file=os.path.join(tmp, "out"),
+                              conf_file=[("id", "uniqueIndex", 1)],
+                              format="csv", choice="m", seed=7,
+                              append=data_gen.mock_file_csv_path)
+            with self.assertRaises(ValueError):
+                DataGenerator(volume=9, file=os.path.join(tmp, "out"),
+                              conf_file=[("id", "uniqueIndex", 1)],
+                              format="arrow", choice="m", seed=7,
+                              append=data_gen.mock_file_csv_path)
+            data_gen = DataGenerator(
+                volume=9, file=os.path.join(tmp, "out"),
+                conf_file=[("key", "uniqueIndex", 1)], format="csv",
+                choice="m", seed=7, append=data_gen.mock_file_csv_path)
+            with self.assertRaises(ValueError):
+                data_gen.generateMockData()
+            with self.assertRaises(SystemExit):
+                DataGenerator(volume=9, file=os.path.join(tmp, "out"),
+                              conf_file=[("id", "uniqueIndex", 1)],
+                              format="csv", choice="m", seed=7,
+                              append=os.path.join(tmp, "missing.csv"))
+        finally:
+            shutil.rmtree(tmp)
+
     def test_invalid_choice(self):
         # Create a DataGenerator instance with an invalid choice
         data_gen = DataGenerator(volume=self.volume, file=self.file,
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.spill` module."""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+from sdgp import spill
+from sdgp.loader import loadTable
+from sdgp.rng import shuffleIndex
+from sdgp.spill import SpilledSeed, gather
+
+DATA = 'tests/test_assect/test_data.csv'
+
+
+class TestSpill(unittest.TestCase):
+    """Tests for `sdgp.spill` module."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_shuffle_index(self):
+        for size in [1, 3, 10, 1000]:
+            index = shuffleIndex(7, 'c', size, 0, 3 * size)
+            for cycle in range(3):
+                np.testing.assert_array_equal(
+                    np.sort(index[cycle * size:(cycle + 1) * size]),
+                    np.arange(size))
+            # Any slice is reproduced on its own
+            np.testing.assert_array_equal(
+                shuffleIndex(7, 'c', size, size // 2, size),
+                index[size // 2:size // 2 + size])
+        self.assertFalse(np.array_equal(shuffleIndex(7, 'c', 1000, 0, 1000),
+                                        shuffleIndex(7, 'd', 1000, 0, 1000)))
+
+    def test_gather(self):
+        values = pa.chunked_array([['a', 'b'], ['c'], ['d', 'e', 'f']])
+        index = np.array([5, 0, 2, 2, 4])
+        self.assertEqual(gather(values, index).to_pylist(),
+                         ['f', 'a', 'c', 'c', 'e'])
+        self.assertEqual(len(gather(values, index[:0])), 0)
+
+    def test_spill(self):
+        table = loadTable(DATA)
+        path = os.path.join(self.tmp, 'seed.feather')
+        feather.write_feather(table, path, chunksize=20)
+        directory = os.path.join(self.tmp, 'spill')
+        os.mkdir(directory)
+        batch_bytes = spill.SPILL_BATCH_BYTES
+        spill.SPILL_BATCH_BYTES = 256  # Several batches per column
+        try:
+            seed = SpilledSeed.spill(path, directory,
+                                     columns=['id1', 'model1', 'number1'])
+        finally:
+            spill.SPILL_BATCH_BYTES = batch_bytes
+        self.assertEqual(seed.shape, (table.num_rows, 3))
+        self.assertEqual(len(os.listdir(directory)), 3)
+        self.assertGreater(seed.column('model1').num_chunks, 1)
+        self.assertTrue(seed.column('id1').equals(table.column('id1')))
+        # Every cycle of the output is a permutation of the seed rows
+        seed = pickle.loads(pickle.dumps(seed))
+        values = seed.sample(7, 'number1', 0, 2 * seed.num_rows)
+        self.assertEqual(sorted(values.to_pylist(), key=str),
+                         sorted(table.column('number1').to_pylist() * 2,
+                                key=str))
+        self.assertTrue(seed.sample(7, 'number1', 5, 10).equals(
+            values.slice(5, 10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
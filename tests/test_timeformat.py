@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.timeformat` module."""
+import unittest
+import numpy as np
+import pandas as pd
+from sdgp.timeformat import (daysCategories, formatArrow, formatTimestamps,
+                             isDayGranular, sampleTimestamps, splitFormat,
+                             truncateTimestamps)
+
+
+class TestTimeFormat(unittest.TestCase):
+    """Tests for `sdgp.timeformat` module."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.values = sampleTimestamps(self.rng, pd.Timestamp("2021-10-10"),
+                                       pd.Timestamp("2022-10-26"), 5000)
+
+    def test_split_format(self):
+        self.assertEqual(splitFormat("%Y-%m-%d %H:%M:%S"),
+                         [("date", "%Y-%m-%d "), ("time", "%H:%M:%S")])
+        self.assertIsNone(splitFormat("%Y-%m-%d %H:%M:%S.%f"))
+        self.assertTrue(isDayGranular("%d/%m/%Y"))
+        self.assertFalse(isDayGranular("%Y-%m-%d %H"))
+
+    def test_sample_timestamps(self):
+        self.assertEqual(len(self.values), 5000)
+        self.assertTrue((self.values >= pd.Timestamp("2021-10-10").value)
+                        .all())
+        self.assertTrue((self.values < pd.Timestamp("2022-10-26").value)
+                        .all())
+
+    def test_format_timestamps(self):
+        # Bulk formatting must match pandas strftime for every format kind
+        for format in ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%I:%M %p %% %d/%b",
+                       "%Y-%m-%dT%H:%M:%S.%f", "plain"]:
+            expected = pd.DatetimeIndex(self.values).strftime(format)
+            result = formatTimestamps(self.values, format)
+            self.assertEqual(list(result), list(expected))
+
+    def test_format_arrow(self):
+        for format in ["%Y-%m-%d %H:%M:%S", "%I:%M %p %% %d/%b", "%H",
+                       "%Y-%m-%dT%H:%M:%S.%f", "plain"]:
+            expected = pd.DatetimeIndex(self.values).strftime(format)
+            self.assertEqual(formatArrow(self.values, format).to_pylist(),
+                             list(expected))
+        self.assertEqual(len(formatArrow(self.values[:0], "%H")), 0)
+
+    def test_days_categories(self):
+        # Days rendered alike share a category
+        first = pd.Timestamp("2022-01-30").value // 86400 // 10**9
+        categories, codes = daysCategories(first, first + 3, "%Y-%m")
+        self.assertEqual(list(categories), ["2022-01", "2022-02"])
+        self.assertEqual(codes.tolist(), [0, 0, 1, 1])
+
+    def test_truncate_timestamps(self):
+        days = truncateTimestamps(self.values, "%Y-%m-%d")
+        self.assertTrue((pd.DatetimeIndex(days).normalize() ==
+                         pd.DatetimeIndex(days)).all())
+        seconds = truncateTimestamps(self.values, "%Y-%m-%d %H:%M:%S")
+        self.assertTrue((seconds % 10**9 == 0).all())
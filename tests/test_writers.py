@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""Tests for `sdgp.writers` module."""
+import unittest
+import pyarrow as pa
+from sdgp.writers import CSVOptions, ParquetOptions, compressionOf
+
+
+class TestParquetOptions(unittest.TestCase):
+    """Tests for `sdgp.writers.ParquetOptions`."""
+
+    def test_options(self):
+        options = ParquetOptions()
+        self.assertFalse(options.dataset)
+        self.assertEqual(options.writerOptions()["compression"], "snappy")
+        options = ParquetOptions(partition_by=["a"], compression="zstd",
+                                 compression_level=3, statistics=False)
+        self.assertTrue(options.dataset)
+        self.assertEqual(options.writerOptions(), dict(
+            compression="zstd", compression_level=3, use_dictionary=True,
+            write_statistics=False))
+        with self.assertRaises(ValueError):
+            ParquetOptions(compression="lzo")
+        with self.assertRaises(ValueError):
+            ParquetOptions(file_rows=0)
+
+    def test_file_rows(self):
+        table = pa.table({"a": pa.array(range(1024), type=pa.int64())})
+        self.assertIsNone(ParquetOptions().fileRows(table))
+        self.assertEqual(ParquetOptions(file_rows=100).fileRows(table), 100)
+        # 8 bytes per row
+        self.assertEqual(ParquetOptions(file_size=1).fileRows(table), 2**17)
+        self.assertEqual(ParquetOptions(file_rows=100, file_size=1)
+                         .fileRows(table), 100)
+
+    def test_prepare_dataset(self):
+        with self.assertRaises(ValueError):
+            ParquetOptions(partition_by=["b"]).prepareDataset(
+                "tests/missing_dataset", ["a"])
+
+
+class TestCSVOptions(unittest.TestCase):
+    """Tests for `sdgp.writers.CSVOptions`."""
+
+    def test_options(self):
+        options = CSVOptions()
+        self.assertEqual(options.extension(), ".csv")
+        self.assertEqual(CSVOptions(compression="zstd").extension(),
+                         ".csv.zst")
+        self.assertEqual(CSVOptions(delimiter="|").pandasOptions()["sep"],
+                         "|")
+        for kwargs in [{"writer": "polars"}, {"compression": "lzma"},
+                       {"quoting": "some"}, {"delimiter": "||"}]:
+            with self.assertRaises(ValueError):
+                CSVOptions(**kwargs)
+
+    def test_compression_of(self):
+        self.assertEqual(compressionOf("table.csv.gz"), ("table.csv", "gzip"))
+        self.assertEqual(compressionOf("table.bz2"), ("table", "bz2"))
+        self.assertEqual(compressionOf("table.csv"), ("table.csv", None))